@@ -0,0 +1,80 @@
+import { API_BASE_URL } from './client'
+
+export interface StoreEvent {
+  type: string
+  data: any
+}
+
+const RECONNECT_MS = 3000
+
+/**
+ * Follow the store's live feed (GET /store/events). EventSource can't send the
+ * Authorization header, so the stream is read with fetch. `onResync` runs after
+ * every reconnect (or a `dropped` event), and on `resync`, which the server sends
+ * when another API worker changed the store's orders or stock: deltas may have
+ * been missed, so the caller should reload its lists. Returns a function that
+ * closes the feed.
+ */
+export function subscribeStoreEvents(
+  token: string | null,
+  onEvent: (event: StoreEvent) => void,
+  onResync: () => void,
+): () => void {
+  const controller = new AbortController()
+  let connectedBefore = false
+
+  const dispatch = (block: string) => {
+    let type = 'message'
+    const data: string[] = []
+    for (const line of block.split('\n')) {
+      if (line.startsWith('event:')) type = line.slice(6).trim()
+      else if (line.startsWith('data:')) data.push(line.slice(5).trim())
+    }
+    if (!data.length) return false
+    if (type === 'dropped') return true
+    if (type === 'resync') {
+      onResync()
+      return false
+    }
+    onEvent({ type, data: JSON.parse(data.join('\n')) })
+    return false
+  }
+
+  const run = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const res = await fetch(`${API_BASE_URL}/store/events`, {
+          headers: { Authorization: `Bearer ${token}` },
+          signal: controller.signal,
+        })
+        if (!res.ok || !res.body) throw new Error(`Live feed unavailable (${res.status})`)
+        if (connectedBefore) onResync()
+        connectedBefore = true
+
+        const reader = res.body.getReader()
+        const decoder = new TextDecoder()
+        let buffer = ''
+        let dropped = false
+        while (!dropped) {
+          const { value, done } = await reader.read()
+          if (done) break
+          buffer += decoder.decode(value, { stream: true })
+          let end: number
+          while (!dropped && (end = buffer.indexOf('\n\n')) >= 0) {
+            dropped = dispatch(buffer.slice(0, end))
+            buffer = buffer.slice(end + 2)
+          }
+        }
+        reader.cancel().catch(() => undefined)
+      } catch (err) {
+        if (controller.signal.aborted) return
+        console.error('Live feed disconnected:', err)
+      }
+      connectedBefore = true
+      await new Promise(resolve => setTimeout(resolve, RECONNECT_MS))
+    }
+  }
+
+  run()
+  return () => controller.abort()
+}
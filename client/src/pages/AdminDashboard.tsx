@@ -4,6 +4,7 @@ import { api } from '../api/client'
 import { useAppSelector, useAppDispatch } from '../store/hooks'
 import { setSettings } from '../store/storeSlice'
 import type { RootState } from '../store/store'
+import type { DashboardResponse, DashboardDayDetail, LowStockResponse } from '../types/store'
 import DashboardLayout from '../components/DashboardLayout'
 import PageHeader from '../components/PageHeader'
 import Loader from '../components/Loader'
@@ -77,8 +78,7 @@ export default function AdminDashboard() {
   const [chartData, setChartData] = useState<ChartDataPoint[]>([])
   const [productContributions, setProductContributions] = useState<ProductContribution[]>([])
   const [selectedDayDetail, setSelectedDayDetail] = useState<DayDetail | null>(null)
-  const [allOrdersData, setAllOrdersData] = useState<any[]>([])
-  const [inventoryData, setInventoryData] = useState<any[]>([])
+  const [lowStockThreshold, setLowStockThreshold] = useState(10)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
 
@@ -88,6 +88,33 @@ export default function AdminDashboard() {
     loadDashboardData()
   }, [])
 
+  // Keep the low-stock KPI live: the server answers /changes as soon as the set moves
+  useEffect(() => {
+    let active = true
+    const watchLowStock = async () => {
+      let since: number | null = null
+      while (active) {
+        try {
+          const res = since === null
+            ? await api.get<LowStockResponse>('/store/low-stock', { headers: authHeader })
+            : await api.get<LowStockResponse>('/store/low-stock/changes', { headers: authHeader, params: { since } })
+          if (!active) break
+          since = res.data.version
+          setLowStockThreshold(res.data.threshold)
+          setKpis(prev => ({ ...prev, lowStockProducts: res.data.items.length }))
+        } catch (err) {
+          console.error('Low-stock watch failed, retrying:', err)
+          since = null
+          await new Promise(resolve => setTimeout(resolve, 5000))
+        }
+      }
+    }
+    watchLowStock()
+    return () => {
+      active = false
+    }
+  }, [authHeader])
+
   const loadDashboardData = async () => {
     setLoading(true)
     setError(null)
@@ -100,111 +127,39 @@ export default function AdminDashboard() {
         console.error('Failed to load store settings:', err)
       }
 
-      // Fetch products to count active ones
-      const productsRes = await api.get('/products', { headers: authHeader })
-      const activeProducts = productsRes.data.length
-
-      // Fetch orders to calculate KPIs
-      const ordersRes = await api.get('/orders', {
-        headers: authHeader,
-        params: {
-          start_date: new Date(Date.now() - 30 * 24 * 60 * 60 * 1000).toISOString(),
-        },
-      })
-
-      const allOrders = ordersRes.data
-      setAllOrdersData(allOrders)
-      const now = new Date()
-      const sevenDaysAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000)
-
-      // Calculate confirmed/shipped orders in last 7 days
-      const ordersLast7Days = allOrders.filter((o: any) => {
-        const orderDate = new Date(o.created_at)
-        return orderDate >= sevenDaysAgo && (o.status === 'confirmed' || o.status === 'shipped')
-      }).length
-
-      // Fetch inventory to find low-stock items
-      const inventoryRes = await api.get('/orders/inventory', { headers: authHeader })
-      const inventory = inventoryRes.data
-      setInventoryData(inventory)
-      
-      // For now, consider anything with < 10 units as low-stock
-      // In a real app, you'd fetch store settings for the threshold
-      const lowStockProducts = inventory.filter((item: any) => item.units < 10).length
-
-      // Calculate total sales (confirmed and shipped orders count as sales)
-      const totalSalesLast30Days = allOrders
-        .filter((order: any) => order.status === 'confirmed' || order.status === 'shipped')
-        .reduce((sum: number, order: any) => {
-          const unitPrice = order.unit_price || 0
-          const quantity = order.order_quantity || 0
-          return sum + unitPrice * quantity
-        }, 0)
+      // KPIs, daily series and top products are aggregated server-side
+      const res = await api.get<DashboardResponse>('/store/dashboard', { headers: authHeader })
+      const dashboard = res.data
+      const totalSales = dashboard.total_sales_last_30_days
 
       setKpis({
-        activeProducts,
-        ordersLast7Days,
-        lowStockProducts,
-        totalSalesLast30Days,
+        activeProducts: dashboard.active_products,
+        ordersLast7Days: dashboard.orders_last_7_days,
+        lowStockProducts: dashboard.low_stock_products,
+        totalSalesLast30Days: totalSales,
       })
+      setLowStockThreshold(dashboard.low_stock_threshold)
 
-      // Calculate product contributions to sales
-      const productSales: Record<string, { name: string; sales: number }> = {}
-      allOrders
-        .filter((o: any) => o.status === 'confirmed' || o.status === 'shipped')
-        .forEach((order: any) => {
-          const inv = inventory.find((i: any) => i.inventory_id === order.inventory_id)
-          if (inv) {
-            const key = inv.prod_name
-            const orderSales = (order.unit_price || 0) * (order.order_quantity || 0)
-            if (!productSales[key]) {
-              productSales[key] = { name: key, sales: 0 }
-            }
-            productSales[key].sales += orderSales
-          }
-        })
-
-      const contributions = Object.values(productSales)
-        .sort((a, b) => b.sales - a.sales)
-        .slice(0, 10)
-        .map(p => ({
+      setProductContributions(
+        dashboard.top_products.map(p => ({
           name: p.name,
-          value: Math.round(p.sales * 100) / 100,
-          percentage: Math.round((p.sales / totalSalesLast30Days) * 100 * 100) / 100,
+          value: p.sales,
+          percentage: totalSales ? Math.round((p.sales / totalSales) * 100 * 100) / 100 : 0,
         }))
-      setProductContributions(contributions)
-
-      // Generate chart data (only confirmed orders count for sales)
-      const chartData: ChartDataPoint[] = []
-      for (let i = 29; i >= 0; i--) {
-        const date = new Date(now.getTime() - i * 24 * 60 * 60 * 1000)
-        const dateStr = date.toLocaleDateString('en-US', {
-          month: 'short',
-          day: 'numeric',
-        })
-
-        const dayOrders = allOrders.filter((o: any) => {
-          const orderDate = new Date(o.created_at)
-          return orderDate.toDateString() === date.toDateString() && (o.status === 'confirmed' || o.status === 'shipped')
-        }).length
-
-        const daySales = allOrders
-          .filter((o: any) => {
-            const orderDate = new Date(o.created_at)
-            return orderDate.toDateString() === date.toDateString() && (o.status === 'confirmed' || o.status === 'shipped')
-          })
-          .reduce((sum: number, order: any) => {
-            return sum + ((order.unit_price || 0) * (order.order_quantity || 0))
-          }, 0)
-
-        chartData.push({
-          date: dateStr,
-          fullDate: date.toDateString(),
-          orders: dayOrders,
-          sales: Math.round(daySales * 100) / 100,
-        })
-      }
-      setChartData(chartData)
+      )
+
+      // Days are UTC calendar dates (YYYY-MM-DD)
+      setChartData(
+        dashboard.daily.map(d => ({
+          date: new Date(`${d.date}T00:00:00`).toLocaleDateString('en-US', {
+            month: 'short',
+            day: 'numeric',
+          }),
+          fullDate: d.date,
+          orders: d.orders,
+          sales: d.sales,
+        }))
+      )
     } catch (err: any) {
       console.error('Failed to load dashboard data:', err)
       setError(err?.response?.data?.detail || 'Failed to load dashboard data')
@@ -213,47 +168,26 @@ export default function AdminDashboard() {
     }
   }
 
-  const handleChartClick = (data: any) => {
+  const handleChartClick = async (data: any) => {
     if (!data || !data.activePayload) return
     const clickedData = data.activePayload[0]?.payload
     if (!clickedData) return
 
-    const clickedDate = clickedData.fullDate
-    
-    // Filter orders for that specific day
-    const dayOrders = allOrdersData.filter((o: any) => {
-      const orderDate = new Date(o.created_at)
-      return orderDate.toDateString() === clickedDate && (o.status === 'confirmed' || o.status === 'shipped')
-    })
-
-    // Calculate products sold on that day
-    const productMap: Record<string, { name: string; sku: string; quantity: number; revenue: number }> = {}
-    dayOrders.forEach((order: any) => {
-      const inv = inventoryData.find((i: any) => i.inventory_id === order.inventory_id)
-      if (inv) {
-        const key = inv.product_id
-        if (!productMap[key]) {
-          productMap[key] = {
-            name: inv.prod_name,
-            sku: inv.SKU,
-            quantity: 0,
-            revenue: 0,
-          }
-        }
-        productMap[key].quantity += order.order_quantity || 0
-        productMap[key].revenue += (order.unit_price || 0) * (order.order_quantity || 0)
-      }
-    })
-
-    const products = Object.values(productMap).sort((a, b) => b.revenue - a.revenue)
-    const totalRevenue = products.reduce((sum, p) => sum + p.revenue, 0)
-
-    setSelectedDayDetail({
-      date: clickedData.date,
-      products,
-      totalRevenue,
-      totalOrders: dayOrders.length,
-    })
+    try {
+      const res = await api.get<DashboardDayDetail>('/store/dashboard/day', {
+        headers: authHeader,
+        params: { day: clickedData.fullDate },
+      })
+      setSelectedDayDetail({
+        date: clickedData.date,
+        products: res.data.products,
+        totalRevenue: res.data.total_revenue,
+        totalOrders: res.data.total_orders,
+      })
+    } catch (err: any) {
+      console.error('Failed to load day details:', err)
+      setError(err?.response?.data?.detail || 'Failed to load day details')
+    }
   }
 
   return (
@@ -300,7 +234,7 @@ export default function AdminDashboard() {
                 <MetricCard
                   title="Low Stock Products"
                   value={kpis.lowStockProducts}
-                  subtitle="Below 10 units"
+                  subtitle={`Below ${lowStockThreshold} units`}
                   icon={<FiAlertTriangle />}
                   color="warning"
                 />
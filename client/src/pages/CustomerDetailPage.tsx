@@ -38,6 +38,8 @@ export default function CustomerDetailPage() {
 
   const [customer, setCustomer] = useState<CustomerResponse | null>(null)
   const [orders, setOrders] = useState<OrderResponse[]>([])
+  // Keyset cursor for the customer's next (older) page of orders; null when everything is loaded
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [error, setError] = useState<string | null>(null)
   const [loading, setLoading] = useState(false)
 
@@ -77,7 +79,7 @@ export default function CustomerDetailPage() {
     })
   }, [orders, statusFilter, startDate, endDate])
 
-  // Group orders into receipts by contact + creator within a 2-minute window (mirrors backend receipt window)
+  // Group orders into receipts by their checkout (receipt header) id
   const groupedReceipts = useMemo(() => {
     type InternalGroup = GroupedReceipt & { lineStatuses: OrderStatus[] }
 
@@ -88,29 +90,24 @@ export default function CustomerDetailPage() {
       return (b.order_id || 0) - (a.order_id || 0)
     })
 
-    const windowMs = 120_000
     const groups: InternalGroup[] = []
+    const byCheckout = new Map<number, InternalGroup>()
 
     for (const order of sorted) {
       const createdAt = order.created_at || ''
       const contactValue = order.person_contact || ''
       const createdBy = order.created_by
-      const last = groups[groups.length - 1]
-      const lastTime = last ? new Date(last.created_at).getTime() : null
-      const currentTime = createdAt ? new Date(createdAt).getTime() : null
-      const withinWindow = lastTime !== null && currentTime !== null && Math.abs(currentTime - lastTime) <= windowMs
-      const sameContact = last ? contactValue === last.contact : false
-      const sameCreator = last ? createdBy === last.created_by : false
-
-      if (last && withinWindow && sameContact && sameCreator) {
-        last.orderIds.push(order.order_id)
-        last.totalQty += order.order_quantity || 0
-        last.lineStatuses.push(order.status)
-        last.status = deriveGroupStatus(last.lineStatuses)
+      const existing = order.checkout_id != null ? byCheckout.get(order.checkout_id) : undefined
+
+      if (existing) {
+        existing.orderIds.push(order.order_id)
+        existing.totalQty += order.order_quantity || 0
+        existing.lineStatuses.push(order.status)
+        existing.status = deriveGroupStatus(existing.lineStatuses)
         continue
       }
 
-      groups.push({
+      const group: InternalGroup = {
         receiptNo: '',
         anchorOrderId: order.order_id,
         contact: contactValue,
@@ -121,7 +118,9 @@ export default function CustomerDetailPage() {
         created_at: createdAt,
         created_by: createdBy,
         lineStatuses: [order.status],
-      })
+      }
+      groups.push(group)
+      if (order.checkout_id != null) byCheckout.set(order.checkout_id, group)
     }
 
     return groups.map((g) => ({
@@ -170,10 +169,11 @@ export default function CustomerDetailPage() {
     }
   }
 
-  const loadOrders = async () => {
+  const loadOrders = async (cursor?: string) => {
     setLoading(true); setError(null)
     try {
       const params: any = { customer_contact: contact }
+      if (cursor) params.cursor = cursor
       if (statusFilter !== 'all') params.status = statusFilter
       if (startDate) params.start_date = new Date(startDate).toISOString()
       if (endDate) {
@@ -181,8 +181,9 @@ export default function CustomerDetailPage() {
         dt.setHours(23, 59, 59, 999)
         params.end_date = dt.toISOString()
       }
-      const { data } = await api.get<OrderResponse[]>(`/orders`, { headers: authHeader, params })
-      setOrders(data)
+      const res = await api.get<OrderResponse[]>(`/orders`, { headers: authHeader, params })
+      setOrders(prev => (cursor ? [...prev, ...res.data] : res.data))
+      setNextCursor(res.headers['x-next-cursor'] ?? null)
     } catch (e: any) {
       setError(extractError(e, 'Failed to load orders'))
     } finally { setLoading(false) }
@@ -403,7 +404,12 @@ export default function CustomerDetailPage() {
                 </table>
               </div>
               <div className="d-flex justify-content-between align-items-center mt-2 flex-wrap gap-2">
-                <small className="text-muted">Showing {paginatedReceipts.length} of {groupedReceipts.length} receipts</small>
+                <div className="d-flex align-items-center gap-2">
+                  <small className="text-muted">Showing {paginatedReceipts.length} of {groupedReceipts.length} receipts</small>
+                  {nextCursor && (
+                    <button className="btn btn-link btn-sm p-0" disabled={loading} onClick={() => loadOrders(nextCursor)}>Load older orders</button>
+                  )}
+                </div>
                 <div className="btn-group">
                   <button className="btn btn-outline-secondary btn-sm" disabled={page === 1} onClick={() => setPage(p => Math.max(1, p - 1))}>Prev</button>
                   <span className="btn btn-outline-secondary btn-sm disabled">Page {page} / {totalPages}</span>
@@ -87,7 +87,7 @@ export default function CustomersPage() {
   }
   const listCustomers = async () => {
     setLoading(true); setError(null)
-    try { const { data } = await api.get<CustomerResponse[]>('/customers?skip=0&limit=50', { headers: authHeader }); setList(data) }
+    try { const { data } = await api.get<CustomerResponse[]>('/customers?limit=50', { headers: authHeader }); setList(data) }
     catch (err:any) { setError(err?.response?.data?.detail || 'List failed') } finally { setLoading(false) }
   }
   const checkCustomer = async () => {
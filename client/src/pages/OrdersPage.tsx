@@ -1,6 +1,7 @@
-import { useEffect, useMemo, useState } from 'react'
+import { useEffect, useMemo, useRef, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { api } from '../api/client'
+import { subscribeStoreEvents } from '../api/events'
 import { useAppSelector } from '../store/hooks'
 import type { RootState } from '../store/store'
 import DashboardLayout from '../components/DashboardLayout'
@@ -10,8 +11,8 @@ import EmptyState from '../components/EmptyState'
 import StatusBadge from '../components/StatusBadge'
 import { useToast } from '../components/Toast'
 import { FiShoppingCart } from 'react-icons/fi'
-import type { OrderCreate, OrderResponse, OrderStatus, InventoryItem } from '../types/order'
-import type { CustomerCreate, CustomerExistsResponse } from '../types/customer'
+import type { OrderBatchCreate, OrderResponse, OrderStatus, OrderStatusBatchUpdate, OrderStatusBatchResponse, InventoryItem, ReceiptResponse } from '../types/order'
+import type { CustomerCreate, CustomerExistsResponse, CustomerMatch } from '../types/customer'
 
 interface CartItem {
   inventoryId: number
@@ -90,6 +91,8 @@ export default function OrdersPage() {
   const [editingReceipt, setEditingReceipt] = useState<GroupedReceipt | null>(null)
   const [editReceiptOrders, setEditReceiptOrders] = useState<OrderResponse[]>([])
   const [page, setPage] = useState(1)
+  // Keyset cursor for the next (older) page of orders; null when everything is loaded
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [pageSize] = useState(10)
   const { addToast } = useToast()
 
@@ -116,7 +119,7 @@ export default function OrdersPage() {
     })
   }, [orders, statusFilter, contactFilter, startDate, endDate])
 
-  // Group orders into receipts by person + creator within a short time window (mirrors backend receipt window)
+  // Group orders into receipts by their checkout (receipt header) id
   const groupedReceipts = useMemo(() => {
     type InternalGroup = GroupedReceipt & { lineStatuses: OrderStatus[] }
 
@@ -127,29 +130,24 @@ export default function OrdersPage() {
       return (b.order_id || 0) - (a.order_id || 0)
     })
 
-    const windowMs = 120_000 // 2 minutes
     const groups: InternalGroup[] = []
+    const byCheckout = new Map<number, InternalGroup>()
 
     for (const order of sorted) {
       const createdAt = order.created_at || ''
       const contact = order.person_contact || ''
       const createdBy = order.created_by
-      const last = groups[groups.length - 1]
-      const lastTime = last ? new Date(last.created_at).getTime() : null
-      const currentTime = createdAt ? new Date(createdAt).getTime() : null
-      const withinWindow = lastTime !== null && currentTime !== null && Math.abs(currentTime - lastTime) <= windowMs
-      const sameContact = last ? contact === last.contact : false
-      const sameCreator = last ? createdBy === last.created_by : false
-
-      if (last && withinWindow && sameContact && sameCreator) {
-        last.orderIds.push(order.order_id)
-        last.totalQty += order.order_quantity || 0
-        last.lineStatuses.push(order.status)
-        last.status = deriveGroupStatus(last.lineStatuses)
+      const existing = order.checkout_id != null ? byCheckout.get(order.checkout_id) : undefined
+
+      if (existing) {
+        existing.orderIds.push(order.order_id)
+        existing.totalQty += order.order_quantity || 0
+        existing.lineStatuses.push(order.status)
+        existing.status = deriveGroupStatus(existing.lineStatuses)
         continue
       }
 
-      groups.push({
+      const group: InternalGroup = {
         receiptNo: '', // filled after grouping
         anchorOrderId: order.order_id,
         contact,
@@ -161,7 +159,9 @@ export default function OrdersPage() {
         created_at: createdAt,
         created_by: createdBy,
         lineStatuses: [order.status],
-      })
+      }
+      groups.push(group)
+      if (order.checkout_id != null) byCheckout.set(order.checkout_id, group)
     }
 
     return groups.map((g) => ({
@@ -196,6 +196,39 @@ export default function OrdersPage() {
     loadOrders()
   }, [])
 
+  // Apply live deltas from the store feed instead of re-fetching the lists
+  const inventoryRef = useRef<InventoryItem[]>([])
+  inventoryRef.current = inventory
+
+  useEffect(() => {
+    return subscribeStoreEvents(
+      token,
+      ({ type, data }) => {
+        if (type === 'stock.changed') {
+          if (data.deleted) {
+            setInventory(prev => prev.filter(i => i.inventory_id !== data.inventory_id))
+            return
+          }
+          if (!inventoryRef.current.some(i => i.inventory_id === data.inventory_id)) {
+            loadInventory()  // a new row; we don't have its SKU and price yet
+            return
+          }
+          setInventory(prev => prev.map(i => i.inventory_id === data.inventory_id
+            ? { ...i, units: data.units, reserved: data.reserved, available: data.available }
+            : i))
+        } else if (type === 'order.created') {
+          setOrders(prev => (prev.some(o => o.order_id === data.order_id) ? prev : [data as OrderResponse, ...prev]))
+        } else if (type === 'order.updated' || type === 'order.status') {
+          setOrders(prev => prev.map(o => (o.order_id === data.order_id ? { ...o, ...data } : o)))
+        }
+      },
+      () => {
+        loadInventory()
+        loadOrders()
+      },
+    )
+  }, [token])
+
   const extractError = (e: any, fallback: string) => {
     const detail = e?.response?.data?.detail
     if (Array.isArray(detail)) return detail.map((d: any) => d.msg).join('; ')
@@ -212,10 +245,11 @@ export default function OrdersPage() {
     }
   }
 
-  const loadOrders = async () => {
+  const loadOrders = async (cursor?: string) => {
     setLoading(true); setError(null)
     try {
       const params: any = {}
+      if (cursor) params.cursor = cursor
       
       // Only send status param if not "all"
       if (statusFilter !== 'all') {
@@ -232,8 +266,9 @@ export default function OrdersPage() {
         params.end_date = dt.toISOString()
       }
       
-      const { data } = await api.get<OrderResponse[]>('/orders', { headers: authHeader, params })
-      setOrders(data)
+      const res = await api.get<OrderResponse[]>('/orders', { headers: authHeader, params })
+      setOrders(prev => (cursor ? [...prev, ...res.data] : res.data))
+      setNextCursor(res.headers['x-next-cursor'] ?? null)
     } catch (e: any) {
       setError(extractError(e, 'Failed to load orders'))
     } finally { setLoading(false) }
@@ -245,6 +280,23 @@ export default function OrdersPage() {
     setContactInfoTone('muted')
   }
 
+  // Type-ahead suggestions for the contact field
+  const [contactMatches, setContactMatches] = useState<CustomerMatch[]>([])
+  useEffect(() => {
+    const q = contact.trim()
+    if (q.length < 2) { setContactMatches([]); return }
+    let cancelled = false
+    const timer = setTimeout(async () => {
+      try {
+        const { data } = await api.get<CustomerMatch[]>('/customers/lookup', { headers: authHeader, params: { q, k: 8 } })
+        if (!cancelled) setContactMatches(data)
+      } catch {
+        if (!cancelled) setContactMatches([])
+      }
+    }, 150)
+    return () => { cancelled = true; clearTimeout(timer) }
+  }, [contact, authHeader])
+
   const handleContactChange = (value: string) => {
     setContact(value)
     resetContactState()
@@ -322,8 +374,8 @@ export default function OrdersPage() {
     const totalQty = (existingInCart?.quantity || 0) + selectedQty
     
     // Check against available inventory
-    if (totalQty > item.units) {
-      const available = item.units - (existingInCart?.quantity || 0)
+    if (totalQty > item.available) {
+      const available = item.available - (existingInCart?.quantity || 0)
       addToast('error', `Insufficient stock. Available: ${available > 0 ? available : 0}, Requested: ${selectedQty}`)
       return
     }
@@ -355,8 +407,8 @@ export default function OrdersPage() {
       removeFromCart(inventoryId)
       return
     }
-    if (newQty > item.units) {
-      addToast('error', `Cannot exceed available stock (${item.units})`)
+    if (newQty > item.available) {
+      addToast('error', `Cannot exceed available stock (${item.available})`)
       return
     }
     setCart(cart.map(c => c.inventoryId === inventoryId ? { ...c, quantity: newQty } : c))
@@ -383,38 +435,35 @@ export default function OrdersPage() {
     }
 
     setLoading(true)
-    let created = 0
-    const lines: ReceiptLine[] = []
-    for (const item of cart) {
-      try {
-        const payload: OrderCreate = { contact, inventory_id: item.inventoryId, order_quantity: item.quantity }
-        const { data } = await api.post<OrderResponse>('/orders', payload, { headers: authHeader })
-        created++
-        lines.push({
-          orderId: data.order_id,
-          status: data.status,
-          inventoryId: item.inventoryId,
-          SKU: item.SKU,
-          prodName: item.prodName,
-          quantity: item.quantity,
-          unitPrice: item.unitPrice,
-          subtotal: item.unitPrice * item.quantity,
-        })
-      } catch (e: any) {
-        addToast('error', `Failed to create order for ${item.SKU}: ${e?.response?.data?.detail || 'Error'}`)
+    try {
+      // Whole cart is created in one transaction; the response is the receipt
+      const payload: OrderBatchCreate = {
+        contact,
+        lines: cart.map(item => ({ inventory_id: item.inventoryId, order_quantity: item.quantity })),
       }
-    }
-    setLoading(false)
-
-    if (created === cart.length) {
-      addToast('success', `${created} order(s) created successfully!`)
+      const { data } = await api.post<ReceiptResponse>('/orders/batch', payload, { headers: authHeader })
+      const lines: ReceiptLine[] = data.lines.map(l => ({
+        orderId: l.order_id,
+        status: l.status,
+        inventoryId: l.inventory_id,
+        SKU: l.SKU,
+        prodName: l.prod_name,
+        quantity: l.quantity,
+        unitPrice: Number(l.unit_price ?? 0),
+        subtotal: Number(l.subtotal ?? 0),
+      }))
+      addToast('success', `${lines.length} order(s) created successfully!`)
       // Snapshot created orders with statuses for receipt before clearing
       setReceiptLines(lines)
-      setReceiptContact(lines.length > 0 ? (dataRefPersonContact(lines) || contact) : '')
+      setReceiptContact(data.person_contact || contact)
       setCart([])
       setContact('')
       setContactInfo('')
       loadOrders()
+    } catch (e: any) {
+      addToast('error', `Failed to create orders: ${e?.response?.data?.detail || 'Error'}`)
+    } finally {
+      setLoading(false)
     }
   }
 
@@ -464,22 +513,18 @@ export default function OrdersPage() {
     }
   }
 
-  // Helper to try fetching person_contact from latest order list
-  const dataRefPersonContact = (lines: ReceiptLine[]) => {
-    // Since backend returns person_contact in create response, receiptContact is set above.
-    // As a fallback, find contact from current orders state matching any created order.
-    const ids = new Set(lines.map(l => l.orderId))
-    const match = orders.find(o => ids.has(o.order_id) && o.person_contact)
-    return match?.person_contact ?? ''
-  }
-
   const updateReceiptStatus = async (receipt: GroupedReceipt, status: OrderStatus) => {
     setActioningReceipt(receipt.receiptNo)
     try {
-      await Promise.all(
-        receipt.orderIds.map(orderId => api.put(`/orders/${orderId}/status`, { status }, { headers: authHeader }))
-      )
-      addToast('success', `Receipt ${receipt.receiptNo} updated to ${status}`)
+      // One transaction for the whole receipt; the server reports each line separately
+      const payload: OrderStatusBatchUpdate = { order_ids: receipt.orderIds, status }
+      const { data } = await api.put<OrderStatusBatchResponse>('/orders/status:batch', payload, { headers: authHeader })
+      if (data.failed > 0) {
+        const first = data.results.find(r => !r.ok)
+        addToast('warning', `Receipt ${receipt.receiptNo}: ${data.updated} updated, ${data.failed} failed${first?.detail ? ` (${first.detail})` : ''}`)
+      } else {
+        addToast('success', `Receipt ${receipt.receiptNo} updated to ${status}`)
+      }
       await loadOrders()
       // Refresh open receipt view if it's the one we just updated
       if (activeReceiptOrderId && receipt.orderIds.includes(activeReceiptOrderId)) {
@@ -566,7 +611,12 @@ export default function OrdersPage() {
             <div className="row g-3 mb-2 align-items-center">
               <div className="col-12 col-sm-6 col-md-4">
                 <label className="form-label">Customer Contact</label>
-                <input className="form-control" value={contact} onChange={e => handleContactChange(e.target.value)} onBlur={checkContact} />
+                <input className="form-control" list="contact-matches" value={contact} onChange={e => handleContactChange(e.target.value)} onBlur={checkContact} />
+                <datalist id="contact-matches">
+                  {contactMatches.map(m => (
+                    <option key={m.person_id} value={m.person_contact}>{m.person_name} · {m.person_email}</option>
+                  ))}
+                </datalist>
               </div>
               <div className="col-12 col-sm-6 col-md-4">
                 <label className="form-label">Product</label>
@@ -575,7 +625,7 @@ export default function OrdersPage() {
                   {inventory.length === 0 && <option value="" disabled>No products</option>}
                   {inventory.map(i => (
                     <option key={i.inventory_id} value={i.inventory_id}>
-                      {i.SKU} - {i.prod_name} (units: {i.units})
+                      {i.SKU} - {i.prod_name} (available: {i.available})
                     </option>
                   ))}
                 </select>
@@ -586,13 +636,13 @@ export default function OrdersPage() {
                   className="form-control" 
                   type="number" 
                   min={1} 
-                  max={selectedInventoryId ? (inventory.find(i => i.inventory_id === selectedInventoryId)?.units || 1) - (cart.find(c => c.inventoryId === selectedInventoryId)?.quantity || 0) : undefined}
+                  max={selectedInventoryId ? (inventory.find(i => i.inventory_id === selectedInventoryId)?.available || 1) - (cart.find(c => c.inventoryId === selectedInventoryId)?.quantity || 0) : undefined}
                   value={selectedQty} 
                   onChange={e => setSelectedQty(Math.max(1, Number(e.target.value)))} 
                 />
                 {selectedInventoryId && (
                   <small className="text-muted">
-                    Available: {Math.max(0, (inventory.find(i => i.inventory_id === selectedInventoryId)?.units || 0) - (cart.find(c => c.inventoryId === selectedInventoryId)?.quantity || 0))}
+                    Available: {Math.max(0, (inventory.find(i => i.inventory_id === selectedInventoryId)?.available || 0) - (cart.find(c => c.inventoryId === selectedInventoryId)?.quantity || 0))}
                   </small>
                 )}
               </div>
@@ -626,7 +676,7 @@ export default function OrdersPage() {
                   <tbody>
                     {cart.map(item => {
                       const invItem = inventory.find(i => i.inventory_id === item.inventoryId)
-                      const maxQty = invItem?.units || item.quantity
+                      const maxQty = invItem?.available || item.quantity
                       return (
                         <tr key={item.inventoryId}>
                           <td>{item.SKU}</td>
@@ -814,7 +864,12 @@ export default function OrdersPage() {
                   </table>
                 </div>
                 <div className="d-flex justify-content-between align-items-center mt-2 flex-wrap gap-2">
-                  <small className="text-muted">Showing {paginatedReceipts.length} of {groupedReceipts.length} receipts</small>
+                  <div className="d-flex align-items-center gap-2">
+                    <small className="text-muted">Showing {paginatedReceipts.length} of {groupedReceipts.length} receipts</small>
+                    {nextCursor && (
+                      <button className="btn btn-link btn-sm p-0" disabled={loading} onClick={() => loadOrders(nextCursor)}>Load older orders</button>
+                    )}
+                  </div>
                   <div className="btn-group">
                     <button className="btn btn-outline-secondary btn-sm" disabled={page === 1} onClick={() => setPage(p => Math.max(1, p - 1))}>Prev</button>
                     <span className="btn btn-outline-secondary btn-sm disabled">Page {page} / {totalPages}</span>
@@ -26,6 +26,7 @@ export default function ProductsPage() {
 
   // UX: search & pagination
   const [search, setSearch] = useState('')
+  const [searchResults, setSearchResults] = useState<ProductResponse[] | null>(null)
   const [pageSize, setPageSize] = useState(10)
   const [page, setPage] = useState(1)
   
@@ -123,16 +124,30 @@ export default function ProductsPage() {
     }
   }
 
+  // Server-side search (best matches first), debounced while typing
+  useEffect(() => {
+    const q = search.trim()
+    if (!q) { setSearchResults(null); return }
+    let cancelled = false
+    const timer = setTimeout(async () => {
+      try {
+        const { data } = await api.get<ProductResponse[]>('/products/search', {
+          params: { q, limit: 100 },
+          headers: { Authorization: `Bearer ${token}` }
+        })
+        if (!cancelled) setSearchResults(data)
+      } catch (err: any) {
+        if (!cancelled) addToast('error', err?.response?.data?.detail || 'Search failed')
+      }
+    }, 200)
+    return () => { cancelled = true; clearTimeout(timer) }
+  }, [search, products])
+
   // Derived lists for UX
   const filtered = useMemo(() => {
-    const q = search.trim().toLowerCase()
-    if (!q) return products
-    return products.filter(p => (
-      p.SKU.toLowerCase().includes(q) ||
-      p.prod_name.toLowerCase().includes(q) ||
-      p.prod_category.toLowerCase().includes(q)
-    ))
-  }, [products, search])
+    if (!search.trim()) return products
+    return searchResults ?? []
+  }, [products, search, searchResults])
 
   // Sort filtered products
   const sorted = useMemo(() => {
@@ -1,9 +1,11 @@
 import { useEffect, useState, useMemo } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { api } from '../api/client'
+import { subscribeStoreEvents } from '../api/events'
 import { useAppSelector, useAppDispatch } from '../store/hooks'
 import { setSettings } from '../store/storeSlice'
 import type { RootState } from '../store/store'
+import type { TopProduct, TopProductsResponse } from '../types/store'
 import DashboardLayout from '../components/DashboardLayout'
 import PageHeader from '../components/PageHeader'
 import Loader from '../components/Loader'
@@ -28,19 +30,20 @@ interface RecentOrder {
   created_at: string
 }
 
-interface TopProduct {
-  SKU: string
-  prod_name: string
-  totalQuantity: number
-  totalSales: number
-}
-
 interface ChartDataPoint {
   name: string
   quantity: number
   sales: number
 }
 
+const toRecentOrder = (o: any): RecentOrder => ({
+  order_id: o.order_id,
+  person_contact: o.person_contact || 'N/A',
+  status: o.status,
+  order_quantity: o.order_quantity,
+  created_at: new Date(o.created_at).toLocaleString(),
+})
+
 export default function StaffDashboard() {
   const dispatch = useAppDispatch()
   const token = useAppSelector((state: RootState) => state.auth.token)
@@ -50,6 +53,7 @@ export default function StaffDashboard() {
 
   const [recentOrders, setRecentOrders] = useState<RecentOrder[]>([])
   const [topProducts, setTopProducts] = useState<TopProduct[]>([])
+  const [lookbackDays, setLookbackDays] = useState(30)
   const [chartData, setChartData] = useState<ChartDataPoint[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
@@ -58,6 +62,21 @@ export default function StaffDashboard() {
     loadDashboardData()
   }, [])
 
+  // Keep Recent Orders current from the live feed
+  useEffect(() => {
+    return subscribeStoreEvents(
+      token,
+      ({ type, data }) => {
+        if (type === 'order.created') {
+          setRecentOrders(prev => [toRecentOrder(data), ...prev.filter(o => o.order_id !== data.order_id)].slice(0, 10))
+        } else if (type === 'order.updated' || type === 'order.status') {
+          setRecentOrders(prev => prev.map(o => (o.order_id === data.order_id ? toRecentOrder(data) : o)))
+        }
+      },
+      () => loadDashboardData(),
+    )
+  }, [token])
+
   const loadDashboardData = async () => {
     setLoading(true)
     setError(null)
@@ -70,78 +89,30 @@ export default function StaffDashboard() {
         console.error('Failed to load store settings:', err)
       }
 
-      // Fetch all orders (recent ones)
+      // Newest orders come first; one page of 10 is all we show
       const ordersRes = await api.get('/orders', {
         headers: authHeader,
-        params: {
-          start_date: new Date(Date.now() - 30 * 24 * 60 * 60 * 1000).toISOString(),
-        },
+        params: { limit: 10 },
       })
 
-      const allOrders = ordersRes.data
-
-      // Get recent orders (limit to 10)
-      const recent = allOrders
-        .sort((a: any, b: any) => {
-          const dateA = new Date(a.created_at).getTime()
-          const dateB = new Date(b.created_at).getTime()
-          return dateB - dateA
-        })
-        .slice(0, 10)
-
-      setRecentOrders(
-        recent.map((o: any) => ({
-          order_id: o.order_id,
-          person_contact: o.person_contact || 'N/A',
-          status: o.status,
-          order_quantity: o.order_quantity,
-          created_at: new Date(o.created_at).toLocaleString(),
-        }))
-      )
-
-      // Fetch inventory to find top-selling products
-      const inventoryRes = await api.get('/orders/inventory', { headers: authHeader })
-      const inventory = inventoryRes.data
-
-      // Aggregate quantities and sales by product (confirmed and shipped orders count as sales)
-      const productQuantities: Record<string, { SKU: string; prod_name: string; quantity: number; sales: number; unitPrice: number }> = {}
+      setRecentOrders(ordersRes.data.map(toRecentOrder))
 
-      allOrders
-        .filter((order: any) => order.status === 'confirmed' || order.status === 'shipped')
-        .forEach((order: any) => {
-          const invId = order.inventory_id
-          const inv = inventory.find((i: any) => i.inventory_id === invId)
-          if (inv) {
-            const key = inv.product_id
-            const unitPrice = order.unit_price || inv.unit_price || 0
-            if (!productQuantities[key]) {
-              productQuantities[key] = {
-                SKU: inv.SKU,
-                prod_name: inv.prod_name,
-                quantity: 0,
-                sales: 0,
-                unitPrice: unitPrice,
-              }
-            }
-            productQuantities[key].quantity += order.order_quantity || 0
-            productQuantities[key].sales += (order.order_quantity || 0) * unitPrice
-          }
-        })
-
-      // Sort and get top 5
-      const topFive = Object.values(productQuantities)
-        .sort((a, b) => b.sales - a.sales)
-        .slice(0, 5)
-        .map(p => ({ SKU: p.SKU, prod_name: p.prod_name, totalQuantity: p.quantity, totalSales: Math.round(p.sales * 100) / 100 }))
+      // Ranked and cached server-side over the store's sales lookback window
+      const topRes = await api.get<TopProductsResponse>('/store/top-products', {
+        headers: authHeader,
+        params: { n: 5, by: 'revenue' },
+      })
+      const topFive = topRes.data.products
 
       setTopProducts(topFive)
+      setLookbackDays(topRes.data.lookback_days)
 
       // Chart data
       setChartData(
         topFive.map((p) => ({
-          name: p.SKU,
-          quantity: p.totalQuantity,
-          sales: p.totalSales,
+          name: p.sku,
+          quantity: p.units,
+          sales: p.revenue,
         }))
       )
     } catch (err: any) {
@@ -217,7 +188,9 @@ export default function StaffDashboard() {
               <div className="card-body">
                 <div className="d-flex align-items-center gap-2 mb-3">
                   <FiTrendingUp size={24} className="text-success" />
-                  <h5 className="card-title mb-0">Top 5 Selling Products (Last 30 Days)</h5>
+                  <h5 className="card-title mb-0">
+                    Top 5 Selling Products ({lookbackDays > 0 ? `Last ${lookbackDays} Days` : 'All Time'})
+                  </h5>
                 </div>
                 <p className="text-muted small mb-4">Click rows to view all products</p>
 
@@ -239,17 +212,17 @@ export default function StaffDashboard() {
                           </thead>
                           <tbody>
                             {topProducts.map((product) => (
-                              <tr key={product.SKU} onClick={() => navigate('/products')}>
-                                <td className="fw-medium">{product.SKU}</td>
-                                <td>{product.prod_name}</td>
+                              <tr key={product.product_id} onClick={() => navigate('/products')}>
+                                <td className="fw-medium">{product.sku}</td>
+                                <td>{product.name}</td>
                                 <td className="text-end">
                                   <span className="badge bg-primary-subtle text-primary-emphasis">
-                                    {product.totalQuantity}
+                                    {product.units}
                                   </span>
                                 </td>
                                 <td className="text-end">
                                   <span className="badge bg-success-subtle text-success-emphasis">
-                                    {currency}{product.totalSales.toFixed(2)}
+                                    {currency}{product.revenue.toFixed(2)}
                                   </span>
                                 </td>
                               </tr>
@@ -20,6 +20,13 @@ export interface CustomerResponse {
   person_address: string
 }
 
+export interface CustomerMatch {
+  person_id: number
+  person_name: string
+  person_contact: string
+  person_email: string
+}
+
 export interface CustomerExistsResponse {
   exists: boolean
   person_id?: number
@@ -4,6 +4,16 @@ export interface OrderCreate {
   order_quantity: number
 }
 
+export interface OrderLineCreate {
+  inventory_id: number
+  order_quantity: number
+}
+
+export interface OrderBatchCreate {
+  contact: string
+  lines: OrderLineCreate[]
+}
+
 export interface OrderUpdate {
   inventory_id?: number
   order_quantity?: number
@@ -15,6 +25,24 @@ export interface OrderStatusUpdate {
   status: OrderStatus
 }
 
+export interface OrderStatusBatchUpdate {
+  order_ids: number[]
+  status: OrderStatus
+}
+
+export interface OrderStatusResult {
+  order_id: number
+  ok: boolean
+  status?: OrderStatus | null
+  detail?: string | null
+}
+
+export interface OrderStatusBatchResponse {
+  updated: number
+  failed: number
+  results: OrderStatusResult[]
+}
+
 export interface OrderResponse {
   order_id: number
   status: OrderStatus
@@ -26,6 +54,8 @@ export interface OrderResponse {
   created_at?: string
   unit_price?: number
   prod_name?: string
+  checkout_id?: number
+  stock_reserved?: boolean
 }
 
 export interface InventoryItem {
@@ -34,5 +64,32 @@ export interface InventoryItem {
   SKU: string
   prod_name: string
   units: number
+  reserved: number
+  available: number
   unit_price: number
 }
+
+export interface ReceiptLineResponse {
+  order_id: number
+  status: OrderStatus
+  inventory_id: number
+  SKU: string
+  prod_name: string
+  quantity: number
+  unit_price: number
+  subtotal: number
+  created_at: string
+}
+
+export interface ReceiptResponse {
+  order_id: number
+  checkout_id: number
+  person_id: number
+  person_name: string
+  person_contact: string
+  person_email: string
+  person_address: string
+  created_at: string
+  lines: ReceiptLineResponse[]
+  grand_total: number
+}
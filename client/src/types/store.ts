@@ -7,3 +7,68 @@ export interface StoreSettings {
   reorder_horizon_days: number
   currency: string
 }
+
+export interface DashboardDay {
+  date: string
+  orders: number
+  sales: number
+}
+
+export interface DashboardProductSales {
+  product_id: number
+  name: string
+  sales: number
+}
+
+export interface DashboardResponse {
+  active_products: number
+  orders_last_7_days: number
+  low_stock_products: number
+  low_stock_threshold: number
+  total_sales_last_30_days: number
+  daily: DashboardDay[]
+  top_products: DashboardProductSales[]
+}
+
+export interface DashboardDayProduct {
+  product_id: number
+  name: string
+  sku: string
+  quantity: number
+  revenue: number
+}
+
+export interface DashboardDayDetail {
+  date: string
+  total_orders: number
+  total_revenue: number
+  products: DashboardDayProduct[]
+}
+
+export interface TopProduct {
+  product_id: number
+  sku: string
+  name: string
+  units: number
+  revenue: number
+}
+
+export interface TopProductsResponse {
+  lookback_days: number
+  by: 'units' | 'revenue'
+  products: TopProduct[]
+}
+
+export interface LowStockItem {
+  inventory_id: number
+  product_id: number
+  sku: string
+  name: string
+  units: number
+}
+
+export interface LowStockResponse {
+  threshold: number
+  version: number
+  items: LowStockItem[]
+}
@@ -0,0 +1,69 @@
+"""use unset-credential marker as person.password default
+
+Revision ID: l8m9n0p1q2r3
+Revises: k7l8m9n0p1q2
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'l8m9n0p1q2r3'
+down_revision: Union[str, Sequence[str], None] = 'k7l8m9n0p1q2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match app.core.security.UNSET_PASSWORD
+UNSET_PASSWORD = '!'
+
+
+def upgrade() -> None:
+    """Default person.password to the 'no credential set' marker.
+
+    Only the default changes. Existing rows, including any still holding the
+    old 'password' default, are left as they are: turning them into the marker
+    would let them log in with their contact number, which they could not before.
+    """
+    op.alter_column('person', 'password',
+                    existing_type=sa.String(255),
+                    existing_nullable=False,
+                    server_default=UNSET_PASSWORD)
+
+
+def downgrade() -> None:
+    """Restore the old default and drop the marker, which older code cannot read.
+
+    Customers created by staff (no users row) get the hash of their contact,
+    their default password, as older code stored it. Any other row on the
+    marker only got it from the column default, so it goes back to 'password'.
+    """
+    from passlib.context import CryptContext
+
+    pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            "SELECT p.person_id, p.person_contact FROM person p "
+            "WHERE p.password = :marker "
+            "AND NOT EXISTS (SELECT 1 FROM users u WHERE u.person_id = p.person_id)"
+        ),
+        {"marker": UNSET_PASSWORD},
+    ).fetchall()
+    for person_id, contact in rows:
+        bind.execute(
+            sa.text("UPDATE person SET password = :pwd WHERE person_id = :pid"),
+            {"pwd": pwd_context.hash(contact), "pid": person_id},
+        )
+    bind.execute(
+        sa.text("UPDATE person SET password = 'password' WHERE password = :marker"),
+        {"marker": UNSET_PASSWORD},
+    )
+
+    op.alter_column('person', 'password',
+                    existing_type=sa.String(255),
+                    existing_nullable=False,
+                    server_default='password')
@@ -0,0 +1,110 @@
+"""add checkout receipt header and orders.checkout_id
+
+Revision ID: m9n0o1p2q3r4
+Revises: l8m9n0p1q2r3
+Create Date: 2026-10-17 00:10:00.000000
+
+"""
+from datetime import timedelta
+from decimal import Decimal
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'm9n0o1p2q3r4'
+down_revision: Union[str, Sequence[str], None] = 'l8m9n0p1q2r3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Window used by the old time-based receipt grouping
+RECEIPT_WINDOW = timedelta(seconds=120)
+
+
+def upgrade() -> None:
+    """Create checkout table, link orders to it and backfill with the old grouping heuristic."""
+    op.create_table(
+        'checkout',
+        sa.Column('checkout_id', sa.Integer(), primary_key=True),
+        sa.Column('person_id', sa.Integer(), sa.ForeignKey('person.person_id'), nullable=False),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.user_id'), nullable=False),
+        sa.Column('store_id', sa.Integer(), sa.ForeignKey('store.store_id'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('line_count', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('total_quantity', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('total_amount', sa.Numeric(12, 2), nullable=False, server_default=sa.text('0')),
+    )
+    op.create_index('ix_checkout_checkout_id', 'checkout', ['checkout_id'])
+    op.add_column('orders', sa.Column('checkout_id', sa.Integer(), nullable=True))
+
+    # Backfill: same store, person and creator, within RECEIPT_WINDOW of the group's first order
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("""
+        SELECT o.order_id, o.person_id, o.created_by, o.created_at, o.order_quantity,
+               i.store_id, p.unit_price
+        FROM orders o
+        JOIN inventory i ON i.inventory_id = o.inventory_id
+        JOIN product p ON p.prod_id = i.product_id
+        ORDER BY i.store_id, o.person_id, o.created_by, o.created_at, o.order_id
+    """)).fetchall()
+
+    groups = []
+    for r in rows:
+        last = groups[-1] if groups else None
+        if (
+            last
+            and (last['store_id'], last['person_id'], last['created_by']) == (r.store_id, r.person_id, r.created_by)
+            and r.created_at is not None and last['created_at'] is not None
+            and r.created_at - last['created_at'] <= RECEIPT_WINDOW
+        ):
+            last['order_ids'].append(r.order_id)
+            last['total_quantity'] += r.order_quantity
+            last['total_amount'] += Decimal(r.unit_price or 0) * r.order_quantity
+            continue
+        groups.append({
+            'store_id': r.store_id,
+            'person_id': r.person_id,
+            'created_by': r.created_by,
+            'created_at': r.created_at,
+            'order_ids': [r.order_id],
+            'total_quantity': r.order_quantity,
+            'total_amount': Decimal(r.unit_price or 0) * r.order_quantity,
+        })
+
+    for g in groups:
+        result = bind.execute(
+            sa.text("""
+                INSERT INTO checkout (person_id, created_by, store_id, created_at, line_count, total_quantity, total_amount)
+                VALUES (:person_id, :created_by, :store_id, :created_at, :line_count, :total_quantity, :total_amount)
+            """),
+            {
+                'person_id': g['person_id'],
+                'created_by': g['created_by'],
+                'store_id': g['store_id'],
+                'created_at': g['created_at'],
+                'line_count': len(g['order_ids']),
+                'total_quantity': g['total_quantity'],
+                'total_amount': g['total_amount'],
+            },
+        )
+        bind.execute(
+            sa.text("UPDATE orders SET checkout_id = :cid WHERE order_id IN :ids").bindparams(
+                sa.bindparam('ids', expanding=True)
+            ),
+            {'cid': result.lastrowid, 'ids': g['order_ids']},
+        )
+
+    op.alter_column('orders', 'checkout_id', existing_type=sa.Integer(), nullable=False)
+    op.create_index('ix_orders_checkout_id', 'orders', ['checkout_id'])
+    op.create_foreign_key('fk_orders_checkout', 'orders', 'checkout', ['checkout_id'], ['checkout_id'])
+
+
+def downgrade() -> None:
+    """Drop orders.checkout_id and the checkout table."""
+    op.drop_constraint('fk_orders_checkout', 'orders', type_='foreignkey')
+    op.drop_index('ix_orders_checkout_id', table_name='orders')
+    op.drop_column('orders', 'checkout_id')
+    op.drop_index('ix_checkout_checkout_id', table_name='checkout')
+    op.drop_table('checkout')
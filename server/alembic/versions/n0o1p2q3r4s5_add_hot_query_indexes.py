@@ -0,0 +1,52 @@
+"""add indexes for hot order, inventory, product and person queries
+
+Revision ID: n0o1p2q3r4s5
+Revises: m9n0o1p2q3r4
+Create Date: 2026-10-17 00:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'n0o1p2q3r4s5'
+down_revision: Union[str, Sequence[str], None] = 'm9n0o1p2q3r4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns, foreign-key column the index can back or None)
+INDEXES = [
+    ('ix_orders_created_at', 'orders', ['created_at'], None),
+    ('ix_orders_inventory_status', 'orders', ['inventory_id', 'status'], 'inventory_id'),
+    ('ix_orders_person_created', 'orders', ['person_id', 'created_at'], 'person_id'),
+    ('ix_inventory_store_product', 'inventory', ['store_id', 'product_id'], 'store_id'),
+    ('ix_product_store_sku', 'product', ['store_id', 'SKU'], 'store_id'),
+    ('ix_person_person_email', 'person', ['person_email'], None),
+]
+
+
+def upgrade() -> None:
+    """Add indexes matching the Index()/index=True declarations in app/models."""
+    for name, table, columns, _ in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Drop the indexes again.
+
+    MySQL silently drops its implicit foreign-key index once a composite index
+    leading with the same column exists, so recreate a plain one first where needed.
+    """
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns, fk_column in reversed(INDEXES):
+        if fk_column:
+            others = [
+                ix for ix in inspector.get_indexes(table)
+                if ix['name'] != name and ix['column_names'][:1] == [fk_column]
+            ]
+            if not others:
+                op.create_index(f'ix_{table}_{fk_column}', table, [fk_column])
+        op.drop_index(name, table_name=table)
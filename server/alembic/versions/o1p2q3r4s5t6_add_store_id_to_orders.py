@@ -0,0 +1,38 @@
+"""denormalize store_id onto orders
+
+Revision ID: o1p2q3r4s5t6
+Revises: n0o1p2q3r4s5
+Create Date: 2026-10-17 00:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'o1p2q3r4s5t6'
+down_revision: Union[str, Sequence[str], None] = 'n0o1p2q3r4s5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add orders.store_id, backfill it from inventory and index it with created_at."""
+    op.add_column('orders', sa.Column('store_id', sa.Integer(), nullable=True))
+    op.execute("""
+        UPDATE orders o
+        INNER JOIN inventory i ON i.inventory_id = o.inventory_id
+        SET o.store_id = i.store_id
+    """)
+    op.alter_column('orders', 'store_id', existing_type=sa.Integer(), nullable=False)
+    op.create_index('ix_orders_store_created', 'orders', ['store_id', 'created_at'])
+    op.create_foreign_key('fk_orders_store', 'orders', 'store', ['store_id'], ['store_id'])
+
+
+def downgrade() -> None:
+    """Drop orders.store_id."""
+    op.drop_constraint('fk_orders_store', 'orders', type_='foreignkey')
+    op.drop_index('ix_orders_store_created', table_name='orders')
+    op.drop_column('orders', 'store_id')
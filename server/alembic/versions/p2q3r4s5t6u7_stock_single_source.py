@@ -0,0 +1,57 @@
+"""keep stock only in inventory.units
+
+Revision ID: p2q3r4s5t6u7
+Revises: o1p2q3r4s5t6
+Create Date: 2026-10-17 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'p2q3r4s5t6u7'
+down_revision: Union[str, Sequence[str], None] = 'o1p2q3r4s5t6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Reconcile product.inventory into inventory.units, then drop product.inventory.
+
+    inventory.units is what order creation validates against, so it wins where
+    the two copies disagree. Products without an inventory row get one seeded
+    from product.inventory so no stock is lost. product.inventory is then read
+    as a sum over inventory.units, which the new product_id index serves.
+    """
+    op.execute("""
+        INSERT INTO inventory (store_id, product_id, units)
+        SELECT p.store_id, p.prod_id, p.inventory
+        FROM product p
+        LEFT JOIN inventory i ON i.product_id = p.prod_id AND i.store_id = p.store_id
+        WHERE i.inventory_id IS NULL
+    """)
+    op.drop_column('product', 'inventory')
+
+    inspector = sa.inspect(op.get_bind())
+    if 'ix_inventory_product' not in {ix['name'] for ix in inspector.get_indexes('inventory')}:
+        op.create_index('ix_inventory_product', 'inventory', ['product_id'])
+
+
+def downgrade() -> None:
+    """Restore product.inventory as a stored copy of the summed inventory units.
+
+    ix_inventory_product is left in place: MySQL drops its implicit foreign key
+    index once another index covers product_id, so the FK now depends on it.
+    """
+    op.add_column('product', sa.Column('inventory', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE product p
+        INNER JOIN (
+            SELECT product_id, SUM(units) AS units FROM inventory GROUP BY product_id
+        ) i ON i.product_id = p.prod_id
+        SET p.inventory = i.units
+    """)
+    op.alter_column('product', 'inventory', existing_type=sa.Integer(), server_default=None)
@@ -0,0 +1,42 @@
+"""add striped stock counters
+
+Revision ID: q3r4s5t6u7v8
+Revises: p2q3r4s5t6u7
+Create Date: 2026-10-17 01:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'q3r4s5t6u7v8'
+down_revision: Union[str, Sequence[str], None] = 'p2q3r4s5t6u7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add inventory.stripes and the inventory_stripe slot table (every row starts unstriped)."""
+    op.add_column('inventory', sa.Column('stripes', sa.Integer(), nullable=False, server_default='0'))
+    op.create_table(
+        'inventory_stripe',
+        sa.Column('inventory_id', sa.Integer(), sa.ForeignKey('inventory.inventory_id'), primary_key=True),
+        sa.Column('slot', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('units', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    """Fold striped stock back into inventory.units, then drop the stripes."""
+    op.execute("""
+        UPDATE inventory i
+        INNER JOIN (
+            SELECT inventory_id, SUM(units) AS units FROM inventory_stripe GROUP BY inventory_id
+        ) s ON s.inventory_id = i.inventory_id
+        SET i.units = i.units + s.units
+    """)
+    op.drop_table('inventory_stripe')
+    op.drop_column('inventory', 'stripes')
@@ -0,0 +1,51 @@
+"""add stock reservation counters
+
+Revision ID: r4s5t6u7v8w9
+Revises: q3r4s5t6u7v8
+Create Date: 2026-10-17 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'r4s5t6u7v8w9'
+down_revision: Union[str, Sequence[str], None] = 'q3r4s5t6u7v8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add reserved_units to inventory and its stripes, flag pending orders as holding stock.
+
+    Existing pending orders are backfilled as reserved and their quantities summed
+    onto inventory.reserved_units (on the row itself, even when striped; stock moves
+    fall back to row-wide totals when no single slot holds a reservation).
+    """
+    op.add_column('inventory', sa.Column('reserved_units', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('inventory_stripe', sa.Column('reserved_units', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('orders', sa.Column('stock_reserved', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.create_index('ix_orders_reserved_created', 'orders', ['stock_reserved', 'created_at'])
+
+    op.execute("UPDATE orders SET stock_reserved = 1 WHERE status = 'pending'")
+    op.execute("""
+        UPDATE inventory i
+        INNER JOIN (
+            SELECT inventory_id, SUM(order_quantity) AS qty
+            FROM orders
+            WHERE status = 'pending'
+            GROUP BY inventory_id
+        ) o ON o.inventory_id = i.inventory_id
+        SET i.reserved_units = o.qty
+    """)
+
+
+def downgrade() -> None:
+    """Drop the reservation counters."""
+    op.drop_index('ix_orders_reserved_created', table_name='orders')
+    op.drop_column('orders', 'stock_reserved')
+    op.drop_column('inventory_stripe', 'reserved_units')
+    op.drop_column('inventory', 'reserved_units')
@@ -0,0 +1,46 @@
+"""add daily sales rollup
+
+Revision ID: s5t6u7v8w9x0
+Revises: r4s5t6u7v8w9
+Create Date: 2026-10-17 02:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 's5t6u7v8w9x0'
+down_revision: Union[str, Sequence[str], None] = 'r4s5t6u7v8w9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create daily_sales and backfill it from confirmed/shipped orders at current prices."""
+    op.create_table(
+        'daily_sales',
+        sa.Column('store_id', sa.Integer(), sa.ForeignKey('store.store_id'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('product_id', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('orders', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('units', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Numeric(12, 2), nullable=False, server_default='0'),
+    )
+    op.execute("""
+        INSERT INTO daily_sales (store_id, day, product_id, orders, units, revenue)
+        SELECT o.store_id, DATE(o.created_at), i.product_id,
+               COUNT(o.order_id), SUM(o.order_quantity), SUM(o.order_quantity * p.unit_price)
+        FROM orders o
+        INNER JOIN inventory i ON i.inventory_id = o.inventory_id
+        INNER JOIN product p ON p.prod_id = i.product_id
+        WHERE o.status IN ('confirmed', 'shipped')
+        GROUP BY o.store_id, DATE(o.created_at), i.product_id
+    """)
+
+
+def downgrade() -> None:
+    """Drop daily_sales."""
+    op.drop_table('daily_sales')
@@ -0,0 +1,33 @@
+"""add store version counters
+
+Revision ID: t6u7v8w9x0y1
+Revises: s5t6u7v8w9x0
+Create Date: 2026-10-17 03:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 't6u7v8w9x0y1'
+down_revision: Union[str, Sequence[str], None] = 's5t6u7v8w9x0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create store_version; rows are added by the first write to each store/scope."""
+    op.create_table(
+        'store_version',
+        sa.Column('store_id', sa.Integer(), sa.ForeignKey('store.store_id'), primary_key=True),
+        sa.Column('scope', sa.String(length=16), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    """Drop store_version."""
+    op.drop_table('store_version')
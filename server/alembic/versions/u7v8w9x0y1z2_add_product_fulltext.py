@@ -0,0 +1,32 @@
+"""add product fulltext index
+
+Revision ID: u7v8w9x0y1z2
+Revises: t6u7v8w9x0y1
+Create Date: 2026-10-17 03:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'u7v8w9x0y1z2'
+down_revision: Union[str, Sequence[str], None] = 't6u7v8w9x0y1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add a FULLTEXT index over product name, SKU and category (MySQL only)."""
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.create_index('ix_product_search', 'product', ['prod_name', 'SKU', 'prod_category'], mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    """Drop the FULLTEXT index."""
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ix_product_search', table_name='product')
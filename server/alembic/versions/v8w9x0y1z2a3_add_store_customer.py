@@ -0,0 +1,47 @@
+"""add store customer membership
+
+Revision ID: v8w9x0y1z2a3
+Revises: u7v8w9x0y1z2
+Create Date: 2026-10-17 04:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'v8w9x0y1z2a3'
+down_revision: Union[str, Sequence[str], None] = 'u7v8w9x0y1z2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create store_customer and backfill it from existing orders."""
+    op.create_table(
+        'store_customer',
+        sa.Column('store_id', sa.Integer(), sa.ForeignKey('store.store_id'), primary_key=True),
+        sa.Column('person_id', sa.Integer(), sa.ForeignKey('person.person_id'), primary_key=True),
+        sa.Column('first_order_at', sa.DateTime(), nullable=False),
+        sa.Column('last_order_at', sa.DateTime(), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_store_customer_store_last', 'store_customer', ['store_id', 'last_order_at', 'person_id'])
+    op.create_index('ix_store_customer_person', 'store_customer', ['person_id'])
+    op.execute("""
+        INSERT INTO store_customer (store_id, person_id, first_order_at, last_order_at, order_count)
+        SELECT store_id, person_id,
+               COALESCE(MIN(created_at), CURRENT_TIMESTAMP), COALESCE(MAX(created_at), CURRENT_TIMESTAMP),
+               COUNT(order_id)
+        FROM orders
+        GROUP BY store_id, person_id
+    """)
+
+
+def downgrade() -> None:
+    """Drop store_customer."""
+    op.drop_index('ix_store_customer_person', table_name='store_customer')
+    op.drop_index('ix_store_customer_store_last', table_name='store_customer')
+    op.drop_table('store_customer')
@@ -0,0 +1,46 @@
+"""record the price an order line was sold at
+
+Revision ID: w9x0y1z2a3b4
+Revises: v8w9x0y1z2a3
+Create Date: 2026-10-17 05:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'w9x0y1z2a3b4'
+down_revision: Union[str, Sequence[str], None] = 'v8w9x0y1z2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add orders.sold_unit_price, fill it for sold orders at current prices and rebuild daily_sales from it."""
+    op.add_column('orders', sa.Column('sold_unit_price', sa.Numeric(10, 2), nullable=True))
+    op.execute("""
+        UPDATE orders o
+        INNER JOIN inventory i ON i.inventory_id = o.inventory_id
+        INNER JOIN product p ON p.prod_id = i.product_id
+        SET o.sold_unit_price = p.unit_price
+        WHERE o.status IN ('confirmed', 'shipped')
+    """)
+    # Earlier rollup rows mixed the prices of confirm and cancel time; start again from the snapshots
+    op.execute("DELETE FROM daily_sales")
+    op.execute("""
+        INSERT INTO daily_sales (store_id, day, product_id, orders, units, revenue)
+        SELECT o.store_id, DATE(o.created_at), i.product_id,
+               COUNT(o.order_id), SUM(o.order_quantity), SUM(o.order_quantity * o.sold_unit_price)
+        FROM orders o
+        INNER JOIN inventory i ON i.inventory_id = o.inventory_id
+        WHERE o.status IN ('confirmed', 'shipped')
+        GROUP BY o.store_id, DATE(o.created_at), i.product_id
+    """)
+
+
+def downgrade() -> None:
+    """Drop orders.sold_unit_price."""
+    op.drop_column('orders', 'sold_unit_price')
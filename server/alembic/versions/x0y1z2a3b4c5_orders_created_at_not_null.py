@@ -0,0 +1,33 @@
+"""make orders.created_at NOT NULL
+
+Revision ID: x0y1z2a3b4c5
+Revises: w9x0y1z2a3b4
+Create Date: 2026-10-17 06:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'x0y1z2a3b4c5'
+down_revision: Union[str, Sequence[str], None] = 'w9x0y1z2a3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Backfill missing order timestamps from updated_at (or now) and forbid NULLs; created_at is the keyset column of GET /orders."""
+    op.execute("""
+        UPDATE orders
+        SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP)
+        WHERE created_at IS NULL
+    """)
+    op.alter_column('orders', 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    """Allow NULL orders.created_at again."""
+    op.alter_column('orders', 'created_at', existing_type=sa.DateTime(), nullable=True)
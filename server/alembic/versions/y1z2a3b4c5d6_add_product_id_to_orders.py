@@ -0,0 +1,34 @@
+"""denormalize product_id onto orders
+
+Revision ID: y1z2a3b4c5d6
+Revises: x0y1z2a3b4c5
+Create Date: 2026-10-17 06:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'y1z2a3b4c5d6'
+down_revision: Union[str, Sequence[str], None] = 'x0y1z2a3b4c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add orders.product_id and backfill it from inventory, so order reads reach product without the inventory join."""
+    op.add_column('orders', sa.Column('product_id', sa.Integer(), nullable=True))
+    op.execute("""
+        UPDATE orders o
+        INNER JOIN inventory i ON i.inventory_id = o.inventory_id
+        SET o.product_id = i.product_id
+    """)
+    op.alter_column('orders', 'product_id', existing_type=sa.Integer(), nullable=False)
+
+
+def downgrade() -> None:
+    """Drop orders.product_id."""
+    op.drop_column('orders', 'product_id')
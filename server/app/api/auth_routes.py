@@ -14,12 +14,12 @@ from app.core.security import require_roles, get_token_payload
 router = APIRouter()
 
 @router.post("/signup", response_model=SignupResponse, status_code=201)
-def signup(data: SignupRequest, db: Session = Depends(get_db)):
+async def signup(data: SignupRequest, db: Session = Depends(get_db)):
     """
     Sign up as a new person (customer).
     Creates a person record only - cannot login until upgraded to staff/admin.
     """
-    person = AuthController.signup(db, data)
+    person = await AuthController.signup(db, data)
     return SignupResponse(
         person_id=person.person_id,
         person_name=person.person_name,
@@ -28,12 +28,12 @@ def signup(data: SignupRequest, db: Session = Depends(get_db)):
     )
 
 @router.post("/login", response_model=LoginResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
+async def login(data: LoginRequest, db: Session = Depends(get_db)):
     """
     Login for staff and admin users only.
     Customers cannot login to the web app.
     """
-    result = AuthController.login(db, data)
+    result = await AuthController.login(db, data)
     return LoginResponse(**result)
 
 @router.post("/buy-package", response_model=BuyPackageResponse)
@@ -48,13 +48,13 @@ def buy_package(data: BuyPackageRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/create-staff", response_model=CreateStaffResponse, dependencies=[Depends(require_roles(["admin"]))])
-def create_staff(
+async def create_staff(
     data: CreateStaffRequest,
     db: Session = Depends(get_db),
     payload: dict = Depends(get_token_payload),
 ):
     """Create a staff user for the admin's store (admin only)."""
-    result = AuthController.create_staff(db, data, payload)
+    result = await AuthController.create_staff(db, data, payload)
     return CreateStaffResponse(**result)
 
 
@@ -109,9 +109,9 @@ def get_profile(
 
 
 @router.put("/me", response_model=ProfileResponse, dependencies=[Depends(require_roles(["admin", "staff"]))])
-def update_profile(
+async def update_profile(
     data: ProfileUpdate,
     db: Session = Depends(get_db),
     payload: dict = Depends(get_token_payload),
 ):
-    return AuthController.update_profile(db, payload, data)
\ No newline at end of file
+    return await AuthController.update_profile(db, payload, data)
\ No newline at end of file
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import Optional, List
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import encode_cursor, decode_cursor
 from app.core.security import require_roles, get_token_payload
 from app.controllers.customer_controller import CustomerController
 from app.schemas.customer import (
@@ -9,6 +11,8 @@ from app.schemas.customer import (
     CustomerUpdate,
     CustomerResponse,
     CustomerExistsResponse,
+    CustomerMatch,
+    StoreCustomerResponse,
 )
 
 router = APIRouter()
@@ -38,6 +42,25 @@ def check_customer(
     return CustomerExistsResponse(exists=False)
 
 
+@router.get("/lookup", response_model=List[CustomerMatch], dependencies=[Depends(require_roles(["admin", "staff"]))])
+def lookup_customers(
+    q: str = Query(..., min_length=1),
+    k: int = Query(10, ge=1, le=settings.CUSTOMER_LOOKUP_MAX_RESULTS),
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+):
+    """Type-ahead over the store's customers: partial phone or email (prefix), or name words.
+    Returns the best k matches (staff/admin only).
+    """
+    store_id = payload.get("store_id")
+    if not store_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Store context missing"
+        )
+    return CustomerController.lookup(db, store_id, q, k)
+
+
 @router.get("/{contact}", response_model=CustomerResponse, dependencies=[Depends(require_roles(["admin", "staff"]))])
 def get_customer(contact: str, db: Session = Depends(get_db)):
     """Get a single customer by contact (staff/admin only)."""
@@ -46,22 +69,48 @@ def get_customer(contact: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Customer not found")
     return person
 
-@router.get("", response_model=List[CustomerResponse], dependencies=[Depends(require_roles(["admin", "staff"]))])
+@router.get("", response_model=List[StoreCustomerResponse], dependencies=[Depends(require_roles(["admin", "staff"]))])
 def list_customers(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    limit: int = Query(settings.CUSTOMERS_PAGE_SIZE, ge=1, le=settings.CUSTOMERS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db),
     payload: dict = Depends(get_token_payload),
 ):
-    """List all customers for the authenticated user's store (staff/admin only)."""
+    """List the store's customers, most recent order first (staff/admin only).
+    Keyset-paginated on (last_order_at, person_id): pass the X-Next-Cursor response
+    header back as `cursor` to get the next page. `include_total` adds X-Total-Count.
+    """
     store_id = payload.get("store_id")
     if not store_id:
         raise HTTPException(
             status_code=400,
             detail="Store context missing"
         )
-    customers = CustomerController.get_all(db, skip=skip, limit=limit, store_id=store_id)
-    return customers
+    if include_total:
+        response.headers["X-Total-Count"] = str(CustomerController.count(db, store_id))
+
+    # Fetch one extra row to know whether another page exists
+    rows = CustomerController.get_all(db, store_id, limit + 1, decode_cursor(cursor))
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.last_order_at, last.person_id)
+
+    return [
+        dict(
+            person_id=person.person_id,
+            person_name=person.person_name,
+            person_contact=person.person_contact,
+            person_email=person.person_email,
+            person_address=person.person_address,
+            first_order_at=link.first_order_at,
+            last_order_at=link.last_order_at,
+            order_count=link.order_count,
+        )
+        for person, link in rows
+    ]
 
 
 @router.post("", response_model=CustomerResponse, status_code=201, dependencies=[Depends(require_roles(["admin", "staff"]))])
@@ -72,9 +121,9 @@ def create_customer(data: CustomerCreate, db: Session = Depends(get_db)):
 
 
 @router.put("/{contact}", response_model=CustomerResponse, dependencies=[Depends(require_roles(["admin", "staff"]))])
-def update_customer(contact: str, data: CustomerUpdate, db: Session = Depends(get_db)):
+async def update_customer(contact: str, data: CustomerUpdate, db: Session = Depends(get_db)):
     """Edit customer details by contact (staff/admin only)."""
-    person = CustomerController.update(db, contact, data)
+    person = await CustomerController.update(db, contact, data)
     if not person:
         raise HTTPException(status_code=404, detail="Customer not found")
     return person
\ No newline at end of file
@@ -1,10 +1,25 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from datetime import datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import encode_cursor, decode_cursor
 from app.core.security import require_roles, get_token_payload
+from app.core.store_versions import not_modified, cached, CATALOG
 from app.controllers.order_controller import OrderController
-from app.schemas.order import OrderCreate, OrderUpdate, OrderStatusUpdate, OrderResponse, InventoryItemResponse
+from app.controllers.inventory_controller import InventoryController
+from app.schemas.order import (
+    OrderCreate,
+    OrderBatchCreate,
+    OrderUpdate,
+    OrderStatusUpdate,
+    OrderStatusBatchUpdate,
+    OrderStatusBatchResponse,
+    OrderResponse,
+    InventoryItemResponse,
+    ReceiptResponse,
+)
 
 # Do not set tags here; api_router.include_router will assign consistent tags
 router = APIRouter()
@@ -34,9 +49,34 @@ def create_order(
         created_at=order.created_at,
         person_contact=person.person_contact if person else None,
         unit_price=float(product.unit_price) if product and product.unit_price else 0,
+        checkout_id=order.checkout_id,
+        stock_reserved=order.stock_reserved,
     )
 
 
+@router.post("/batch", response_model=ReceiptResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_roles(["admin", "staff"]))])
+def create_order_batch(
+    data: OrderBatchCreate,
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+):
+    """Checkout a whole cart: one pending order per line, committed together, returns the receipt."""
+    return OrderController.create_batch(db, payload, data)
+
+
+# Declared before /{order_id} so the literal path is matched first
+@router.put("/status:batch", response_model=OrderStatusBatchResponse, dependencies=[Depends(require_roles(["admin", "staff"]))])
+def update_order_status_batch(
+    data: OrderStatusBatchUpdate,
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+):
+    """Move many orders (e.g. a whole receipt) to one status in a single transaction."""
+    results = OrderController.update_status_batch(db, payload, data.order_ids, data.status)
+    updated = sum(1 for r in results if r["ok"])
+    return dict(updated=updated, failed=len(results) - updated, results=results)
+
+
 @router.put("/{order_id}", response_model=OrderResponse, dependencies=[Depends(require_roles(["admin", "staff"]))])
 def update_order(
     order_id: int,
@@ -61,48 +101,34 @@ def update_order_status(
 
 @router.get("", response_model=list[OrderResponse], dependencies=[Depends(require_roles(["admin", "staff"]))])
 def list_orders(
+    response: Response,
     status: str | None = None,
     start_date: datetime | None = None,
     end_date: datetime | None = None,
     customer_contact: str | None = None,
+    limit: int = Query(settings.ORDERS_PAGE_SIZE, ge=1, le=settings.ORDERS_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    include_total: bool = False,
     db: Session = Depends(get_db),
     payload: dict = Depends(get_token_payload),
 ):
-    # List orders for this store with optional filters
+    """List orders for this store, newest first, with optional filters.
+    Keyset-paginated on (created_at, order_id): pass the X-Next-Cursor response
+    header back as `cursor` to get the next page. `include_total` adds X-Total-Count.
+    """
     from app.models.order import Order
-    from app.models.inventory import Inventory
-    from app.models.person import Person
-    from app.models.product import Product
     store_id = payload.get("store_id")
 
-    query = (
-        db.query(
-            Order.order_id,
-            Order.status,
-            Order.inventory_id,
-            Order.order_quantity,
-            Order.person_id,
-            Order.created_by,
-            Order.created_at,
-            Person.person_contact,
-            Product.unit_price,
-        )
-        .join(Inventory, Inventory.inventory_id == Order.inventory_id)
-        .join(Person, Person.person_id == Order.person_id)
-        .join(Product, Product.prod_id == Inventory.product_id)
-        .filter(Inventory.store_id == store_id)
-    )
-
-    if status:
-        query = query.filter(Order.status == status)
-    if start_date:
-        query = query.filter(Order.created_at >= start_date)
-    if end_date:
-        query = query.filter(Order.created_at <= end_date)
-    if customer_contact:
-        query = query.filter(Person.person_contact == customer_contact)
+    query = OrderController.list_query(db, store_id, status, start_date, end_date, customer_contact)
+    if include_total:
+        total = query.with_entities(func.count(Order.order_id)).scalar()
+        response.headers["X-Total-Count"] = str(total)
 
-    rows = query.order_by(Order.created_at.desc()).all()
+    # Fetch one extra row to know whether another page exists
+    rows = OrderController.page_query(query, decode_cursor(cursor), limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].order_id)
 
     return [
         dict(
@@ -115,6 +141,8 @@ def list_orders(
             created_at=r.created_at,
             person_contact=r.person_contact,
             unit_price=float(r.unit_price) if r.unit_price else 0,
+            checkout_id=r.checkout_id,
+            stock_reserved=r.stock_reserved,
         )
         for r in rows
     ]
@@ -122,37 +150,33 @@ def list_orders(
 
 @router.get("/inventory", response_model=list[InventoryItemResponse], dependencies=[Depends(require_roles(["admin", "staff"]))])
 def list_store_inventory(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     payload: dict = Depends(get_token_payload),
 ):
-    from app.models.inventory import Inventory
-    from app.models.product import Product
     store_id = payload.get("store_id")
-    rows = (
-        db.query(
-            Inventory.inventory_id,
-            Product.prod_id.label("product_id"),
-            Product.SKU,
-            Product.prod_name,
-            Inventory.units,
-            Product.unit_price,
-        )
-        .join(Product, Product.prod_id == Inventory.product_id)
-        .filter(Inventory.store_id == store_id)
-        .all()
-    )
-    # Return plain dicts; FastAPI will coerce to InventoryItemResponse
-    return [
-        dict(
-            inventory_id=r.inventory_id,
-            product_id=r.product_id,
-            SKU=r.SKU,
-            prod_name=r.prod_name,
-            units=r.units or 0,
-            unit_price=r.unit_price,
-        )
-        for r in rows
-    ]
+    unchanged = not_modified(request, response, store_id, CATALOG)
+    if unchanged:
+        return unchanged
+    def load():
+        rows = InventoryController.items_query(db, store_id).all()
+        # Plain dicts; FastAPI will coerce to InventoryItemResponse
+        return [
+            dict(
+                inventory_id=r.inventory_id,
+                product_id=r.product_id,
+                SKU=r.SKU,
+                prod_name=r.prod_name,
+                units=r.units or 0,
+                reserved=r.reserved or 0,
+                available=(r.units or 0) - (r.reserved or 0),
+                unit_price=r.unit_price,
+            )
+            for r in rows
+        ]
+
+    return cached(store_id, CATALOG, "inventory", load)
 
 
 @router.get("/{order_id}", response_model=OrderResponse, dependencies=[Depends(require_roles(["admin", "staff"]))])
@@ -162,7 +186,6 @@ def get_order(
     payload: dict = Depends(get_token_payload),
 ):
     from app.models.order import Order
-    from app.models.inventory import Inventory
     from app.models.person import Person
     store_id = payload.get("store_id")
     r = (
@@ -174,11 +197,12 @@ def get_order(
             Order.person_id,
             Order.created_by,
             Order.created_at,
+            Order.checkout_id,
+            Order.stock_reserved,
             Person.person_contact,
         )
-        .join(Inventory, Inventory.inventory_id == Order.inventory_id)
         .join(Person, Person.person_id == Order.person_id)
-        .filter(Order.order_id == order_id, Inventory.store_id == store_id)
+        .filter(Order.order_id == order_id, Order.store_id == store_id)
         .first()
     )
     if not r:
@@ -192,6 +216,8 @@ def get_order(
         created_by=r.created_by,
         created_at=r.created_at,
         person_contact=r.person_contact,
+        checkout_id=r.checkout_id,
+        stock_reserved=r.stock_reserved,
     )
 
 
@@ -201,54 +227,28 @@ def get_receipt(
     db: Session = Depends(get_db),
     payload: dict = Depends(get_token_payload),
 ):
-    """Return all orders in the same checkout batch as the given order_id.
-    Groups by same person and created_by within a short time window around created_at.
+    """Return all orders in the same checkout as the given order_id.
+    The checkout header is a primary-key fetch; its lines are an indexed scan on orders.checkout_id.
     """
-    from datetime import timedelta
     from app.models.order import Order
-    from app.models.inventory import Inventory
-    from app.models.product import Product
+    from app.models.checkout import Checkout
     from app.models.person import Person
 
     store_id = payload.get("store_id")
 
     base = (
-        db.query(Order, Person)
-        .join(Person, Person.person_id == Order.person_id)
-        .join(Inventory, Inventory.inventory_id == Order.inventory_id)
-        .filter(Order.order_id == order_id, Inventory.store_id == store_id)
+        db.query(Checkout, Person)
+        .join(Order, Order.checkout_id == Checkout.checkout_id)
+        .join(Person, Person.person_id == Checkout.person_id)
+        .filter(Order.order_id == order_id, Checkout.store_id == store_id)
         .first()
     )
     if not base:
         return {"order_id": order_id, "person_contact": None, "lines": []}
 
-    base_order, person = base
-    window = timedelta(seconds=120)
-    start = base_order.created_at - window
-    end = base_order.created_at + window
+    checkout, person = base
 
-    rows = (
-        db.query(
-            Order.order_id,
-            Order.status,
-            Order.inventory_id,
-            Order.order_quantity,
-            Order.created_at,
-            Product.SKU,
-            Product.prod_name,
-            Product.unit_price,
-        )
-        .join(Inventory, Inventory.inventory_id == Order.inventory_id)
-        .join(Product, Product.prod_id == Inventory.product_id)
-        .filter(
-            Inventory.store_id == store_id,
-            Order.person_id == base_order.person_id,
-            Order.created_by == base_order.created_by,
-            Order.created_at.between(start, end),
-        )
-        .order_by(Order.created_at.asc())
-        .all()
-    )
+    rows = OrderController.receipt_lines_query(db, checkout.checkout_id).all()
 
     lines = [
         dict(
@@ -267,12 +267,13 @@ def get_receipt(
 
     return {
         "order_id": order_id,
+        "checkout_id": checkout.checkout_id,
         "person_id": person.person_id,
         "person_name": person.person_name,
         "person_contact": person.person_contact,
         "person_email": person.person_email,
         "person_address": person.person_address,
-        "created_at": base_order.created_at,
+        "created_at": checkout.created_at,
         "lines": lines,
         "grand_total": sum(l["subtotal"] for l in lines),
     }
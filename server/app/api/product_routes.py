@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import require_roles
+from app.core.store_versions import not_modified, CATALOG
 from app.controllers.product_controller import ProductController
-from app.schemas.product import ProductCreate, ProductUpdate, ProductInventoryUpdate, ProductResponse
+from app.schemas.product import (
+    ProductCreate, ProductUpdate, ProductInventoryUpdate, ProductResponse,
+    ProductStripesUpdate, ProductStripesResponse,
+)
 
 # Do not set tags here; api_router.include_router will assign consistent tags
 router = APIRouter()
@@ -25,20 +30,53 @@ def create_product(
 
 @router.get("", response_model=list[ProductResponse])
 def list_products(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
     payload: dict = Depends(require_roles(["admin", "staff"]))
 ):
-    """Get all products for the authenticated user's store."""
+    """Get all products for the authenticated user's store (304 if If-None-Match is current)."""
     store_id = payload.get("store_id")
     if not store_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Store context missing"
         )
+    unchanged = not_modified(request, response, store_id, CATALOG)
+    if unchanged:
+        return unchanged
     return ProductController.get_products(db, store_id, skip, limit)
 
+# Declared before /{prod_id} so the literal path is matched first
+@router.get("/search", response_model=list[ProductResponse])
+def search_products(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=settings.PRODUCT_SEARCH_MAX_LIMIT),
+    db: Session = Depends(get_db),
+    payload: dict = Depends(require_roles(["admin", "staff"]))
+):
+    """Search the store's products by SKU, name or category, best matches first.
+    Every word of q must start a word of one of those fields. X-Total-Count has the
+    number of matches (304 if If-None-Match is current).
+    """
+    store_id = payload.get("store_id")
+    if not store_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Store context missing"
+        )
+    unchanged = not_modified(request, response, store_id, CATALOG)
+    if unchanged:
+        return unchanged
+    total, products = ProductController.search_products(db, store_id, q, skip, limit)
+    response.headers["X-Total-Count"] = str(total)
+    return products
+
 @router.get("/{prod_id}", response_model=ProductResponse)
 def get_product(
     prod_id: int,
@@ -86,6 +124,24 @@ def update_inventory(
         )
     return ProductController.update_inventory(db, prod_id, store_id, data)
 
+@router.put("/{prod_id}/stripes", response_model=ProductStripesResponse)
+def set_stock_stripes(
+    prod_id: int,
+    data: ProductStripesUpdate,
+    db: Session = Depends(get_db),
+    payload: dict = Depends(require_roles(["admin"]))
+):
+    """Admin splits a hot product's stock over N counters so confirmations don't queue on one row.
+    stripes=0 folds the stock back into a single counter.
+    """
+    store_id = payload.get("store_id")
+    if not store_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Store context missing"
+        )
+    return ProductController.set_stock_stripes(db, prod_id, store_id, data)
+
 @router.delete("/{prod_id}", status_code=status.HTTP_200_OK)
 def delete_product(
     prod_id: int,
@@ -108,7 +164,7 @@ def backfill_inventory(
     payload: dict = Depends(require_roles(["admin"]))
 ):
     """Admin utility: create missing Inventory rows for this store.
-    Units initialized from Product.inventory. Does not overwrite existing rows.
+    New rows start at zero units. Does not overwrite existing rows.
     """
     store_id = payload.get("store_id")
     if not store_id:
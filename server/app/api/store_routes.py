@@ -1,24 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.config import settings
+from app.core.events import event_broker
 from app.core.security import require_roles, get_token_payload
-from app.schemas.store import StoreSettingsResponse, StoreSettingsUpdate
+from app.core.store_versions import store_versions, cached, put, not_modified, CATALOG, SETTINGS
+from app.schemas.store import (
+    StoreSettingsResponse, StoreSettingsUpdate, DashboardResponse, DashboardDayDetail, TopProductsResponse,
+    ReorderSuggestionsResponse, LowStockResponse,
+)
 from app.models.store import Store
+from app.controllers.dashboard_controller import DashboardController
+from app.controllers.reorder_controller import ReorderController
+from app.controllers.low_stock_controller import low_stock_tracker
 
 router = APIRouter()
 
 @router.get("/settings", response_model=StoreSettingsResponse, dependencies=[Depends(require_roles(["admin", "staff"]))])
 def get_settings(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     payload: dict = Depends(get_token_payload),
 ):
     store_id = payload.get("store_id")
     if not store_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing store context")
-    store = db.query(Store).filter(Store.store_id == store_id).first()
-    if not store:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Store not found")
-    return store
+    unchanged = not_modified(request, response, store_id, SETTINGS)
+    if unchanged:
+        return unchanged
+
+    def load():
+        store = db.query(Store).filter(Store.store_id == store_id).first()
+        if not store:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Store not found")
+        return StoreSettingsResponse.model_validate(store).model_dump()
+
+    return cached(store_id, SETTINGS, "settings", load)
 
 
 @router.put("/settings", response_model=StoreSettingsResponse, dependencies=[Depends(require_roles(["admin"]))])
@@ -38,6 +59,7 @@ def update_settings(
         store.store_name = data.store_name
     if data.store_address is not None:
         store.store_address = data.store_address
+    threshold_changed = store.low_stock_threshold != data.low_stock_threshold
     store.low_stock_threshold = data.low_stock_threshold
     store.restore_stock_on_cancel = data.restore_stock_on_cancel
     store.sales_lookback_days = data.sales_lookback_days
@@ -45,5 +67,119 @@ def update_settings(
     store.currency = data.currency
 
     db.commit()
+    version = store_versions.bump(store_id, SETTINGS)
+    DashboardController.invalidate_top_products(store_id)  # the lookback window may have changed
+    if threshold_changed:
+        low_stock_tracker.reset(store_id)
     db.refresh(store)
+    put(store_id, SETTINGS, "settings", version, StoreSettingsResponse.model_validate(store).model_dump())
     return store
+
+
+@router.get("/dashboard", response_model=DashboardResponse, dependencies=[Depends(require_roles(["admin"]))])
+def get_dashboard(
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+):
+    """KPIs, 30-day orders/sales series and top products for the admin dashboard."""
+    store_id = payload.get("store_id")
+    if not store_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing store context")
+    return DashboardController.get_dashboard(db, store_id)
+
+
+@router.get("/dashboard/day", response_model=DashboardDayDetail, dependencies=[Depends(require_roles(["admin"]))])
+def get_dashboard_day(
+    day: date,
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+):
+    """Products sold on one day (UTC), for the dashboard chart drill-down."""
+    store_id = payload.get("store_id")
+    if not store_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing store context")
+    return DashboardController.get_day_detail(db, store_id, day)
+
+
+@router.get("/top-products", response_model=TopProductsResponse, dependencies=[Depends(require_roles(["admin", "staff"]))])
+def get_top_products(
+    n: int = Query(5, ge=1, le=settings.TOP_PRODUCTS_MAX_N),
+    by: str = Query("units", pattern="^(units|revenue)$"),
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+):
+    """Top n products by units or revenue sold over the store's sales_lookback_days."""
+    store_id = payload.get("store_id")
+    if not store_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing store context")
+    return DashboardController.get_top_products(db, store_id, n, by)
+
+
+@router.get("/reorder-suggestions", response_model=ReorderSuggestionsResponse, dependencies=[Depends(require_roles(["admin", "staff"]))])
+def get_reorder_suggestions(
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+):
+    """Products whose available stock won't cover the store's reorder_horizon_days, with how much to order."""
+    store_id = payload.get("store_id")
+    if not store_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing store context")
+    return ReorderController.get_suggestions(db, store_id, limit)
+
+
+@router.get("/low-stock", response_model=LowStockResponse, dependencies=[Depends(require_roles(["admin", "staff"]))])
+def get_low_stock(
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+):
+    """Inventory rows below the store's low_stock_threshold, served from memory."""
+    store_id = payload.get("store_id")
+    if not store_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing store context")
+    return low_stock_tracker.snapshot(db, store_id)
+
+
+@router.get("/low-stock/changes", response_model=LowStockResponse, dependencies=[Depends(require_roles(["admin", "staff"]))])
+async def wait_low_stock(
+    since: int = Query(..., ge=0),
+    timeout: float = Query(settings.LOW_STOCK_WAIT_SECONDS, gt=0, le=settings.LOW_STOCK_WAIT_SECONDS),
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+):
+    """Long-poll: answer as soon as the low-stock set's version moves past `since`
+    (or after `timeout` seconds with the unchanged set). Waiting holds no thread.
+    """
+    store_id = payload.get("store_id")
+    if not store_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing store context")
+    current = await run_in_threadpool(low_stock_tracker.snapshot, db, store_id)
+    if current["version"] != since:
+        return current
+    db.close()  # give the pooled connection back while waiting; the re-read below checks one out again
+    await low_stock_tracker.wait(store_id, since, timeout)
+    return await run_in_threadpool(low_stock_tracker.snapshot, db, store_id)
+
+
+@router.get("/events", dependencies=[Depends(require_roles(["admin", "staff"]))])
+async def stream_events(
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+):
+    """Server-Sent Events feed of the store's order.created, order.updated, order.status
+    and stock.changed events. A client that falls too far behind receives `dropped`
+    and should reconnect and reload its lists; `resync` means another worker changed
+    orders or stock, and the client should reload its lists.
+    """
+    store_id = payload.get("store_id")
+    if not store_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing store context")
+    # Make sure this worker polls the store's versions, so other workers' writes reach the stream
+    await run_in_threadpool(store_versions.get, store_id, CATALOG)
+    db.close()  # the stream never touches the database; don't hold a connection for its lifetime
+    sub = event_broker.subscribe(store_id)
+    return StreamingResponse(
+        event_broker.stream(sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
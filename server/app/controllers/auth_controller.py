@@ -1,17 +1,37 @@
+import hmac
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.models.person import Person
 from app.models.user import User
 from app.models.store import Store
 from app.schemas.auth import SignupRequest, LoginRequest, BuyPackageRequest, CreateStaffRequest, ProfileUpdate
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import (
+    hash_password_async,
+    verify_password_async,
+    is_password_unset,
+    create_access_token,
+    invalidate_user_active,
+)
+from app.core.store_versions import store_versions, USERS
+from app.controllers.customer_controller import CustomerController
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
 class AuthController:
     
     @staticmethod
-    def signup(db: Session, data: SignupRequest) -> Person:
+    async def signup(db: Session, data: SignupRequest) -> Person:
         """Create a new person (customer) account with password."""
+        await run_in_threadpool(AuthController._check_signup_conflicts, db, data)
+
+        # Hash password (default to contact if password not provided) on the hashing pool
+        raw_pwd = data.password or data.person_contact
+        hashed_pwd = await hash_password_async(raw_pwd)
+
+        return await run_in_threadpool(AuthController._create_person, db, data, hashed_pwd)
+
+    @staticmethod
+    def _check_signup_conflicts(db: Session, data: SignupRequest) -> None:
         # Check if person already exists (may have been created as customer by admin/staff)
         existing_contact = db.query(Person).filter(Person.person_contact == data.person_contact).first()
         if existing_contact:
@@ -35,12 +55,10 @@ class AuthController:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
-        
-        # Hash password (default to contact if password not provided)
-        raw_pwd = data.password or data.person_contact
-        hashed_pwd = hash_password(raw_pwd)
-        
-        # Create person record with password
+
+    @staticmethod
+    def _create_person(db: Session, data, hashed_pwd: str) -> Person:
+        """Insert a person from signup/staff request data with an already-hashed password."""
         person = Person(
             person_name=data.person_name,
             person_email=data.person_email,
@@ -54,23 +72,46 @@ class AuthController:
         return person
     
     @staticmethod
-    def login(db: Session, data: LoginRequest) -> dict:
+    async def login(db: Session, data: LoginRequest) -> dict:
         """Login for anyone - check if they have purchased a package."""
         # Find person by unique contact
-        person = db.query(Person).filter(Person.person_contact == data.person_contact).first()
+        person = await run_in_threadpool(AuthController._get_person_by_contact, db, data.person_contact)
         if not person:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Contact does not exist"
             )
         
-        # Verify password
-        if not verify_password(data.password, person.password):
+        if is_password_unset(person.password):
+            # No credential stored yet: default password is the contact number.
+            # Hash it now so later logins go through the normal path.
+            if not hmac.compare_digest(data.password.encode(), person.person_contact.encode()):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Password is incorrect"
+                )
+            hashed_pwd = await hash_password_async(person.person_contact)
+            await run_in_threadpool(AuthController._store_password_hash, db, person, hashed_pwd)
+        # Verify password on the hashing pool
+        elif not await verify_password_async(data.password, person.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Password is incorrect"
             )
         
+        return await run_in_threadpool(AuthController._login_result, db, person)
+
+    @staticmethod
+    def _store_password_hash(db: Session, person: Person, hashed_pwd: str) -> None:
+        person.password = hashed_pwd
+        db.commit()
+
+    @staticmethod
+    def _get_person_by_contact(db: Session, contact: str) -> Optional[Person]:
+        return db.query(Person).filter(Person.person_contact == contact).first()
+
+    @staticmethod
+    def _login_result(db: Session, person: Person) -> dict:
         # Check if person has bought a package (is staff/admin)
         user = db.query(User).filter(User.person_id == person.person_id).first()
         
@@ -156,21 +197,32 @@ class AuthController:
         }
 
     @staticmethod
-    def create_staff(db: Session, data: CreateStaffRequest, creator_payload: dict) -> dict:
+    async def create_staff(db: Session, data: CreateStaffRequest, creator_payload: dict) -> dict:
         """Admin creates a staff user for their store using unique contact (phone).
         Existing contacts can be used if not registered to another store."""
+        existing = await run_in_threadpool(AuthController._add_existing_contact_as_staff, db, data, creator_payload)
+        if existing is not None:
+            return existing
+
+        # Create new person with provided password or default
+        raw_pwd = data.password or "password"
+        hashed_pwd = await hash_password_async(raw_pwd)
+
+        return await run_in_threadpool(
+            AuthController._create_staff_person, db, data, creator_payload.get("store_id"), hashed_pwd
+        )
+
+    @staticmethod
+    def _add_existing_contact_as_staff(db: Session, data: CreateStaffRequest, creator_payload: dict) -> Optional[dict]:
+        """Validate the request; attach an existing person as staff if the contact is known.
+        Returns None when a new person still has to be created."""
         # Ensure caller is admin (route dependency already checks, but double-safety)
         if creator_payload.get("role") != "admin":
-            from fastapi import HTTPException, status
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admin can create staff")
 
         store_id = creator_payload.get("store_id")
         if not store_id:
-            from fastapi import HTTPException, status
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing store context")
-
-        from app.models.person import Person
-        from app.core.security import hash_password
         
         # Check if person with this contact already exists
         existing_person = db.query(Person).filter(Person.person_contact == data.person_contact).first()
@@ -182,13 +234,11 @@ class AuthController:
             if existing_user:
                 # If registered to a different store, reject
                 if existing_user.store_id != store_id:
-                    from fastapi import HTTPException, status
                     raise HTTPException(
                         status_code=status.HTTP_409_CONFLICT, 
                         detail="This contact is already registered to another store"
                     )
                 # If already a user in this store, reject (already staff/admin)
-                from fastapi import HTTPException, status
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT, 
                     detail="This contact is already a staff member in your store"
@@ -214,23 +264,12 @@ class AuthController:
         # Check email uniqueness for new person
         existing_email = db.query(Person).filter(Person.person_email == data.person_email).first()
         if existing_email:
-            from fastapi import HTTPException, status
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Person with this email already exists")
+        return None
 
-        # Create new person with provided password or default
-        raw_pwd = data.password or "password"
-        hashed_pwd = hash_password(raw_pwd)
-        
-        person = Person(
-            person_name=data.person_name,
-            person_email=data.person_email,
-            person_contact=data.person_contact,
-            person_address=data.person_address,
-            password=hashed_pwd
-        )
-        db.add(person)
-        db.commit()
-        db.refresh(person)
+    @staticmethod
+    def _create_staff_person(db: Session, data: CreateStaffRequest, store_id: int, hashed_pwd: str) -> dict:
+        person = AuthController._create_person(db, data, hashed_pwd)
 
         # Create staff user
         user = User(
@@ -286,6 +325,9 @@ class AuthController:
         user.is_active = False
         db.commit()
         db.refresh(user)
+        # Drop the cached activation state so the deactivation applies immediately
+        invalidate_user_active(user.user_id)
+        store_versions.bump(admin_store_id, USERS)
         
         return {
             "message": "Staff account deactivated successfully",
@@ -313,10 +355,16 @@ class AuthController:
         }
 
     @staticmethod
-    def update_profile(db: Session, payload: dict, data: ProfileUpdate) -> dict:
-        person_id = payload.get("person_id")
-        if not person_id:
+    async def update_profile(db: Session, payload: dict, data: ProfileUpdate) -> dict:
+        if not payload.get("person_id"):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing person context")
+        # Hash any new password on the hashing pool before touching the row
+        hashed_pwd = await hash_password_async(data.password) if data.password else None
+        return await run_in_threadpool(AuthController._apply_profile_update, db, payload, data, hashed_pwd)
+
+    @staticmethod
+    def _apply_profile_update(db: Session, payload: dict, data: ProfileUpdate, hashed_pwd: Optional[str]) -> dict:
+        person_id = payload["person_id"]
         person = db.query(Person).filter(Person.person_id == person_id).first()
         if not person:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Person not found")
@@ -328,10 +376,12 @@ class AuthController:
             person.person_email = data.person_email
         if data.person_address is not None:
             person.person_address = data.person_address
-        if data.password:
-            person.password = hash_password(data.password)
+        if hashed_pwd:
+            person.password = hashed_pwd
 
         db.commit()
+        if data.person_name is not None or data.person_email is not None:
+            CustomerController.reindex_customer(db, person_id)
         db.refresh(person)
 
         user = db.query(User).filter(User.person_id == person.person_id).first()
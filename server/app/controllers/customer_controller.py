@@ -1,39 +1,172 @@
+import re
+from datetime import datetime
+from sqlalchemy import and_, case, func, insert, or_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import Optional
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from app.models.person import Person
 from app.models.user import User
+from app.models.store_customer import StoreCustomer
 from app.schemas.customer import CustomerCreate, CustomerUpdate
-from app.core.security import hash_password
+from app.core.security import UNSET_PASSWORD, is_password_unset, hash_password_async
+from app.core.search_index import TextIndex
+from app.core.store_versions import store_versions, store_cache, cached, put, CUSTOMERS
+
+# Matched fields, best match first (see TextIndex)
+LOOKUP_FIELDS = ("person_contact", "person_email", "person_name")
+_PHONE = re.compile(r"[\d\s()+.-]+")
+
+
+def _phone_digits(value: str) -> str:
+    """Digits only for phone-like text ("+254 712-345" -> "254712345"), anything else unchanged."""
+    value = (value or "").strip()
+    digits = re.sub(r"\D", "", value)
+    return digits if digits and _PHONE.fullmatch(value) else value
+
+
+def _lookup_values(person) -> tuple:
+    return (_phone_digits(person.person_contact), person.person_email, person.person_name)
 
 
 class CustomerController:
+    @staticmethod
+    def contact_query(db: Session, contact: str):
+        return db.query(Person).filter(Person.person_contact == contact)
+
+    @staticmethod
+    def email_query(db: Session, email: str):
+        return db.query(Person).filter(Person.person_email == email)
+
     @staticmethod
     def get_by_contact(db: Session, contact: str) -> Optional[Person]:
-        return db.query(Person).filter(Person.person_contact == contact).first()
+        return CustomerController.contact_query(db, contact).first()
 
     @staticmethod
     def get_by_email(db: Session, email: str) -> Optional[Person]:
-        return db.query(Person).filter(Person.person_email == email).first()
+        return CustomerController.email_query(db, email).first()
 
     @staticmethod
     def get_by_id(db: Session, person_id: int) -> Optional[Person]:
         return db.query(Person).filter(Person.person_id == person_id).first()
 
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100, store_id: Optional[int] = None) -> list:
-        """Get all customers (persons who placed orders); optionally filter by store_id."""
-        query = db.query(Person).distinct()
-        if store_id:
-            # Join Person -> Order -> Inventory -> filter by store_id
-            from app.models.order import Order
-            from app.models.inventory import Inventory
-            query = (
-                query.join(Order, Order.person_id == Person.person_id)
-                .join(Inventory, Inventory.inventory_id == Order.inventory_id)
-                .filter(Inventory.store_id == store_id)
+    def get_all(db: Session, store_id: int, limit: int = 100, after: Optional[tuple] = None) -> list:
+        """The store's customers as (Person, StoreCustomer) rows, most recent order first.
+
+        Keyset-paginated on (last_order_at, person_id): `after` is that pair for the
+        previous page's last row. A customer who orders while the list is being paged
+        moves to the front and is not returned again.
+        """
+        return CustomerController.page_query(db, store_id, limit, after).all()
+
+    @staticmethod
+    def page_query(db: Session, store_id: int, limit: int = 100, after: Optional[tuple] = None):
+        query = (
+            db.query(Person, StoreCustomer)
+            .join(StoreCustomer, StoreCustomer.person_id == Person.person_id)
+            .filter(StoreCustomer.store_id == store_id)
+        )
+        if after:
+            after_order_at, after_person_id = after
+            query = query.filter(
+                or_(
+                    StoreCustomer.last_order_at < after_order_at,
+                    and_(StoreCustomer.last_order_at == after_order_at, StoreCustomer.person_id < after_person_id),
+                )
             )
-        return query.offset(skip).limit(limit).all()
+        return query.order_by(StoreCustomer.last_order_at.desc(), StoreCustomer.person_id.desc()).limit(limit)
+
+    @staticmethod
+    def count(db: Session, store_id: int) -> int:
+        return db.query(StoreCustomer).filter(StoreCustomer.store_id == store_id).count()
+
+    @staticmethod
+    def record_order(db: Session, store_id: int, person_id: int, created_at: datetime, orders: int = 1) -> bool:
+        """Count new orders into the person's store_customer row, creating it on their first.
+        Runs in the caller's transaction; returns True if the person is new to the store.
+        """
+        values = dict(
+            store_id=store_id, person_id=person_id,
+            first_order_at=created_at, last_order_at=created_at, order_count=orders,
+        )
+        if db.get_bind().dialect.name == "mysql":
+            # One statement, so concurrent first orders can't deadlock on gap locks.
+            # MySQL reports 1 affected row for an insert and 2 for an update.
+            stmt = mysql_insert(StoreCustomer).values(**values)
+            return db.execute(stmt.on_duplicate_key_update(
+                order_count=StoreCustomer.order_count + stmt.inserted.order_count,
+                last_order_at=func.greatest(StoreCustomer.last_order_at, stmt.inserted.last_order_at),
+            )).rowcount == 1
+        key = (StoreCustomer.store_id == store_id, StoreCustomer.person_id == person_id)
+        stmt = update(StoreCustomer).where(*key).values(
+            last_order_at=case((StoreCustomer.last_order_at < created_at, created_at), else_=StoreCustomer.last_order_at),
+            order_count=StoreCustomer.order_count + orders,
+        ).execution_options(synchronize_session=False)
+        if db.execute(stmt).rowcount:
+            return False
+        try:
+            with db.begin_nested():
+                db.execute(insert(StoreCustomer).values(**values))
+        except IntegrityError:
+            # Another transaction created the row first
+            db.execute(stmt)
+            return False
+        return True
+
+    @staticmethod
+    def _lookup_rows(db: Session, store_id: int, person_ids=None):
+        query = (
+            db.query(Person.person_id, Person.person_contact, Person.person_email, Person.person_name)
+            .join(StoreCustomer, StoreCustomer.person_id == Person.person_id)
+            .filter(StoreCustomer.store_id == store_id)
+        )
+        if person_ids is not None:
+            query = query.filter(Person.person_id.in_(person_ids))
+        return query.all()
+
+    @staticmethod
+    def _lookup_index(db: Session, store_id: int) -> TextIndex:
+        """The store's in-memory index of its customers' contacts, emails and names."""
+        return cached(store_id, CUSTOMERS, "lookup", lambda: TextIndex(
+            LOOKUP_FIELDS,
+            ((r.person_id, _lookup_values(r)) for r in CustomerController._lookup_rows(db, store_id)),
+            order_field=2,
+        ))
+
+    @staticmethod
+    def lookup(db: Session, store_id: int, q: str, k: int = 10) -> list:
+        """Type-ahead: the store's top-k customers whose contact or email starts with q,
+        or whose name has words starting with every word of q.
+        """
+        _, ids = CustomerController._lookup_index(db, store_id).search(_phone_digits(q), 0, k)
+        if not ids:
+            return []
+        rows = {p.person_id: p for p in db.query(Person).filter(Person.person_id.in_(ids))}
+        return [rows[i] for i in ids if i in rows]
+
+    @staticmethod
+    def stores_query(db: Session, person_id: int):
+        return db.query(StoreCustomer.store_id).filter(StoreCustomer.person_id == person_id)
+
+    @staticmethod
+    def reindex_customer(db: Session, person_id: int, store_ids=None) -> None:
+        """Apply a committed change to a customer (first order in a store, or edited
+        contact details) to the lookup index of `store_ids`, by default every store
+        the person has ordered from. Same versioning as ProductController._reindex.
+        """
+        if store_ids is None:
+            store_ids = [s for (s,) in CustomerController.stores_query(db, person_id)]
+        for store_id in store_ids:
+            version = store_versions.bump(store_id, CUSTOMERS)
+            index = store_cache.get(store_id, (CUSTOMERS, "lookup"), version - 1)
+            if index is None:
+                continue
+            rows = CustomerController._lookup_rows(db, store_id, [person_id])
+            index.apply([(r.person_id, _lookup_values(r)) for r in rows], [] if rows else [person_id])
+            put(store_id, CUSTOMERS, "lookup", version, index)
 
     @staticmethod
     def create(db: Session, data: CustomerCreate) -> Person:
@@ -51,9 +184,10 @@ class CustomerController:
                 detail="Customer with this email already exists"
             )
 
-        # Create person with default password (customers created by admin/staff)
+        # Customers created by admin/staff have no credential yet; the default
+        # password (contact number) is hashed on their first login
         person_data = data.model_dump()
-        person_data['password'] = hash_password(data.person_contact)  # Password = contact number by default
+        person_data['password'] = UNSET_PASSWORD
         person = Person(**person_data)
         db.add(person)
         db.commit()
@@ -61,12 +195,25 @@ class CustomerController:
         return person
 
     @staticmethod
-    def update(db: Session, contact: str, data: CustomerUpdate) -> Optional[Person]:
-        person = CustomerController.get_by_contact(db, contact)
+    async def update(db: Session, contact: str, data: CustomerUpdate) -> Optional[Person]:
+        payload = data.model_dump(exclude_unset=True)
+        person = await run_in_threadpool(CustomerController._check_update_conflicts, db, contact, payload)
         if not person:
             return None
 
-        payload = data.model_dump(exclude_unset=True)
+        # An account with no credential logs in with its contact number; store that
+        # number as its password before the contact changes, so the login still works
+        hashed_pwd = None
+        new_contact = payload.get("person_contact")
+        if new_contact and new_contact != person.person_contact and is_password_unset(person.password):
+            hashed_pwd = await hash_password_async(person.person_contact)
+        return await run_in_threadpool(CustomerController._apply_update, db, person, payload, hashed_pwd)
+
+    @staticmethod
+    def _check_update_conflicts(db: Session, contact: str, payload: dict) -> Optional[Person]:
+        person = CustomerController.get_by_contact(db, contact)
+        if not person:
+            return None
 
         # If contact is being updated, ensure uniqueness
         new_contact = payload.get("person_contact")
@@ -85,9 +232,15 @@ class CustomerController:
                     status_code=status.HTTP_409_CONFLICT,
                     detail="Another customer with this email already exists"
                 )
+        return person
 
+    @staticmethod
+    def _apply_update(db: Session, person: Person, payload: dict, hashed_pwd: Optional[str]) -> Person:
         for key, value in payload.items():
             setattr(person, key, value)
+        if hashed_pwd and is_password_unset(person.password):
+            person.password = hashed_pwd
         db.commit()
+        CustomerController.reindex_customer(db, person.person_id)
         db.refresh(person)
         return person
\ No newline at end of file
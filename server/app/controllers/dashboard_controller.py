@@ -0,0 +1,192 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.store_versions import store_versions, CATALOG, SETTINGS
+from app.models.store import Store
+from app.models.product import Product
+from app.models.inventory import Inventory
+from app.models.daily_sales import DailySales
+
+DASHBOARD_DAYS = 30
+TOP_PRODUCTS = 10
+RANK_BY = ("units", "revenue")
+
+# store_id -> (lookback_days, every product sold in the window); one entry serves any n / rank
+top_products_cache = TTLCache(
+    maxsize=settings.TOP_PRODUCTS_CACHE_MAX_STORES,
+    ttl=settings.TOP_PRODUCTS_CACHE_TTL_SECONDS,
+)
+
+
+class DashboardController:
+    @staticmethod
+    def _rollup(db: Session, store_id: int, first_day: date, last_day: date = None):
+        """daily_sales rows for the store in [first_day, last_day]; a primary-key range scan."""
+        query = db.query().select_from(DailySales).filter(
+            DailySales.store_id == store_id,
+            DailySales.day >= first_day,
+        )
+        if last_day is not None:
+            query = query.filter(DailySales.day <= last_day)
+        return query
+
+    @staticmethod
+    def daily_query(db: Session, store_id: int, first_day: date):
+        """Orders and sales per day since first_day."""
+        return (
+            DashboardController._rollup(db, store_id, first_day)
+            .with_entities(
+                DailySales.day.label("day"),
+                func.coalesce(func.sum(DailySales.orders), 0).label("orders"),
+                func.coalesce(func.sum(DailySales.revenue), 0).label("sales"),
+            )
+            .group_by(DailySales.day)
+        )
+
+    @staticmethod
+    def top_products_query(db: Session, store_id: int, first_day: date, limit: int = TOP_PRODUCTS):
+        """The products with the most revenue since first_day."""
+        revenue = func.coalesce(func.sum(DailySales.revenue), 0)
+        return (
+            DashboardController._rollup(db, store_id, first_day)
+            .join(Product, Product.prod_id == DailySales.product_id)
+            .with_entities(Product.prod_id.label("product_id"), Product.prod_name.label("name"), revenue.label("sales"))
+            .group_by(Product.prod_id, Product.prod_name)
+            .order_by(revenue.desc())
+            .limit(limit)
+        )
+
+    @staticmethod
+    def sales_by_product_query(db: Session, store_id: int, lookback_days: int):
+        """Units and revenue per product over the lookback window (0 = all time)."""
+        query = db.query().select_from(DailySales).filter(DailySales.store_id == store_id)
+        if lookback_days:
+            query = query.filter(DailySales.day >= datetime.utcnow().date() - timedelta(days=lookback_days - 1))
+        return (
+            query.join(Product, Product.prod_id == DailySales.product_id)
+            .with_entities(
+                Product.prod_id.label("product_id"),
+                Product.SKU.label("sku"),
+                Product.prod_name.label("name"),
+                func.sum(DailySales.units).label("units"),
+                func.sum(DailySales.revenue).label("revenue"),
+            )
+            .group_by(Product.prod_id, Product.SKU, Product.prod_name)
+            .having(func.sum(DailySales.units) > 0)
+        )
+
+    @staticmethod
+    def get_dashboard(db: Session, store_id: int) -> dict:
+        """Admin dashboard KPIs, the daily orders/sales series and the top products.
+        Sales figures come from the daily_sales rollup, so "last 7 days" means the last
+        7 calendar days (UTC) including today.
+        """
+        store = db.query(Store).filter(Store.store_id == store_id).first()
+        if not store:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Store not found")
+
+        today = datetime.utcnow().date()
+        first_day = today - timedelta(days=DASHBOARD_DAYS - 1)
+
+        by_day = {str(r.day)[:10]: r for r in DashboardController.daily_query(db, store_id, first_day).all()}
+        daily = []
+        for i in range(DASHBOARD_DAYS):
+            d = first_day + timedelta(days=i)
+            r = by_day.get(d.isoformat())
+            daily.append(dict(date=d, orders=int(r.orders) if r else 0, sales=round(float(r.sales), 2) if r else 0.0))
+
+        top_products = [
+            dict(product_id=r.product_id, name=r.name, sales=round(float(r.sales), 2))
+            for r in DashboardController.top_products_query(db, store_id, first_day).all()
+        ]
+
+        active_products = db.query(func.count(Product.prod_id)).filter(Product.store_id == store_id).scalar()
+        low_stock_products = (
+            db.query(func.count(Inventory.inventory_id))
+            .filter(Inventory.store_id == store_id, Inventory.on_hand < store.low_stock_threshold)
+            .scalar()
+        )
+
+        return {
+            "active_products": active_products or 0,
+            "orders_last_7_days": sum(d["orders"] for d in daily[-7:]),
+            "low_stock_products": low_stock_products or 0,
+            "low_stock_threshold": store.low_stock_threshold,
+            "total_sales_last_30_days": round(sum(d["sales"] for d in daily), 2),
+            "daily": daily,
+            "top_products": top_products,
+        }
+
+    @staticmethod
+    def get_day_detail(db: Session, store_id: int, day: date) -> dict:
+        """Per-product quantity and revenue sold on one (UTC) day."""
+        rows = (
+            DashboardController._rollup(db, store_id, day, day)
+            .join(Product, Product.prod_id == DailySales.product_id)
+            .with_entities(
+                Product.prod_id.label("product_id"),
+                Product.prod_name.label("name"),
+                Product.SKU.label("sku"),
+                DailySales.orders,
+                DailySales.units,
+                DailySales.revenue,
+            )
+            .order_by(DailySales.revenue.desc())
+            .all()
+        )
+        products = [
+            dict(product_id=r.product_id, name=r.name, sku=r.sku, quantity=r.units, revenue=round(float(r.revenue), 2))
+            for r in rows
+        ]
+        return {
+            "date": day,
+            "total_orders": sum(r.orders for r in rows),
+            "total_revenue": round(sum(p["revenue"] for p in products), 2),
+            "products": products,
+        }
+
+    @staticmethod
+    def _sales_by_product(db: Session, store_id: int, lookback_days: int) -> list:
+        """Units and revenue per product over the lookback window, in one aggregate query."""
+        rows = DashboardController.sales_by_product_query(db, store_id, lookback_days).all()
+        return [
+            dict(product_id=r.product_id, sku=r.sku, name=r.name, units=int(r.units), revenue=round(float(r.revenue), 2))
+            for r in rows
+        ]
+
+    @staticmethod
+    def get_top_products(db: Session, store_id: int, n: int, by: str = "units") -> dict:
+        """Best sellers over the store's sales_lookback_days (UTC days including today; 0 = all time).
+
+        The full per-product totals are cached per store, so refreshes with any n or
+        ranking are served from memory until the store's orders change state
+        (see invalidate_top_products) or the entry expires.
+        """
+        if by not in RANK_BY:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"by must be one of {', '.join(RANK_BY)}")
+
+        cached = top_products_cache.get(store_id)
+        if cached is None:
+            lookback_days = db.query(Store.sales_lookback_days).filter(Store.store_id == store_id).scalar()
+            if lookback_days is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Store not found")
+            cached = (lookback_days, DashboardController._sales_by_product(db, store_id, lookback_days))
+            top_products_cache.set(store_id, cached)
+
+        lookback_days, products = cached
+        other = "revenue" if by == "units" else "units"
+        ranked = sorted(products, key=lambda p: (p[by], p[other], -p["product_id"]), reverse=True)
+        return {"lookback_days": lookback_days, "by": by, "products": ranked[:n]}
+
+    @staticmethod
+    def invalidate_top_products(store_id: int) -> None:
+        """Drop the store's cached ranking. Call after committing a change to its sales."""
+        top_products_cache.invalidate(store_id)
+
+
+# Order states and the lookback window can also change in another worker
+store_versions.subscribe(CATALOG, DashboardController.invalidate_top_products)
+store_versions.subscribe(SETTINGS, DashboardController.invalidate_top_products)
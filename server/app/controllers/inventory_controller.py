@@ -0,0 +1,325 @@
+"""
+Stock movements on Inventory rows.
+
+A row keeps its stock (`units`) and the part of it held by pending orders
+(`reserved_units`) either on the Inventory row or, once striped, spread over
+`Inventory.stripes` InventoryStripe rows so concurrent movements on a hot SKU
+lock different rows. Callers only deal in inventory ids and quantities.
+"""
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.events import event_broker
+from app.models.inventory import Inventory
+from app.models.inventory_stripe import InventoryStripe
+from app.models.product import Product
+
+
+class StockContention:
+    """Counts slow stock decrements per inventory row and flags rows worth striping.
+
+    A single-row conditional UPDATE that takes longer than `slow_ms` has almost
+    always been waiting on another transaction's lock on that row.
+    """
+
+    def __init__(self, slow_ms: float, threshold: int, window: float):
+        self.slow_ms = slow_ms
+        self.threshold = threshold
+        self.window = window
+        self._slow: "defaultdict[int, deque]" = defaultdict(deque)
+        self._flagged: set = set()
+        self._lock = threading.Lock()
+        self.slow_updates = 0
+        self.auto_striped = 0
+
+    def record(self, inventory_id: int, elapsed_ms: float) -> None:
+        if elapsed_ms < self.slow_ms:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self.slow_updates += 1
+            recent = self._slow[inventory_id]
+            recent.append(now)
+            while recent[0] <= now - self.window:
+                recent.popleft()
+            if len(recent) >= self.threshold:
+                self._flagged.add(inventory_id)
+                del self._slow[inventory_id]
+
+    def take_flagged(self) -> list:
+        """Return and forget the inventory ids that crossed the threshold."""
+        with self._lock:
+            flagged, self._flagged = sorted(self._flagged), set()
+            return flagged
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "slow_update_ms": self.slow_ms,
+                "slow_updates": self.slow_updates,
+                "rows_watched": len(self._slow),
+                "auto_striped": self.auto_striped,
+            }
+
+
+stock_contention = StockContention(
+    slow_ms=settings.STOCK_SLOW_UPDATE_MS,
+    threshold=settings.STOCK_AUTO_STRIPE_AFTER,
+    window=settings.STOCK_CONTENTION_WINDOW_SECONDS,
+)
+
+
+# What a counter must hold before a move may touch it
+FREE = "free"  # units - reserved_units >= qty
+HELD = "held"  # reserved_units >= qty (and units >= qty when units are taken too)
+
+
+def _condition(model, need: str, qty: int, d_units: int) -> list:
+    if need == FREE:
+        return [model.units - model.reserved_units >= qty]
+    if need == HELD:
+        return [model.reserved_units >= qty] + ([model.units >= qty] if d_units else [])
+    return []
+
+
+def _split(room: list, qty: int) -> list:
+    """Spread qty over counters with the given room, first come first served."""
+    parts = []
+    for r in room:
+        part = min(r, qty)
+        parts.append(part)
+        qty -= part
+    return parts
+
+
+def _values(model, qty: int, d_units: int, d_reserved: int) -> dict:
+    values = {}
+    if d_units:
+        values[model.units] = model.units + d_units * qty
+    if d_reserved:
+        values[model.reserved_units] = model.reserved_units + d_reserved * qty
+    return values
+
+
+class InventoryController:
+    @staticmethod
+    def items_query(db: Session, store_id: int):
+        """The store's inventory rows with their product, as GET /orders/inventory lists them."""
+        return (
+            db.query(
+                Inventory.inventory_id,
+                Product.prod_id.label("product_id"),
+                Product.SKU,
+                Product.prod_name,
+                Inventory.on_hand.label("units"),
+                Inventory.reserved,
+                Product.unit_price,
+            )
+            .join(Product, Product.prod_id == Inventory.product_id)
+            .filter(Inventory.store_id == store_id)
+        )
+
+    @staticmethod
+    def _stripes(db: Session, inventory_id: int) -> int:
+        return db.query(Inventory.stripes).filter(Inventory.inventory_id == inventory_id).scalar() or 0
+
+    @staticmethod
+    def _move(db: Session, inventory_id: int, qty: int, need: str, d_units: int, d_reserved: int) -> bool:
+        """Add d_units * qty to units and d_reserved * qty to reserved_units, if `need` allows it.
+
+        Plain rows: one conditional UPDATE. Striped rows: the same UPDATE against one
+        slot at a time starting from a random one, so the inventory row itself is never
+        locked; only if no single slot qualifies are the row and all its slots locked
+        and the move spread over them. Returns False if there isn't enough to move.
+        """
+        stripes = InventoryController._stripes(db, inventory_id)
+        if not stripes:
+            started = time.perf_counter()
+            moved = db.execute(
+                update(Inventory)
+                .where(Inventory.inventory_id == inventory_id, Inventory.stripes == 0, *_condition(Inventory, need, qty, d_units))
+                .values(_values(Inventory, qty, d_units, d_reserved))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            stock_contention.record(inventory_id, (time.perf_counter() - started) * 1000)
+            if moved:
+                return True
+            # Not enough, or the row was striped in between
+            stripes = InventoryController._stripes(db, inventory_id)
+            if not stripes:
+                return False
+
+        start = random.randrange(stripes)
+        for i in range(1 if need is None else stripes):
+            moved = db.execute(
+                update(InventoryStripe)
+                .where(
+                    InventoryStripe.inventory_id == inventory_id,
+                    InventoryStripe.slot == (start + i) % stripes,
+                    *_condition(InventoryStripe, need, qty, d_units),
+                )
+                .values(_values(InventoryStripe, qty, d_units, d_reserved))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if moved:
+                return True
+
+        # No single slot qualifies (or they were folded away): lock everything and spread it
+        inv = (
+            db.query(Inventory).filter(Inventory.inventory_id == inventory_id)
+            .with_for_update().populate_existing().first()
+        )
+        if not inv:
+            return False
+        slots = (
+            db.query(InventoryStripe)
+            .filter(InventoryStripe.inventory_id == inventory_id)
+            .order_by(InventoryStripe.slot)
+            .with_for_update()
+            .populate_existing()
+            .all()
+        )
+        counters = [inv] + slots
+        if need == FREE:
+            room = [max(c.units - c.reserved_units, 0) for c in counters]
+            if sum(room) < qty:
+                return False
+            for c, part in zip(counters, _split(room, qty)):
+                c.units += d_units * part
+                c.reserved_units += d_reserved * part
+        elif need == HELD:
+            # Totals are what matter: the hold and the stock may sit on different counters
+            held = [max(c.reserved_units, 0) for c in counters]
+            stock = [max(c.units, 0) for c in counters]
+            if sum(held) < qty or (d_units and sum(stock) < qty):
+                return False
+            for c, part in zip(counters, _split(held, qty)):
+                c.reserved_units -= part
+            if d_units:
+                for c, part in zip(counters, _split(stock, qty)):
+                    c.units -= part
+        else:
+            inv.units += d_units * qty
+            inv.reserved_units += d_reserved * qty
+        db.flush()
+        return True
+
+    @staticmethod
+    def reserve(db: Session, inventory_id: int, qty: int) -> bool:
+        """Hold qty units for a pending order. Returns False if fewer than qty are available."""
+        return InventoryController._move(db, inventory_id, qty, FREE, 0, +1)
+
+    @staticmethod
+    def release(db: Session, inventory_id: int, qty: int) -> None:
+        """Give back a pending order's hold."""
+        InventoryController._move(db, inventory_id, qty, HELD, 0, -1)
+
+    @staticmethod
+    def take(db: Session, inventory_id: int, qty: int, reserved: bool = False) -> bool:
+        """Remove qty units from stock. Returns False if there isn't enough.
+
+        reserved=True consumes a hold placed by reserve(); otherwise only units not
+        held by other pending orders can be taken.
+        """
+        if reserved:
+            return InventoryController._move(db, inventory_id, qty, HELD, -1, -1)
+        return InventoryController._move(db, inventory_id, qty, FREE, -1, 0)
+
+    @staticmethod
+    def give(db: Session, inventory_id: int, qty: int) -> None:
+        """Add qty units (restock or cancellation) to the row, or to one random slot if striped."""
+        if not InventoryController._move(db, inventory_id, qty, None, +1, 0):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inventory not found")
+
+    @staticmethod
+    def publish_stock(db: Session, store_id: int, inventory_ids) -> None:
+        """Send the rows' current stock to the store's live feed. Call after commit.
+
+        Rows that no longer exist are announced with `deleted: true`.
+        """
+        inventory_ids = sorted(set(inventory_ids))
+        if not inventory_ids or not event_broker.has_subscribers(store_id):
+            return
+        rows = {
+            r.inventory_id: r
+            for r in db.query(Inventory.inventory_id, Inventory.product_id, Inventory.on_hand, Inventory.reserved)
+            .filter(Inventory.inventory_id.in_(inventory_ids))
+        }
+        for inventory_id in inventory_ids:
+            r = rows.get(inventory_id)
+            if r is None:
+                event_broker.publish(store_id, "stock.changed", dict(inventory_id=inventory_id, deleted=True))
+                continue
+            units, reserved = r.on_hand or 0, r.reserved or 0
+            event_broker.publish(store_id, "stock.changed", dict(
+                inventory_id=inventory_id,
+                product_id=r.product_id,
+                units=units,
+                reserved=reserved,
+                available=units - reserved,
+            ))
+
+    @staticmethod
+    def set_stripes(db: Session, inventory_id: int, stripes: int) -> Inventory:
+        """Re-split the row's stock evenly over `stripes` slots (0 folds it back into units)."""
+        if stripes < 0 or stripes > settings.STOCK_MAX_STRIPES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"stripes must be between 0 and {settings.STOCK_MAX_STRIPES}"
+            )
+
+        inv = (
+            db.query(Inventory).filter(Inventory.inventory_id == inventory_id)
+            .with_for_update().populate_existing().first()
+        )
+        if not inv:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inventory not found")
+        existing = {
+            s.slot: s
+            for s in db.query(InventoryStripe)
+            .filter(InventoryStripe.inventory_id == inventory_id)
+            .with_for_update()
+            .populate_existing()
+            .all()
+        }
+        total = inv.units + sum(s.units for s in existing.values())
+        held = inv.reserved_units + sum(s.reserved_units for s in existing.values())
+
+        # Both split the same way, so a slot never holds more than it has while held <= total
+        share, extra = divmod(total, stripes) if stripes else (0, 0)
+        held_share, held_extra = divmod(held, stripes) if stripes else (0, 0)
+        for slot in range(stripes):
+            units = share + (1 if slot < extra else 0)
+            reserved_units = held_share + (1 if slot < held_extra else 0)
+            if slot in existing:
+                row = existing.pop(slot)
+                row.units, row.reserved_units = units, reserved_units
+            else:
+                db.add(InventoryStripe(inventory_id=inventory_id, slot=slot, units=units, reserved_units=reserved_units))
+        for s in existing.values():
+            db.delete(s)
+        inv.units = 0 if stripes else total
+        inv.reserved_units = 0 if stripes else held
+        inv.stripes = stripes
+        db.flush()
+        return inv
+
+    @staticmethod
+    def apply_auto_stripes(db: Session) -> None:
+        """Stripe the rows flagged by stock_contention. Call after the request's own commit."""
+        if settings.STOCK_AUTO_STRIPES <= 0:
+            return
+        for inventory_id in stock_contention.take_flagged():
+            try:
+                if InventoryController._stripes(db, inventory_id) == 0:
+                    InventoryController.set_stripes(db, inventory_id, settings.STOCK_AUTO_STRIPES)
+                    db.commit()
+                    stock_contention.auto_striped += 1
+            except SQLAlchemyError:
+                db.rollback()
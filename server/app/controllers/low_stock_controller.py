@@ -0,0 +1,182 @@
+"""
+Per-store set of inventory rows whose stock on hand is below the store's
+low_stock_threshold.
+
+The set is loaded once per store and then kept current by re-checking only
+the rows a committed write touched (see LowStockTracker.refresh), so reading
+it never scans inventory. The set's version is the sum of the store's shared
+CATALOG and SETTINGS versions, which every stock or threshold write bumps, so
+it means the same in every worker; GET /store/low-stock/changes long-polls on it.
+"""
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.store_versions import store_versions, CATALOG, SETTINGS
+from app.models.store import Store
+from app.models.product import Product
+from app.models.inventory import Inventory
+
+
+class _StoreLowStock:
+    __slots__ = ("threshold", "items", "loaded_at")
+
+    def __init__(self, threshold: int, items: dict):
+        self.threshold = threshold
+        self.items = items  # inventory_id -> item dict
+        self.loaded_at = time.monotonic()
+
+
+def _item(row) -> dict:
+    return dict(
+        inventory_id=row.inventory_id,
+        product_id=row.product_id,
+        sku=row.SKU,
+        name=row.prod_name,
+        units=row.on_hand,
+    )
+
+
+class LowStockTracker:
+    """Thread-safe low-stock sets keyed by store, with long-poll waiters.
+
+    Each worker keeps its own copy: writes made by other processes reset it
+    through the store's CATALOG / SETTINGS versions (see app/core/store_versions.py),
+    and every store is reloaded at most `resync_seconds` after its last load anyway.
+    """
+
+    def __init__(self, resync_seconds: float):
+        self.resync_seconds = resync_seconds
+        self._stores: "dict[int, _StoreLowStock]" = {}
+        self._waiters: "defaultdict[int, list]" = defaultdict(list)  # store_id -> [(loop, asyncio.Event)]
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.crossings = 0
+
+    @staticmethod
+    def _rows(db: Session, store_id: int):
+        return (
+            db.query(Inventory.inventory_id, Inventory.product_id, Product.SKU, Product.prod_name, Inventory.on_hand)
+            .join(Product, Product.prod_id == Inventory.product_id)
+            .filter(Inventory.store_id == store_id)
+        )
+
+    @staticmethod
+    def _version(store_id: int) -> int:
+        return store_versions.get(store_id, CATALOG) + store_versions.get(store_id, SETTINGS)
+
+    @staticmethod
+    def _mirrored_version(store_id: int):
+        """_version from this worker's mirror alone (None if the store was never read); safe under the lock."""
+        versions = [store_versions.peek(store_id, scope) for scope in (CATALOG, SETTINGS)]
+        return None if None in versions else sum(versions)
+
+    def _wake(self, store_id: int) -> None:
+        """Wake the store's long-poll waiters. Caller holds the lock."""
+        for loop, event in self._waiters.pop(store_id, []):
+            loop.call_soon_threadsafe(event.set)
+
+    def _load(self, db: Session, store_id: int) -> _StoreLowStock:
+        threshold = db.query(Store.low_stock_threshold).filter(Store.store_id == store_id).scalar()
+        if threshold is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Store not found")
+        rows = LowStockTracker._rows(db, store_id).filter(Inventory.on_hand < threshold).all()
+        state = _StoreLowStock(threshold, {r.inventory_id: _item(r) for r in rows})
+        with self._lock:
+            self.loads += 1
+            old = self._stores.get(store_id)
+            self._stores[store_id] = state
+            if old is None or old.threshold != threshold or old.items != state.items:
+                self._wake(store_id)
+        return state
+
+    def snapshot(self, db: Session, store_id: int) -> dict:
+        """The store's low-stock rows (fewest units first), its threshold and version."""
+        # Read before the set, so a write landing in between shows up as a newer version later
+        version = self._version(store_id)
+        with self._lock:
+            state = self._stores.get(store_id)
+        if state is None or time.monotonic() - state.loaded_at > self.resync_seconds:
+            state = self._load(db, store_id)
+        with self._lock:
+            items = sorted(state.items.values(), key=lambda i: (i["units"], i["inventory_id"]))
+            return {"threshold": state.threshold, "version": version, "items": items}
+
+    def refresh(self, db: Session, store_id: int, inventory_ids) -> None:
+        """Re-check the given rows after a committed stock change.
+
+        Stores that were never loaded in this worker are skipped; their first
+        snapshot() reads fresh state anyway.
+        """
+        inventory_ids = set(inventory_ids)
+        with self._lock:
+            state = self._stores.get(store_id)
+        if state is None or not inventory_ids:
+            return
+        rows = {r.inventory_id: r for r in LowStockTracker._rows(db, store_id).filter(Inventory.inventory_id.in_(inventory_ids))}
+        with self._lock:
+            changed = False
+            for inventory_id in inventory_ids:
+                row = rows.get(inventory_id)
+                if row is not None and row.on_hand < state.threshold:
+                    item = _item(row)
+                    if inventory_id not in state.items:
+                        self.crossings += 1
+                    if state.items.get(inventory_id) != item:
+                        state.items[inventory_id] = item
+                        changed = True
+                elif state.items.pop(inventory_id, None) is not None:
+                    changed = True
+            if changed:
+                self._wake(store_id)
+
+    def reset(self, store_id: int) -> None:
+        """Forget the store's set (e.g. its threshold changed); waiters re-read it."""
+        with self._lock:
+            self._stores.pop(store_id, None)
+            self._wake(store_id)
+
+    async def wait(self, store_id: int, since: int, timeout: float) -> None:
+        """Return once the store's set may have changed since version `since`, or after timeout seconds."""
+        # The first read of a store goes to the database, so it runs off the event loop
+        if await run_in_threadpool(self._version, store_id) != since:
+            return
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        with self._lock:
+            # Re-check against the in-memory mirror only: a bump that landed since the
+            # read above has already advanced it, and a later one will wake us
+            if self._mirrored_version(store_id) != since:
+                return
+            self._waiters[store_id].append((loop, event))
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(store_id)
+                if waiters and (loop, event) in waiters:
+                    waiters.remove((loop, event))
+                    if not waiters:
+                        del self._waiters[store_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "stores": len(self._stores),
+                "low_stock_rows": sum(len(s.items) for s in self._stores.values()),
+                "loads": self.loads,
+                "crossings": self.crossings,
+                "waiters": sum(len(w) for w in self._waiters.values()),
+            }
+
+
+low_stock_tracker = LowStockTracker(resync_seconds=settings.LOW_STOCK_RESYNC_SECONDS)
+# Stock and threshold changes made in other workers
+store_versions.subscribe(CATALOG, low_stock_tracker.reset)
+store_versions.subscribe(SETTINGS, low_stock_tracker.reset)
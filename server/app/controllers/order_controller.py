@@ -1,18 +1,110 @@
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import and_, func, insert, or_, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException, status
 from app.models.order import Order
 from app.models.inventory import Inventory
 from app.models.product import Product
 from app.models.person import Person
 from app.models.user import User
-from app.schemas.order import OrderCreate, OrderUpdate
-from app.core.security import hash_password
+from app.models.checkout import Checkout
+from app.schemas.order import OrderCreate, OrderUpdate, OrderBatchCreate
+from app.core.security import UNSET_PASSWORD
+from app.core.events import event_broker
+from app.core.store_versions import store_versions, CATALOG
+from app.controllers.inventory_controller import InventoryController
+from app.controllers.sales_rollup_controller import SalesRollupController
+from app.controllers.dashboard_controller import DashboardController
+from app.controllers.low_stock_controller import low_stock_tracker
+from app.controllers.customer_controller import CustomerController
 
 
 ALLOWED_STATUSES = {"pending", "confirmed", "cancelled", "shipped"}
 
 
 class OrderController:
+    @staticmethod
+    def list_query(
+        db: Session,
+        store_id: int,
+        status: str = None,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        customer_contact: str = None,
+    ):
+        """Rows of GET /orders for the store, filtered but unordered: count it, or page it with page_query."""
+        query = (
+            db.query(
+                Order.order_id,
+                Order.status,
+                Order.inventory_id,
+                Order.order_quantity,
+                Order.person_id,
+                Order.created_by,
+                Order.created_at,
+                Order.checkout_id,
+                Order.stock_reserved,
+                Person.person_contact,
+                Product.unit_price,
+            )
+            .join(Person, Person.person_id == Order.person_id)
+            .join(Product, Product.prod_id == Order.product_id)
+            .filter(Order.store_id == store_id)
+        )
+        if status:
+            query = query.filter(Order.status == status)
+        if start_date:
+            query = query.filter(Order.created_at >= start_date)
+        if end_date:
+            query = query.filter(Order.created_at <= end_date)
+        if customer_contact:
+            query = query.filter(Person.person_contact == customer_contact)
+        return query
+
+    @staticmethod
+    def page_query(query, after=None, limit: int = 100):
+        """A keyset page of list_query, newest first: `limit` rows after the (created_at, order_id) pair `after`."""
+        if after:
+            after_created_at, after_order_id = after
+            query = query.filter(
+                or_(
+                    Order.created_at < after_created_at,
+                    and_(Order.created_at == after_created_at, Order.order_id < after_order_id),
+                )
+            )
+        return query.order_by(Order.created_at.desc(), Order.order_id.desc()).limit(limit)
+
+    @staticmethod
+    def receipt_lines_query(db: Session, checkout_id: int):
+        """The lines of one checkout with their product, in order."""
+        return (
+            db.query(
+                Order.order_id,
+                Order.status,
+                Order.inventory_id,
+                Order.order_quantity,
+                Order.created_at,
+                Product.SKU,
+                Product.prod_name,
+                Product.unit_price,
+            )
+            .join(Product, Product.prod_id == Order.product_id)
+            .filter(Order.checkout_id == checkout_id)
+            .order_by(Order.order_id.asc())
+        )
+
+    @staticmethod
+    def expired_reservations_query(db: Session, older_than: datetime, batch_size: int = 500):
+        """Oldest pending orders still holding stock that were created before `older_than`."""
+        return (
+            db.query(Order.order_id, Order.store_id, Order.inventory_id, Order.order_quantity)
+            .filter(Order.stock_reserved.is_(True), Order.created_at < older_than, Order.status == "pending")
+            .order_by(Order.created_at)
+            .limit(batch_size)
+        )
+
     @staticmethod
     def _assert_inv_same_store(db: Session, inventory_id: int, store_id: int) -> Inventory:
         inv = db.query(Inventory).filter(Inventory.inventory_id == inventory_id).first()
@@ -39,6 +131,100 @@ class OrderController:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
         return prod
 
+    @staticmethod
+    def _get_or_create_person(db: Session, contact: str) -> Person:
+        person = db.query(Person).filter(Person.person_contact == contact).first()
+        if not person:
+            # Create a minimal person record; no credential is hashed here,
+            # the default password (contact) is hashed on first login
+            person = Person(
+                person_name=contact,
+                person_email=f"{contact}@example.com",
+                person_contact=contact,
+                person_address="",
+                password=UNSET_PASSWORD,
+            )
+            db.add(person)
+            db.flush()  # get person_id without full commit yet
+        return person
+
+    @staticmethod
+    def _open_checkout(db: Session, store_id: int, user_id: int, person_id: int, created_at: datetime, lines: list) -> Checkout:
+        """Insert the receipt header for a checkout. `lines` is a list of (quantity, unit_price)."""
+        checkout = Checkout(
+            person_id=person_id,
+            created_by=user_id,
+            store_id=store_id,
+            created_at=created_at,
+            line_count=len(lines),
+            total_quantity=sum(qty for qty, _ in lines),
+            total_amount=sum(qty * price for qty, price in lines),
+        )
+        db.add(checkout)
+        db.flush()  # get checkout_id for the order lines
+        return checkout
+
+    @staticmethod
+    def _refresh_checkout_totals(db: Session, checkout_id: int) -> None:
+        """Recompute header totals from the checkout's lines (indexed child scan)."""
+        db.flush()
+        totals = (
+            db.query(
+                func.count(Order.order_id).label("line_count"),
+                func.coalesce(func.sum(Order.order_quantity), 0).label("total_quantity"),
+                func.coalesce(func.sum(Order.order_quantity * Product.unit_price), 0).label("total_amount"),
+            )
+            .join(Product, Product.prod_id == Order.product_id)
+            .filter(Order.checkout_id == checkout_id)
+            .one()
+        )
+        db.query(Checkout).filter(Checkout.checkout_id == checkout_id).update(
+            {
+                Checkout.line_count: totals.line_count,
+                Checkout.total_quantity: totals.total_quantity,
+                Checkout.total_amount: totals.total_amount,
+            },
+            synchronize_session=False,
+        )
+
+    @staticmethod
+    def publish(db: Session, store_id: int, event: str, order_ids, inventory_ids) -> None:
+        """Send the orders (as GET /orders lists them) and their stock to the store's live feed.
+        Call after commit; does nothing when no one is subscribed.
+        """
+        if not event_broker.has_subscribers(store_id):
+            return
+        rows = (
+            db.query(
+                Order.order_id, Order.status, Order.inventory_id, Order.order_quantity, Order.person_id,
+                Order.created_by, Order.created_at, Order.checkout_id, Order.stock_reserved,
+                Person.person_contact, Product.unit_price, Product.prod_name,
+            )
+            .join(Person, Person.person_id == Order.person_id)
+            .join(Product, Product.prod_id == Order.product_id)
+            .filter(Order.order_id.in_(list(order_ids)))
+            .order_by(Order.order_id)
+            .all()
+        ) if order_ids else []
+        event_broker.publish_many(store_id, event, (
+            dict(
+                order_id=r.order_id,
+                status=r.status,
+                inventory_id=r.inventory_id,
+                order_quantity=r.order_quantity,
+                person_id=r.person_id,
+                created_by=r.created_by,
+                created_at=r.created_at,
+                person_contact=r.person_contact,
+                unit_price=float(r.unit_price) if r.unit_price else 0,
+                prod_name=r.prod_name,
+                checkout_id=r.checkout_id,
+                stock_reserved=r.stock_reserved,
+            )
+            for r in rows
+        ))
+        InventoryController.publish_stock(db, store_id, inventory_ids)
+
     @staticmethod
     def create(db: Session, payload: dict, data: OrderCreate) -> Order:
         # Roles checked at route; ensure store context
@@ -50,40 +236,162 @@ class OrderController:
         # Ensure inventory belongs to caller's store
         inv = OrderController._assert_inv_same_store(db, data.inventory_id, store_id)
 
-        # Check if sufficient inventory is available
-        if data.order_quantity > inv.units:
+        # Hold the stock for this pending order; fails if not enough is available
+        if not InventoryController.reserve(db, inv.inventory_id, data.order_quantity):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient inventory. Available: {inv.units}, Requested: {data.order_quantity}"
+                detail=f"Insufficient inventory. Available: {inv.available}, Requested: {data.order_quantity}"
             )
 
         # Find or create person by contact
-        person = db.query(Person).filter(Person.person_contact == data.contact).first()
-        if not person:
-            # Create a minimal person record with default password = contact
-            person = Person(
-                person_name=data.contact,
-                person_email=f"{data.contact}@example.com",
-                person_contact=data.contact,
-                person_address="",
-                password=hash_password(data.contact),
-            )
-            db.add(person)
-            db.flush()  # get person_id without full commit yet
+        person = OrderController._get_or_create_person(db, data.contact)
+        person_id = person.person_id
+
+        # A single order is its own one-line checkout
+        product = db.query(Product).filter(Product.prod_id == inv.product_id).first()
+        created_at = datetime.utcnow()
+        checkout = OrderController._open_checkout(
+            db, store_id, user_id, person.person_id, created_at,
+            [(data.order_quantity, product.unit_price if product else 0)],
+        )
 
         # Create order with pending status
         order = Order(
             status="pending",
             inventory_id=inv.inventory_id,
+            product_id=inv.product_id,
             created_by=user_id,
             person_id=person.person_id,
             order_quantity=data.order_quantity,
+            checkout_id=checkout.checkout_id,
+            store_id=store_id,
+            stock_reserved=True,
+            created_at=created_at,
+            updated_at=created_at,
         )
         db.add(order)
+        new_customer = CustomerController.record_order(db, store_id, person_id, created_at)
         db.commit()
+        store_versions.bump(store_id, CATALOG)
+        if new_customer:
+            CustomerController.reindex_customer(db, person_id, [store_id])
+        OrderController.publish(db, store_id, "order.created", [order.order_id], [order.inventory_id])
         db.refresh(order)
         return order
 
+    @staticmethod
+    def create_batch(db: Session, payload: dict, data: OrderBatchCreate) -> dict:
+        """Create one pending order per cart line in a single transaction.
+        Returns the receipt for the new orders (same shape as GET /orders/{id}/receipt).
+        """
+        store_id = payload.get("store_id")
+        user_id = payload.get("user_id")
+        if not store_id or not user_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing auth context")
+
+        # Lines for the same inventory are checked against stock together
+        requested = defaultdict(int)
+        for line in data.lines:
+            requested[line.inventory_id] += line.order_quantity
+
+        # Validate every inventory row (and load its product) with one IN query
+        rows = (
+            db.query(Inventory, Product)
+            .join(Product, Product.prod_id == Inventory.product_id)
+            .filter(Inventory.inventory_id.in_(requested.keys()))
+            .all()
+        )
+        by_inv = {inv.inventory_id: (inv, prod) for inv, prod in rows}
+        for inventory_id, qty in requested.items():
+            found = by_inv.get(inventory_id)
+            if not found:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Inventory {inventory_id} not found")
+            inv, prod = found
+            if inv.store_id != store_id:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inventory belongs to another store")
+
+        # Hold stock per inventory row, in id order so concurrent checkouts lock rows consistently
+        for inventory_id in sorted(requested):
+            qty = requested[inventory_id]
+            if not InventoryController.reserve(db, inventory_id, qty):
+                inv, prod = by_inv[inventory_id]
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Insufficient inventory for {prod.SKU}. Available: {inv.available}, Requested: {qty}"
+                )
+
+        person = OrderController._get_or_create_person(db, data.contact)
+        person_id = person.person_id
+
+        created_at = datetime.utcnow()
+        checkout = OrderController._open_checkout(
+            db, store_id, user_id, person.person_id, created_at,
+            [(line.order_quantity, by_inv[line.inventory_id][1].unit_price) for line in data.lines],
+        )
+
+        # One multi-row INSERT for all lines, then read their ids back by checkout
+        db.execute(
+            insert(Order),
+            [
+                dict(
+                    status="pending",
+                    inventory_id=line.inventory_id,
+                    product_id=by_inv[line.inventory_id][0].product_id,
+                    created_by=user_id,
+                    person_id=person.person_id,
+                    order_quantity=line.order_quantity,
+                    checkout_id=checkout.checkout_id,
+                    store_id=store_id,
+                    stock_reserved=True,
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+                for line in data.lines
+            ],
+        )
+        new_customer = CustomerController.record_order(db, store_id, person_id, created_at, len(data.lines))
+        orders = (
+            db.query(Order.order_id, Order.status, Order.inventory_id, Order.order_quantity)
+            .filter(Order.checkout_id == checkout.checkout_id)
+            .order_by(Order.order_id.asc())
+            .all()
+        )
+
+        # Build the receipt from values already in memory; no refresh round trips
+        lines = []
+        for order in orders:
+            _, prod = by_inv[order.inventory_id]
+            unit_price = float(prod.unit_price)
+            lines.append(dict(
+                order_id=order.order_id,
+                status=order.status,
+                inventory_id=order.inventory_id,
+                SKU=prod.SKU,
+                prod_name=prod.prod_name,
+                quantity=order.order_quantity,
+                unit_price=unit_price,
+                subtotal=unit_price * order.order_quantity,
+                created_at=created_at,
+            ))
+        receipt = {
+            "order_id": orders[0].order_id,
+            "checkout_id": checkout.checkout_id,
+            "person_id": person.person_id,
+            "person_name": person.person_name,
+            "person_contact": person.person_contact,
+            "person_email": person.person_email,
+            "person_address": person.person_address,
+            "created_at": created_at,
+            "lines": lines,
+            "grand_total": sum(l["subtotal"] for l in lines),
+        }
+        db.commit()
+        store_versions.bump(store_id, CATALOG)
+        if new_customer:
+            CustomerController.reindex_customer(db, person_id, [store_id])
+        OrderController.publish(db, store_id, "order.created", [o.order_id for o in orders], requested.keys())
+        return receipt
+
     @staticmethod
     def update(db: Session, payload: dict, order_id: int, data: OrderUpdate) -> Order:
         store_id = payload.get("store_id")
@@ -93,69 +401,69 @@ class OrderController:
         order = db.query(Order).filter(Order.order_id == order_id).first()
         if not order:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
-
-        # ensure order inventory belongs to same store via inventory
-        inv = db.query(Inventory).filter(Inventory.inventory_id == order.inventory_id).first()
-        if not inv or inv.store_id != store_id:
+        if order.store_id != store_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Order belongs to another store")
 
         if order.status != "pending":
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only pending orders can be edited")
+        previous_inventory_id = order.inventory_id
 
-        if data.inventory_id is not None:
-            new_inv = OrderController._assert_inv_same_store(db, data.inventory_id, store_id)
-            # Check inventory level for the new inventory
-            qty_to_check = data.order_quantity if data.order_quantity is not None else order.order_quantity
-            if qty_to_check > new_inv.units:
+        if data.inventory_id is not None or data.order_quantity is not None:
+            if data.inventory_id is not None:
+                inv = OrderController._assert_inv_same_store(db, data.inventory_id, store_id)
+            else:
+                inv = OrderController._get_inventory(db, order.inventory_id)
+            qty = data.order_quantity if data.order_quantity is not None else order.order_quantity
+
+            # Claim the line (still pending, hold unchanged) before swapping its hold
+            claimed = db.execute(
+                update(Order)
+                .where(
+                    Order.order_id == order.order_id,
+                    Order.status == "pending",
+                    Order.stock_reserved == order.stock_reserved,
+                )
+                .values(inventory_id=inv.inventory_id, product_id=inv.product_id, order_quantity=qty, stock_reserved=True)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not claimed:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Order status changed, retry")
+
+            available = inv.available
+            if order.stock_reserved:
+                InventoryController.release(db, order.inventory_id, order.order_quantity)
+                if inv.inventory_id == order.inventory_id:
+                    available += order.order_quantity
+            if not InventoryController.reserve(db, inv.inventory_id, qty):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Insufficient inventory. Available: {new_inv.units}, Requested: {qty_to_check}"
+                    detail=f"Insufficient inventory. Available: {available}, Requested: {qty}"
                 )
-            order.inventory_id = new_inv.inventory_id
-
-        if data.order_quantity is not None:
-            # If inventory_id wasn't changed, check against current inventory
-            if data.inventory_id is None:
-                if data.order_quantity > inv.units:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Insufficient inventory. Available: {inv.units}, Requested: {data.order_quantity}"
-                    )
-            order.order_quantity = data.order_quantity
 
+        OrderController._refresh_checkout_totals(db, order.checkout_id)
         db.commit()
+        store_versions.bump(store_id, CATALOG)
         db.refresh(order)
+        OrderController.publish(db, store_id, "order.updated", [order.order_id], {previous_inventory_id, order.inventory_id})
         return order
 
     @staticmethod
-    def update_status(db: Session, payload: dict, order_id: int, new_status: str) -> Order:
-        if new_status not in ALLOWED_STATUSES:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status")
-
-        store_id = payload.get("store_id")
-        if not store_id:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing auth context")
-
-        order = db.query(Order).filter(Order.order_id == order_id).first()
-        if not order:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
-
-        inv = db.query(Inventory).filter(Inventory.inventory_id == order.inventory_id).first()
-        if not inv or inv.store_id != store_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Order belongs to another store")
-
-        # Stock adjustments are done against Product.inventory and Inventory.units
-        product = db.query(Product).filter(Product.prod_id == inv.product_id).with_for_update().first()
-        if not product:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    def _apply_transition(db: Session, order: Order, new_status: str) -> None:
+        """Validate old -> new status and apply it with conditional UPDATEs.
 
+        The order row is claimed with `WHERE status = :old` and stock is taken with
+        `WHERE units >= :qty` (see InventoryController), so no row is read-then-written
+        and nothing is locked beyond the statements themselves. The daily sales rollup
+        is updated in the same savepoint: if any step affects no row the savepoint
+        rolls back and an HTTPException is raised.
+        """
         old_status = order.status
         qty = order.order_quantity
 
         # Define transition effects
-        # pending -> confirmed: decrement stock
+        # pending -> confirmed: decrement stock (consuming the order's hold)
         # confirmed -> cancelled: restore stock
-        # pending -> cancelled: no stock change
+        # pending -> cancelled: release the order's hold
         # confirmed -> shipped: no stock change
         # Invalid transitions: shipped -> *, cancelled -> *, * -> pending
 
@@ -173,17 +481,144 @@ class OrderController:
         if invalid:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status transition")
 
-        # Apply stock changes
-        if old_status == "pending" and new_status == "confirmed":
-            if (product.inventory or 0) < qty or (inv.units or 0) < qty:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient stock")
-            product.inventory -= qty
-            inv.units = (inv.units or 0) - qty
-        elif old_status == "confirmed" and new_status == "cancelled":
-            product.inventory = (product.inventory or 0) + qty
-            inv.units = (inv.units or 0) + qty
-
-        order.status = new_status
+        reserved = order.stock_reserved
+        with db.begin_nested():
+            claimed = db.execute(
+                update(Order)
+                .where(
+                    Order.order_id == order.order_id,
+                    Order.status == old_status,
+                    Order.stock_reserved == reserved,
+                )
+                .values(status=new_status, stock_reserved=False, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not claimed:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Order status changed, retry")
+
+            # Apply stock changes
+            # A pending order normally consumes its own hold; one whose hold expired
+            # competes for unreserved stock like a new order would
+            if old_status == "pending" and new_status == "confirmed":
+                if not InventoryController.take(db, order.inventory_id, qty, reserved=reserved):
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient stock")
+                SalesRollupController.record_order(db, order, +1)
+            elif old_status == "pending" and new_status == "cancelled":
+                if reserved:
+                    InventoryController.release(db, order.inventory_id, qty)
+            elif old_status == "confirmed" and new_status == "cancelled":
+                InventoryController.give(db, order.inventory_id, qty)
+                SalesRollupController.record_order(db, order, -1)
+
+        # The UPDATEs bypassed the identity map; mirror the new state without a reload
+        set_committed_value(order, "status", new_status)
+        set_committed_value(order, "stock_reserved", False)
+
+    @staticmethod
+    def update_status(db: Session, payload: dict, order_id: int, new_status: str) -> Order:
+        if new_status not in ALLOWED_STATUSES:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status")
+
+        store_id = payload.get("store_id")
+        if not store_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing auth context")
+
+        order = db.query(Order).filter(Order.order_id == order_id).first()
+        if not order:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+        if order.store_id != store_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Order belongs to another store")
+
+        OrderController._apply_transition(db, order, new_status)
         db.commit()
+        store_versions.bump(store_id, CATALOG)
+        DashboardController.invalidate_top_products(store_id)
+        low_stock_tracker.refresh(db, store_id, [order.inventory_id])
+        OrderController.publish(db, store_id, "order.status", [order.order_id], [order.inventory_id])
+        InventoryController.apply_auto_stripes(db)
         db.refresh(order)
         return order
+
+    @staticmethod
+    def update_status_batch(db: Session, payload: dict, order_ids: list, new_status: str) -> list:
+        """Apply one status transition to many orders in a single transaction.
+
+        Each order goes through the same conditional UPDATEs as update_status, in
+        its own savepoint, so a failed line is reported and skipped while the rest
+        are committed together. Lines are applied in ascending inventory id order
+        so concurrent receipts that share SKUs take row locks in the same order.
+        """
+        if new_status not in ALLOWED_STATUSES:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status")
+
+        store_id = payload.get("store_id")
+        if not store_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing auth context")
+
+        requested = list(dict.fromkeys(order_ids))  # de-duplicate, keep caller's order
+        found = {o.order_id: o for o in db.query(Order).filter(Order.order_id.in_(requested)).all()}
+
+        outcome = {}
+        for order in sorted(
+            (o for o in found.values() if o.store_id == store_id),
+            key=lambda o: (o.inventory_id, o.order_id),
+        ):
+            try:
+                OrderController._apply_transition(db, order, new_status)
+            except HTTPException as exc:
+                outcome[order.order_id] = (False, exc.detail)
+            else:
+                outcome[order.order_id] = (True, None)
+
+        results = []
+        for oid in requested:
+            if oid not in found:
+                results.append(dict(order_id=oid, ok=False, status=None, detail="Order not found"))
+            elif oid not in outcome:
+                results.append(dict(order_id=oid, ok=False, status=None, detail="Order belongs to another store"))
+            else:
+                ok, detail = outcome[oid]
+                results.append(dict(order_id=oid, ok=ok, status=found[oid].status, detail=detail))
+
+        # Read before commit expires the instances
+        changed = [oid for oid, (ok, _) in outcome.items() if ok]
+        touched = {found[oid].inventory_id for oid in changed}
+
+        db.commit()
+        if changed:
+            store_versions.bump(store_id, CATALOG)
+            DashboardController.invalidate_top_products(store_id)
+            low_stock_tracker.refresh(db, store_id, touched)
+            OrderController.publish(db, store_id, "order.status", changed, touched)
+        InventoryController.apply_auto_stripes(db)
+        return results
+
+    @staticmethod
+    def release_expired_reservations(db: Session, older_than: datetime, batch_size: int = 500) -> int:
+        """Release the stock held by pending orders created before `older_than`.
+
+        The orders stay pending; confirming one later takes unreserved stock if any
+        is left. Each order is claimed with a conditional UPDATE so a concurrent
+        confirm or cancel wins cleanly. Commits once per batch.
+        """
+        released = 0
+        while True:
+            rows = OrderController.expired_reservations_query(db, older_than, batch_size).all()
+            released_by_store = defaultdict(set)
+            for row in sorted(rows, key=lambda r: (r.inventory_id, r.order_id)):
+                claimed = db.execute(
+                    update(Order)
+                    .where(Order.order_id == row.order_id, Order.status == "pending", Order.stock_reserved.is_(True))
+                    .values(stock_reserved=False)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if claimed:
+                    InventoryController.release(db, row.inventory_id, row.order_quantity)
+                    released_by_store[row.store_id].add(row.inventory_id)
+                    released += 1
+            db.commit()
+            for store_id, inventory_ids in released_by_store.items():
+                store_versions.bump(store_id, CATALOG)
+                InventoryController.publish_stock(db, store_id, inventory_ids)
+            if len(rows) < batch_size:
+                return released
@@ -1,20 +1,45 @@
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.mysql import match
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.search_index import TextIndex, normalize
 from app.models.product import Product
 from app.models.inventory import Inventory
+from app.models.inventory_stripe import InventoryStripe
 from app.models.order import Order
-from app.schemas.product import ProductCreate, ProductUpdate, ProductInventoryUpdate
+from app.schemas.product import ProductCreate, ProductUpdate, ProductInventoryUpdate, ProductStripesUpdate, ProductResponse
+from app.core.store_versions import store_versions, store_cache, cached, put, CATALOG, PRODUCTS
+from app.controllers.inventory_controller import InventoryController
+from app.controllers.dashboard_controller import DashboardController
+from app.controllers.low_stock_controller import low_stock_tracker
+from app.controllers.order_controller import OrderController
 from fastapi import HTTPException, status
 
+# Searched fields, best match first (see TextIndex)
+SEARCH_FIELDS = ("SKU", "prod_name", "prod_category")
+
 class ProductController:
 
+    @staticmethod
+    def sku_query(db: Session, store_id: int, sku: str):
+        return db.query(Product).filter(Product.SKU == sku, Product.store_id == store_id)
+
+    @staticmethod
+    def inventory_id_query(db: Session, store_id: int, prod_id: int):
+        return db.query(Inventory.inventory_id).filter(
+            Inventory.store_id == store_id,
+            Inventory.product_id == prod_id,
+        )
+
+    @staticmethod
+    def pending_orders_query(db: Session, inventory_ids):
+        return db.query(Order).filter(Order.inventory_id.in_(inventory_ids), Order.status == 'pending')
+
     @staticmethod
     def create_product(db: Session, data: ProductCreate, store_id: int) -> Product:
         """Admin creates a new product for their store."""
         # Check if SKU already exists in this store
-        existing = db.query(Product).filter(
-            Product.SKU == data.SKU,
-            Product.store_id == store_id
-        ).first()
+        existing = ProductController.sku_query(db, store_id, data.SKU).first()
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -28,28 +53,98 @@ class ProductController:
             prod_category=data.prod_category,
             prod_description=data.prod_description,
             unit_price=data.unit_price,
-            inventory=data.inventory
         )
         db.add(product)
         db.flush()  # get prod_id without full commit
 
-        # Ensure an Inventory row exists for this product and store
-        inv = db.query(Inventory).filter(
-            Inventory.store_id == store_id,
-            Inventory.product_id == product.prod_id,
-        ).first()
-        if not inv:
-            inv = Inventory(store_id=store_id, product_id=product.prod_id, units=product.inventory or 0)
-            db.add(inv)
+        # Stock lives on the Inventory row; Product.inventory is derived from it
+        inv = Inventory(store_id=store_id, product_id=product.prod_id, units=data.inventory or 0)
+        db.add(inv)
 
         db.commit()
+        version = store_versions.bump(store_id, CATALOG, PRODUCTS)
+        ProductController._reindex(db, store_id, version, [product.prod_id])
+        low_stock_tracker.refresh(db, store_id, [inv.inventory_id])
+        InventoryController.publish_stock(db, store_id, [inv.inventory_id])
         db.refresh(product)
         return product
 
     @staticmethod
     def get_products(db: Session, store_id: int, skip: int = 0, limit: int = 100) -> list:
-        """Get all products for a store."""
-        return db.query(Product).filter(Product.store_id == store_id).offset(skip).limit(limit).all()
+        """Get all products for a store, served from the per-store cache until the catalog changes."""
+        catalog = cached(store_id, CATALOG, "products", lambda: [
+            ProductResponse.model_validate(p).model_dump()
+            for p in db.query(Product).filter(Product.store_id == store_id).order_by(Product.prod_id)
+        ])
+        return catalog[skip:skip + limit]
+
+    @staticmethod
+    def _search_index(db: Session, store_id: int):
+        """The store's in-memory search index, or None if its catalog is too big to hold."""
+        def load():
+            rows = db.query(Product.prod_id, Product.SKU, Product.prod_name, Product.prod_category).filter(
+                Product.store_id == store_id
+            ).limit(settings.PRODUCT_SEARCH_INDEX_MAX_PRODUCTS + 1).all()
+            if len(rows) > settings.PRODUCT_SEARCH_INDEX_MAX_PRODUCTS:
+                return None
+            return TextIndex(SEARCH_FIELDS, ((r.prod_id, (r.SKU, r.prod_name, r.prod_category)) for r in rows), order_field=1)
+        return cached(store_id, PRODUCTS, "search", load)
+
+    @staticmethod
+    def _reindex(db: Session, store_id: int, version: int, prod_ids=(), removed=()) -> None:
+        """Apply committed product changes to the cached search index. Call after bumping PRODUCTS.
+
+        Rows are re-read after the bump, so they include every write whose bump came
+        earlier. An index that isn't one version behind (never built here, or another
+        write in between) is left alone; the next search rebuilds it.
+        """
+        index = store_cache.get(store_id, (PRODUCTS, "search"), version - 1)
+        if index is None:
+            return
+        rows = db.query(Product.prod_id, Product.SKU, Product.prod_name, Product.prod_category).filter(
+            Product.prod_id.in_(prod_ids)
+        ).all() if prod_ids else []
+        index.apply([(r.prod_id, (r.SKU, r.prod_name, r.prod_category)) for r in rows], removed)
+        put(store_id, PRODUCTS, "search", version, index)
+
+    @staticmethod
+    def search_products(db: Session, store_id: int, q: str, skip: int = 0, limit: int = 20) -> tuple:
+        """Products whose SKU, name or category words start with every word of q, best match first.
+        Returns (number of matches, the requested page).
+        """
+        index = ProductController._search_index(db, store_id)
+        if index is None:
+            return ProductController._search_fulltext(db, store_id, q, skip, limit)
+        total, ids = index.search(q, skip, limit)
+        if not ids:
+            return total, []
+        rows = {p.prod_id: p for p in db.query(Product).filter(Product.prod_id.in_(ids))}
+        return total, [rows[i] for i in ids if i in rows]
+
+    @staticmethod
+    def _search_fulltext(db: Session, store_id: int, q: str, skip: int, limit: int) -> tuple:
+        """search_products for catalogs over PRODUCT_SEARCH_INDEX_MAX_PRODUCTS, in the database.
+        MySQL ranks by FULLTEXT relevance; other databases fall back to LIKE and name order.
+        """
+        words = normalize(q).split()
+        if not words:
+            return 0, []
+        conditions = [Product.store_id == store_id]
+        if db.get_bind().dialect.name == "mysql":
+            relevance = match(
+                Product.prod_name, Product.SKU, Product.prod_category,
+                against=" ".join(f"+{w}*" for w in words),
+            ).in_boolean_mode()
+            conditions.append(relevance)
+            order = (relevance.desc(), Product.prod_id)
+        else:
+            for w in words:
+                like = f"%{w}%"
+                conditions.append(or_(Product.SKU.ilike(like), Product.prod_name.ilike(like), Product.prod_category.ilike(like)))
+            order = (Product.prod_name, Product.prod_id)
+        total = db.query(func.count(Product.prod_id)).filter(*conditions).scalar()
+        products = db.query(Product).filter(*conditions).order_by(*order).offset(skip).limit(limit).all()
+        return total, products
 
     @staticmethod
     def get_product_by_id(db: Session, prod_id: int, store_id: int) -> Product:
@@ -81,47 +176,50 @@ class ProductController:
             product.unit_price = data.unit_price
         
         db.commit()
+        version = store_versions.bump(store_id, CATALOG, PRODUCTS)
+        ProductController._reindex(db, store_id, version, [prod_id])
         db.refresh(product)
         return product
 
     @staticmethod
     def backfill_inventory_for_store(db: Session, store_id: int) -> dict:
         """Ensure every product in the store has a matching Inventory row.
-        Does not overwrite existing rows; creates only missing ones.
-        Units initialized from Product.inventory.
+        Does not overwrite existing rows; creates only missing ones with zero units.
         """
-        products = db.query(Product).filter(Product.store_id == store_id).all()
-        created = 0
-        for p in products:
-            inv = db.query(Inventory).filter(
-                Inventory.store_id == store_id,
-                Inventory.product_id == p.prod_id,
-            ).first()
-            if not inv:
-                inv = Inventory(store_id=store_id, product_id=p.prod_id, units=p.inventory or 0)
-                db.add(inv)
-                created += 1
-        if created:
+        total = db.query(Product).filter(Product.store_id == store_id).count()
+        missing = (
+            db.query(Product.prod_id)
+            .outerjoin(Inventory, (Inventory.product_id == Product.prod_id) & (Inventory.store_id == store_id))
+            .filter(Product.store_id == store_id, Inventory.inventory_id.is_(None))
+            .all()
+        )
+        for (prod_id,) in missing:
+            db.add(Inventory(store_id=store_id, product_id=prod_id, units=0))
+        if missing:
             db.commit()
-        return {"created": created, "total_products": len(products)}
+            store_versions.bump(store_id, CATALOG)
+            low_stock_tracker.reset(store_id)
+        return {"created": len(missing), "total_products": total}
 
     @staticmethod
     def update_inventory(db: Session, prod_id: int, store_id: int, data: ProductInventoryUpdate) -> Product:
-        """Admin/Staff adds stock to product inventory."""
+        """Admin/Staff adds stock to product inventory.
+        A single in-place UPDATE on the Inventory row; Product.inventory is derived.
+        """
         product = ProductController.get_product_by_id(db, prod_id, store_id)
-        product.inventory += data.add_quantity
 
-        # Keep Inventory.units in sync for this store/product
-        inv = db.query(Inventory).filter(
-            Inventory.store_id == store_id,
-            Inventory.product_id == product.prod_id,
-        ).first()
-        if inv:
-            inv.units += data.add_quantity
+        inventory_id = ProductController.inventory_id_query(db, store_id, product.prod_id).scalar()
+        if inventory_id:
+            InventoryController.give(db, inventory_id, data.add_quantity)
         else:
-            inv = Inventory(store_id=store_id, product_id=product.prod_id, units=product.inventory)
+            inv = Inventory(store_id=store_id, product_id=product.prod_id, units=data.add_quantity)
             db.add(inv)
+            db.flush()
+            inventory_id = inv.inventory_id
         db.commit()
+        store_versions.bump(store_id, CATALOG)
+        low_stock_tracker.refresh(db, store_id, [inventory_id])
+        InventoryController.publish_stock(db, store_id, [inventory_id])
         db.refresh(product)
         return product
 
@@ -139,26 +237,56 @@ class ProductController:
         inventory_ids = [inv.inventory_id for inv in inventories]
         
         cancelled_orders = 0
+        cancelled_ids = []
         if inventory_ids:
             # Cancel all pending orders for these inventory items
-            pending_orders = db.query(Order).filter(
-                Order.inventory_id.in_(inventory_ids),
-                Order.status == 'pending'
-            ).all()
+            pending_orders = ProductController.pending_orders_query(db, inventory_ids).all()
             
             for order in pending_orders:
                 order.status = 'cancelled'
+                order.stock_reserved = False  # the holds go away with the inventory rows
                 cancelled_orders += 1
+            cancelled_ids = [order.order_id for order in pending_orders]
             
-            # Delete all inventory entries
+            # Delete all inventory entries (and their stock stripes)
+            db.query(InventoryStripe).filter(
+                InventoryStripe.inventory_id.in_(inventory_ids)
+            ).delete(synchronize_session=False)
             for inv in inventories:
                 db.delete(inv)
         
         # Delete the product
         db.delete(product)
         db.commit()
+        version = store_versions.bump(store_id, CATALOG, PRODUCTS)
+        ProductController._reindex(db, store_id, version, removed=[prod_id])
+        DashboardController.invalidate_top_products(store_id)
+        low_stock_tracker.refresh(db, store_id, inventory_ids)
+        OrderController.publish(db, store_id, "order.status", cancelled_ids, inventory_ids)
         
         return {
             "message": "Product deleted successfully",
             "cancelled_orders": cancelled_orders
         }
+
+    @staticmethod
+    def set_stock_stripes(db: Session, prod_id: int, store_id: int, data: ProductStripesUpdate) -> dict:
+        """Admin splits a hot product's stock over N striped counters (0 turns striping off)."""
+        product = ProductController.get_product_by_id(db, prod_id, store_id)
+        inventory_id = ProductController.inventory_id_query(db, store_id, product.prod_id).scalar()
+        if not inventory_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Inventory not found"
+            )
+
+        inv = InventoryController.set_stripes(db, inventory_id, data.stripes)
+        db.commit()
+        store_versions.bump(store_id, CATALOG)
+        db.refresh(inv)
+        return {
+            "prod_id": product.prod_id,
+            "inventory_id": inv.inventory_id,
+            "stripes": inv.stripes,
+            "units": inv.on_hand,
+        }
@@ -0,0 +1,120 @@
+"""
+Reorder suggestions from the daily_sales rollup.
+
+The store's products and their rollup rows for the lookback window are loaded
+into NumPy arrays once, so velocity, variability, days of cover and the
+suggested quantity are computed for the whole catalogue with a handful of
+array operations instead of a loop per product.
+"""
+from datetime import date, datetime, timedelta
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from app.models.store import Store
+from app.models.product import Product
+from app.models.inventory import Inventory
+from app.models.daily_sales import DailySales
+
+# Safety stock in standard deviations of demand over the horizon (~95% service level)
+SAFETY_Z = 1.65
+
+
+class ReorderController:
+    @staticmethod
+    def _catalogue(db: Session, store_id: int) -> tuple:
+        """Product ids (sorted), SKUs, names and available units summed over the product's inventory rows."""
+        products = db.query(Product.prod_id, Product.SKU, Product.prod_name).filter(
+            Product.store_id == store_id
+        ).order_by(Product.prod_id).all()
+        prod_ids = np.fromiter((p.prod_id for p in products), dtype=np.int64, count=len(products))
+
+        stock = db.query(Inventory.product_id, Inventory.on_hand, Inventory.reserved).filter(
+            Inventory.store_id == store_id
+        ).all()
+        stock_pid = np.fromiter((s.product_id for s in stock), dtype=np.int64, count=len(stock))
+        stock_avail = np.fromiter(((s.on_hand or 0) - (s.reserved or 0) for s in stock), dtype=np.float64, count=len(stock))
+        rows, known = ReorderController._index(prod_ids, stock_pid)
+        available = np.bincount(rows[known], weights=stock_avail[known], minlength=len(prod_ids))
+        return prod_ids, products, available
+
+    @staticmethod
+    def sales_query(db: Session, store_id: int, first_day: date, last_day: date):
+        """Units sold per product and day in [first_day, last_day], by product."""
+        return db.query(DailySales.product_id, DailySales.units).filter(
+            DailySales.store_id == store_id,
+            DailySales.day >= first_day,
+            DailySales.day <= last_day,
+        ).order_by(DailySales.product_id)
+
+    @staticmethod
+    def _index(sorted_ids: np.ndarray, ids: np.ndarray) -> tuple:
+        """Positions of ids in sorted_ids, and a mask of the ids actually present."""
+        rows = np.searchsorted(sorted_ids, ids)
+        rows = np.minimum(rows, max(len(sorted_ids) - 1, 0))
+        known = sorted_ids[rows] == ids if len(sorted_ids) else np.zeros(len(ids), dtype=bool)
+        return rows, known
+
+    @staticmethod
+    def get_suggestions(db: Session, store_id: int, limit: int = 100) -> dict:
+        """Products to reorder so that available stock covers the store's reorder_horizon_days.
+
+        Demand is the mean daily units over sales_lookback_days (UTC days including
+        today; 0 = since the store's first sale). The suggested quantity tops available
+        stock up to horizon x velocity plus SAFETY_Z standard deviations of demand over
+        the horizon. Only products that need stock are returned, least cover first.
+        """
+        store = db.query(Store).filter(Store.store_id == store_id).first()
+        if not store:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Store not found")
+
+        today = datetime.utcnow().date()
+        lookback = store.sales_lookback_days
+        if lookback:
+            first_day = today - timedelta(days=lookback - 1)
+        else:
+            first_day = db.query(func.min(DailySales.day)).filter(DailySales.store_id == store_id).scalar() or today
+            lookback = (today - first_day).days + 1
+        horizon = store.reorder_horizon_days
+        result = {"lookback_days": lookback, "horizon_days": horizon, "suggestions": []}
+
+        prod_ids, products, available = ReorderController._catalogue(db, store_id)
+        if not len(prod_ids):
+            return result
+
+        # Ordered by product so the id lookups below walk prod_ids sequentially
+        sales = ReorderController.sales_query(db, store_id, first_day, today).all()
+        sale_pid = np.fromiter((s.product_id for s in sales), dtype=np.int64, count=len(sales))
+        sale_units = np.fromiter((s.units for s in sales), dtype=np.float64, count=len(sales))
+
+        # One rollup row per (product, day), so per-product sums of units and of their
+        # squares give the mean and variance of daily demand, days without sales included.
+        # Rollup rows of deleted products are dropped.
+        rows, known = ReorderController._index(prod_ids, sale_pid)
+        rows, units = rows[known], sale_units[known]
+        total = np.bincount(rows, weights=units, minlength=len(prod_ids))
+        squares = np.bincount(rows, weights=units * units, minlength=len(prod_ids))
+
+        velocity = total / lookback
+        variance = np.maximum(squares / lookback - velocity * velocity, 0)
+        safety = SAFETY_Z * np.sqrt(variance * horizon)
+        target = velocity * horizon + safety
+        suggested = np.ceil(np.maximum(target - available, 0)).astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cover = np.where(velocity > 0, np.maximum(available, 0) / velocity, np.inf)
+
+        picked = np.flatnonzero(suggested > 0)
+        picked = picked[np.lexsort((-suggested[picked], cover[picked]))][:limit]
+        result["suggestions"] = [
+            dict(
+                product_id=int(prod_ids[i]),
+                sku=products[i].SKU,
+                name=products[i].prod_name,
+                available=int(available[i]),
+                daily_velocity=round(float(velocity[i]), 3),
+                days_of_cover=round(float(cover[i]), 1) if np.isfinite(cover[i]) else None,
+                suggested_quantity=int(suggested[i]),
+            )
+            for i in picked
+        ]
+        return result
@@ -0,0 +1,107 @@
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm import Session
+from app.models.daily_sales import DailySales
+from app.models.order import Order
+from app.models.product import Product
+
+# Orders in these states count as sales
+SOLD_STATUSES = ("confirmed", "shipped")
+
+
+class SalesRollupController:
+    @staticmethod
+    def record(db: Session, store_id: int, product_id: int, day: date, orders: int, units: int, revenue: Decimal) -> None:
+        """Add (or, with negative values, subtract) one change to a store/day/product rollup row.
+        Runs in the caller's transaction so the rollup commits or rolls back with the order.
+        """
+        values = dict(store_id=store_id, day=day, product_id=product_id, orders=orders, units=units, revenue=revenue)
+        if db.get_bind().dialect.name == "mysql":
+            # One statement: an UPDATE that misses takes a gap lock, and two first
+            # sales of a product on a new day would then deadlock on their INSERTs
+            stmt = mysql_insert(DailySales).values(**values)
+            db.execute(stmt.on_duplicate_key_update(
+                orders=DailySales.orders + stmt.inserted.orders,
+                units=DailySales.units + stmt.inserted.units,
+                revenue=DailySales.revenue + stmt.inserted.revenue,
+            ))
+            return
+        key = (DailySales.store_id == store_id, DailySales.day == day, DailySales.product_id == product_id)
+        stmt = update(DailySales).where(*key).values(
+            orders=DailySales.orders + orders,
+            units=DailySales.units + units,
+            revenue=DailySales.revenue + revenue,
+        ).execution_options(synchronize_session=False)
+        if db.execute(stmt).rowcount:
+            return
+        try:
+            with db.begin_nested():
+                db.execute(insert(DailySales).values(**values))
+        except IntegrityError:
+            # Another transaction created the row first
+            db.execute(stmt)
+
+    @staticmethod
+    def record_order(db: Session, order: Order, sign: int) -> None:
+        """Count a confirmed order line into the rollup (sign=+1) or take it back out (sign=-1).
+        Confirming snapshots the product's price onto the order, so taking the line back
+        out subtracts exactly the revenue that was added, whatever the price is by then.
+        """
+        product_id = order.product_id
+        if sign > 0:
+            unit_price = db.query(Product.unit_price).filter(Product.prod_id == product_id).scalar() or 0
+            db.execute(
+                update(Order).where(Order.order_id == order.order_id)
+                .values(sold_unit_price=unit_price)
+                .execution_options(synchronize_session=False)
+            )
+            set_committed_value(order, "sold_unit_price", unit_price)
+        else:
+            unit_price = order.sold_unit_price
+            if unit_price is None:  # confirmed before prices were recorded
+                unit_price = db.query(Product.unit_price).filter(Product.prod_id == product_id).scalar()
+        qty = order.order_quantity
+        SalesRollupController.record(
+            db, order.store_id, product_id, order.created_at.date(),
+            sign, sign * qty, sign * qty * (unit_price or 0),
+        )
+
+    @staticmethod
+    def rebuild(db: Session, store_id: int = None) -> int:
+        """Recompute the rollup from orders (all stores, or one) and return the number of rows written.
+        Revenue uses each order's sold price (the product's current price for orders
+        confirmed before prices were recorded). Run while the store is quiet: transitions committed
+        during the rebuild can be counted twice or not at all.
+        """
+        clear = db.query(DailySales)
+        if store_id is not None:
+            clear = clear.filter(DailySales.store_id == store_id)
+        clear.delete(synchronize_session=False)
+
+        day = func.date(Order.created_at)
+        source = (
+            select(
+                Order.store_id,
+                day,
+                Order.product_id,
+                func.count(Order.order_id),
+                func.sum(Order.order_quantity),
+                func.sum(Order.order_quantity * func.coalesce(Order.sold_unit_price, Product.unit_price)),
+            )
+            .join(Product, Product.prod_id == Order.product_id)
+            .where(Order.status.in_(SOLD_STATUSES))
+            .group_by(Order.store_id, day, Order.product_id)
+        )
+        if store_id is not None:
+            source = source.where(Order.store_id == store_id)
+        written = db.execute(
+            insert(DailySales).from_select(
+                ["store_id", "day", "product_id", "orders", "units", "revenue"], source
+            )
+        ).rowcount
+        db.commit()
+        return written
@@ -0,0 +1,157 @@
+"""
+Small in-process caches shared by the request handlers.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    Keeps hit/miss/eviction counters so callers can report how well it works.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing/expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single key (no-op if absent)."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Return counters and current size for metrics endpoints."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _deep_size(value: Any, seen: set = None) -> int:
+    """Approximate bytes held by value and everything it references."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(v, seen) for v in value)
+    return size
+
+
+class StoreCache:
+    """Thread-safe per-store cache of versioned values, LRU-bounded by store count.
+
+    Each value is stored with the version it was read at; a lookup with any
+    other version is a miss, so bumping a store's version invalidates its
+    entries without touching the cache. Tracks the approximate memory held.
+    """
+
+    def __init__(self, max_stores: int = 500):
+        self.max_stores = max_stores
+        self._stores: "OrderedDict[int, dict]" = OrderedDict()  # store_id -> {key: (version, value, bytes)}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, store_id: int, key: Hashable, version: int, default: Any = None) -> Any:
+        with self._lock:
+            entries = self._stores.get(store_id)
+            entry = entries.get(key) if entries else None
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return default
+            self._stores.move_to_end(store_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, store_id: int, key: Hashable, version: int, value: Any) -> None:
+        size = _deep_size(value)
+        with self._lock:
+            entries = self._stores.setdefault(store_id, {})
+            old = entries.get(key)
+            if old is not None:
+                self.bytes -= old[2]
+            entries[key] = (version, value, size)
+            self.bytes += size
+            self._stores.move_to_end(store_id)
+            while len(self._stores) > self.max_stores:
+                _, dropped = self._stores.popitem(last=False)
+                self.bytes -= sum(e[2] for e in dropped.values())
+                self.evictions += 1
+
+    def invalidate(self, store_id: int) -> None:
+        """Drop everything held for the store."""
+        with self._lock:
+            dropped = self._stores.pop(store_id, None)
+            if dropped:
+                self.bytes -= sum(e[2] for e in dropped.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "stores": len(self._stores),
+                "max_stores": self.max_stores,
+                "entries": sum(len(e) for e in self._stores.values()),
+                "approx_bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,112 @@
+"""
+Run EXPLAIN on the hot queries issued by the controllers and routes and fail
+if any of them falls back to a full table scan, or to a full index scan of a
+large table. The statements come from the same query builders the endpoints
+call, so the check follows the code.
+Run against a migrated database: python -m app.core.check_query_plans
+"""
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.database import engine, SessionLocal
+from app.models import Inventory, Order
+from app.controllers.order_controller import OrderController
+from app.controllers.inventory_controller import InventoryController
+from app.controllers.product_controller import ProductController
+from app.controllers.customer_controller import CustomerController
+from app.controllers.dashboard_controller import DashboardController
+from app.controllers.reorder_controller import ReorderController
+from app.controllers.low_stock_controller import LowStockTracker
+
+# Only scans of these tables count as failures (small lookup tables are fine)
+WATCHED_TABLES = {"orders", "inventory", "inventory_stripe", "product", "person", "checkout", "daily_sales", "store_customer"}
+
+# A full index scan (MySQL type=index) fails from this many estimated rows; smaller ones are reported as warnings
+LARGE_TABLE_ROWS = 10_000
+
+
+def _hot_queries(db: Session) -> dict:
+    """The queries behind app/api and app/controllers, built with sample arguments."""
+    store_id, since = 1, datetime.utcnow() - timedelta(days=30)
+    today = datetime.utcnow().date()
+    orders = OrderController.list_query(db, store_id)
+    return {
+        "list_orders": OrderController.page_query(orders, None, 101),
+        "list_orders_next_page": OrderController.page_query(orders, (since, 1000), 101),
+        "list_orders_count": orders.with_entities(func.count(Order.order_id)),
+        "list_orders_by_status": OrderController.page_query(OrderController.list_query(db, store_id, status="pending"), None, 101),
+        "list_orders_by_date": OrderController.page_query(OrderController.list_query(db, store_id, start_date=since), None, 101),
+        "list_orders_by_customer": OrderController.page_query(
+            OrderController.list_query(db, store_id, customer_contact="0000000000"), None, 101
+        ),
+        "receipt_lines": OrderController.receipt_lines_query(db, 1),
+        "expired_reservations": OrderController.expired_reservations_query(db, since),
+        "dashboard_daily_sales": DashboardController.daily_query(db, store_id, since.date()),
+        "dashboard_top_products": DashboardController.top_products_query(db, store_id, since.date()),
+        "top_products_lookback": DashboardController.sales_by_product_query(db, store_id, 30),
+        "reorder_sales": ReorderController.sales_query(db, store_id, since.date(), today),
+        "pending_orders_for_inventory": ProductController.pending_orders_query(db, [1, 2]),
+        "store_inventory": InventoryController.items_query(db, store_id),
+        "low_stock_refresh": LowStockTracker._rows(db, store_id).filter(Inventory.inventory_id.in_([1, 2])),
+        "inventory_for_product": ProductController.inventory_id_query(db, store_id, 1),
+        "product_sku_check": ProductController.sku_query(db, store_id, "SKU-1"),
+        "person_by_contact": CustomerController.contact_query(db, "0000000000"),
+        "person_by_email": CustomerController.email_query(db, "someone@example.com"),
+        "customers_for_store": CustomerController.page_query(db, store_id, 101),
+        "customers_next_page": CustomerController.page_query(db, store_id, 101, (since, 1000)),
+        "stores_of_customer": CustomerController.stores_query(db, 1),
+    }
+
+
+def _explain(conn, query) -> list:
+    """Return (table, scan, rows, detail) for every step of the plan, where scan is
+    "table" for a full table scan, "index" for a full index scan and None otherwise,
+    and rows is the optimizer's row estimate (MySQL only; None on SQLite).
+    """
+    compiled = query.statement.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    steps = []
+    if engine.dialect.name == "sqlite":
+        for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params):
+            detail = row[-1]
+            parts = detail.split()
+            table = parts[1] if len(parts) > 1 else ""
+            scan = None
+            if parts[:1] == ["SCAN"]:
+                scan = "index" if "INDEX" in detail else "table"
+            steps.append((table, scan, None, detail))
+    else:
+        for row in conn.exec_driver_sql("EXPLAIN " + str(compiled), params).mappings():
+            detail = f"type={row['type']} key={row['key']} possible_keys={row['possible_keys']} rows={row['rows']}"
+            scan = {"ALL": "table", "index": "index"}.get(row["type"])
+            steps.append((row["table"], scan, row["rows"], detail))
+    return steps
+
+
+def check_query_plans() -> int:
+    """Print the plan of every hot query; return the number of failing scans found."""
+    failures = 0
+    db = SessionLocal()
+    try:
+        with engine.connect() as conn:
+            for name, query in _hot_queries(db).items():
+                for table, scan, rows, detail in _explain(conn, query):
+                    watched = table in WATCHED_TABLES
+                    bad = watched and (scan == "table" or (scan == "index" and (rows or 0) >= LARGE_TABLE_ROWS))
+                    failures += bad
+                    label = "FAIL" if bad else "warn" if watched and scan else " ok "
+                    print(f"{label} {name:<30} {table:<12} {detail}")
+    finally:
+        db.close()
+    return failures
+
+
+if __name__ == "__main__":
+    failed = check_query_plans()
+    if failed:
+        print(f"\n{failed} full scan(s) found")
+    sys.exit(1 if failed else 0)
@@ -10,7 +10,67 @@ class Settings:
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
     DEBUG: bool = os.getenv("DEBUG", "False") == "True"
+
+    # In-process cache of users.is_active, checked on every authenticated request
+    USER_CACHE_TTL_SECONDS: float = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+    USER_CACHE_MAX_ENTRIES: int = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+    # Dedicated pool for pbkdf2 hashing so login bursts don't starve the request threadpool
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+    
+    # GET /orders keyset pagination
+    ORDERS_PAGE_SIZE: int = int(os.getenv("ORDERS_PAGE_SIZE", "100"))
+    ORDERS_MAX_PAGE_SIZE: int = int(os.getenv("ORDERS_MAX_PAGE_SIZE", "500"))
+
+    # Striped stock counters for hot SKUs. An inventory row is striped automatically
+    # once STOCK_AUTO_STRIPE_AFTER decrements within the window each take longer than
+    # STOCK_SLOW_UPDATE_MS; STOCK_AUTO_STRIPES = 0 leaves striping to admins only.
+    STOCK_MAX_STRIPES: int = int(os.getenv("STOCK_MAX_STRIPES", "32"))
+    STOCK_AUTO_STRIPES: int = int(os.getenv("STOCK_AUTO_STRIPES", "8"))
+    STOCK_SLOW_UPDATE_MS: float = float(os.getenv("STOCK_SLOW_UPDATE_MS", "50"))
+    STOCK_AUTO_STRIPE_AFTER: int = int(os.getenv("STOCK_AUTO_STRIPE_AFTER", "5"))
+    STOCK_CONTENTION_WINDOW_SECONDS: float = float(os.getenv("STOCK_CONTENTION_WINDOW_SECONDS", "60"))
     
+    # Pending orders hold stock for this long before the sweeper releases it (0 = forever)
+    RESERVATION_TTL_MINUTES: int = int(os.getenv("RESERVATION_TTL_MINUTES", "1440"))
+    RESERVATION_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("RESERVATION_SWEEP_INTERVAL_SECONDS", "300"))
+    
+    # GET /store/top-products: per-store rankings cached in process, dropped when the
+    # store's orders change state; the TTL also rolls the lookback window over at midnight
+    TOP_PRODUCTS_CACHE_TTL_SECONDS: float = float(os.getenv("TOP_PRODUCTS_CACHE_TTL_SECONDS", "300"))
+    TOP_PRODUCTS_CACHE_MAX_STORES: int = int(os.getenv("TOP_PRODUCTS_CACHE_MAX_STORES", "1000"))
+    TOP_PRODUCTS_MAX_N: int = int(os.getenv("TOP_PRODUCTS_MAX_N", "100"))
+
+    # Low-stock set: reloaded from the database at most this often per store (a
+    # backstop behind the store version sync), and the longest GET /store/low-stock/changes may block
+    LOW_STOCK_RESYNC_SECONDS: float = float(os.getenv("LOW_STOCK_RESYNC_SECONDS", "60"))
+    LOW_STOCK_WAIT_SECONDS: float = float(os.getenv("LOW_STOCK_WAIT_SECONDS", "25"))
+
+    # GET /store/events: frames a live-feed subscriber may fall behind before it is
+    # dropped, and how often an idle stream sends a keepalive comment
+    EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+    EVENTS_KEEPALIVE_SECONDS: float = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+
+    # Per-store cache of the catalog, inventory view and settings (LRU over stores)
+    STORE_CACHE_MAX_STORES: int = int(os.getenv("STORE_CACHE_MAX_STORES", "500"))
+
+    # Store version counters are shared through the store_version table; each worker
+    # polls the ones it mirrors this often (0 = don't poll, for a single worker)
+    STORE_VERSION_POLL_SECONDS: float = float(os.getenv("STORE_VERSION_POLL_SECONDS", "1"))
+
+    # GET /products/search: largest page, and the largest catalog indexed in memory
+    # (bigger stores are searched with the product FULLTEXT index instead)
+    PRODUCT_SEARCH_MAX_LIMIT: int = int(os.getenv("PRODUCT_SEARCH_MAX_LIMIT", "100"))
+    PRODUCT_SEARCH_INDEX_MAX_PRODUCTS: int = int(os.getenv("PRODUCT_SEARCH_INDEX_MAX_PRODUCTS", "250000"))
+
+    # GET /customers keyset pagination
+    CUSTOMERS_PAGE_SIZE: int = int(os.getenv("CUSTOMERS_PAGE_SIZE", "100"))
+    CUSTOMERS_MAX_PAGE_SIZE: int = int(os.getenv("CUSTOMERS_MAX_PAGE_SIZE", "500"))
+
+    # GET /customers/lookup: most matches one type-ahead request may ask for
+    CUSTOMER_LOOKUP_MAX_RESULTS: int = int(os.getenv("CUSTOMER_LOOKUP_MAX_RESULTS", "25"))
+
     # Add more config as needed
     API_V1_PREFIX: str = "/api/v1"
 
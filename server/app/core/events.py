@@ -0,0 +1,133 @@
+"""
+In-process publish/subscribe for the per-store live feed (GET /store/events).
+
+Controllers publish after their commit; each SSE connection is a Subscription
+with its own bounded queue. A subscriber that falls `maxsize` frames behind is
+dropped instead of letting its queue grow: it gets the frames already queued,
+a final `dropped` event, and is expected to reconnect and re-read full state.
+
+The broker only sees writes made in this worker. When the store_version poll
+finds that another worker changed a store's catalog, the store's subscribers
+here get a `resync` event instead and should re-read full state.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict, deque
+from typing import AsyncIterator
+from app.core.config import settings
+from app.core.store_versions import store_versions, CATALOG
+
+
+def _json_default(value):
+    # Dates in the same ISO form the REST responses use
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def _frame(seq: int, event: str, data) -> str:
+    return f"id: {seq}\nevent: {event}\ndata: {json.dumps(data, default=_json_default, separators=(',', ':'))}\n\n"
+
+
+class Subscription:
+    def __init__(self, store_id: int, maxsize: int, loop: asyncio.AbstractEventLoop):
+        self.store_id = store_id
+        self.maxsize = maxsize
+        self.loop = loop
+        self.frames: deque = deque()
+        self.ready = asyncio.Event()
+        self.dropped = False
+
+
+class EventBroker:
+    """Thread-safe fan-out of pre-encoded SSE frames to the subscribers of a store."""
+
+    def __init__(self, queue_size: int, keepalive: float):
+        self.queue_size = queue_size
+        self.keepalive = keepalive
+        self._subs: "defaultdict[int, set]" = defaultdict(set)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, store_id: int, event: str, data) -> None:
+        """Queue one event for every subscriber of the store. Safe to call from any thread."""
+        with self._lock:
+            subs = self._subs.get(store_id)
+            if not subs:
+                return
+            self._seq += 1
+            self.published += 1
+            frame = _frame(self._seq, event, data)
+            for sub in list(subs):
+                if len(sub.frames) >= sub.maxsize:
+                    sub.dropped = True
+                    subs.discard(sub)
+                    self.dropped += 1
+                else:
+                    sub.frames.append(frame)
+                try:
+                    sub.loop.call_soon_threadsafe(sub.ready.set)
+                except RuntimeError:  # its event loop is gone
+                    subs.discard(sub)
+            if not subs:
+                del self._subs[store_id]
+
+    def has_subscribers(self, store_id: int) -> bool:
+        """Lets publishers skip building payloads nobody is listening for."""
+        return bool(self._subs.get(store_id))
+
+    def publish_many(self, store_id: int, event: str, items) -> None:
+        for data in items:
+            self.publish(store_id, event, data)
+
+    def subscribe(self, store_id: int) -> Subscription:
+        sub = Subscription(store_id, self.queue_size, asyncio.get_running_loop())
+        with self._lock:
+            self._subs[store_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.store_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.store_id]
+
+    async def stream(self, sub: Subscription) -> AsyncIterator[str]:
+        """SSE body for one subscriber: queued frames as they arrive, comments as keepalives."""
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    await asyncio.wait_for(sub.ready.wait(), self.keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                sub.ready.clear()
+                with self._lock:
+                    frames, dropped = list(sub.frames), sub.dropped
+                    sub.frames.clear()
+                for frame in frames:
+                    yield frame
+                if dropped:
+                    yield "event: dropped\ndata: {}\n\n"
+                    return
+        finally:
+            self.unsubscribe(sub)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "stores": len(self._subs),
+                "subscribers": sum(len(s) for s in self._subs.values()),
+                "queue_size": self.queue_size,
+                "published": self.published,
+                "dropped_subscribers": self.dropped,
+            }
+
+
+event_broker = EventBroker(queue_size=settings.EVENTS_QUEUE_SIZE, keepalive=settings.EVENTS_KEEPALIVE_SECONDS)
+# Order and stock changes made in other workers (at most one per store per poll)
+store_versions.subscribe(CATALOG, lambda store_id: event_broker.publish(store_id, "resync", {}))
@@ -3,7 +3,7 @@ Initialize database by creating all tables defined in SQLAlchemy models.
 Run this once to set up your database schema.
 """
 from app.core.database import engine, Base
-from app.models import Store, Person, Product, User, Inventory, Order
+from app.models import Store, Person, Product, User, Inventory, InventoryStripe, Order, Checkout, DailySales, StoreVersion, StoreCustomer
 from sqlalchemy import text
 
 def init_db():
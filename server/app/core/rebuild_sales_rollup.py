@@ -0,0 +1,21 @@
+"""
+Rebuild the daily_sales rollup from the orders table, for backfill or repair.
+Usage: python -m app.core.rebuild_sales_rollup [store_id]
+"""
+import sys
+from app.core.database import SessionLocal
+from app.controllers.sales_rollup_controller import SalesRollupController
+
+
+def rebuild_sales_rollup(store_id: int = None) -> int:
+    db = SessionLocal()
+    try:
+        return SalesRollupController.rebuild(db, store_id)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    store = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    rows = rebuild_sales_rollup(store)
+    print(f"Rebuilt daily_sales{'' if store is None else f' for store {store}'}: {rows} row(s)")
@@ -0,0 +1,53 @@
+"""
+Release stock held by pending orders older than RESERVATION_TTL_MINUTES.
+Runs as a background thread in each API worker (started from app.main), or once
+from cron: python -m app.core.reservation_sweeper
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.controllers.order_controller import OrderController
+
+
+def sweep_once() -> int:
+    """Release every expired hold; return how many orders were released."""
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(minutes=settings.RESERVATION_TTL_MINUTES)
+        return OrderController.release_expired_reservations(db, cutoff)
+    finally:
+        db.close()
+
+
+def _run_forever(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            released = sweep_once()
+            if released:
+                print(f"[sweeper] released {released} expired reservation(s)")
+        except Exception as exc:
+            print(f"[sweeper] reservation sweep failed: {exc}")
+
+
+def start_sweeper():
+    """Start the sweeper thread unless reservations never expire. Returns the thread or None."""
+    if settings.RESERVATION_TTL_MINUTES <= 0 or settings.RESERVATION_SWEEP_INTERVAL_SECONDS <= 0:
+        return None
+    thread = threading.Thread(
+        target=_run_forever,
+        args=(settings.RESERVATION_SWEEP_INTERVAL_SECONDS,),
+        name="reservation-sweeper",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    if settings.RESERVATION_TTL_MINUTES <= 0:
+        print("RESERVATION_TTL_MINUTES is 0; reservations never expire")
+    else:
+        print(f"Released {sweep_once()} expired reservation(s)")
@@ -0,0 +1,159 @@
+"""
+In-memory word-prefix index over a few text fields per document, for
+type-ahead style search within one store.
+
+Every field is lower-cased and split into words; a query matches a document
+when each of its words is a prefix of some word of the document. The words of
+all documents are kept sorted with their postings laid out back to back, so
+the documents matching a prefix are one contiguous slice found by bisection.
+Changes are applied to a small overlay that is folded back into the sorted
+arrays once it grows past a fraction of the index.
+"""
+import re
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from itertools import chain, islice
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+_HIGH = "\U0010ffff"  # sorts after every word that starts with a given prefix
+_CHUNK = 512  # positions converted to Python per step while walking ranked results
+
+
+def normalize(value) -> str:
+    """Lower-cased words of value separated by single spaces ("ABC-12 x" -> "abc 12 x")."""
+    return " ".join(_WORD.findall(str(value or "").lower()))
+
+
+class TextIndex:
+    """Thread-safe prefix index over documents of `len(fields)` text values.
+
+    Results are ranked: a field equal to the query, then a field starting with
+    it (earlier fields first in both cases), then every other match in order of
+    the `order_field` value.
+    """
+
+    def __init__(self, fields: tuple, docs, order_field: int = 0):
+        self.fields = fields
+        self.order_field = order_field
+        self._lock = threading.Lock()
+        self._build(docs)
+
+    def _build(self, docs) -> None:
+        """(Re)build the sorted arrays from (doc_id, values) pairs. Caller holds the lock or owns the index."""
+        docs = [(doc_id, tuple(normalize(v) for v in values)) for doc_id, values in docs]
+        docs.sort(key=lambda d: (d[1][self.order_field], d[0]))
+        self._ids = [doc_id for doc_id, _ in docs]
+        self._values = [values for _, values in docs]
+        self._pos = {doc_id: pos for pos, doc_id in enumerate(self._ids)}
+        self._base = len(docs)
+        self._alive = np.ones(len(docs), dtype=bool)
+        self._extra = {}  # position -> words, for documents added since the build
+        self._dead = 0
+
+        postings = {}
+        for pos, values in enumerate(self._values):
+            for word in set(" ".join(values).split()):
+                postings.setdefault(word, []).append(pos)
+        self._vocab = sorted(postings)
+        sizes = np.fromiter((len(postings[w]) for w in self._vocab), dtype=np.int64, count=len(self._vocab))
+        self._offsets = np.concatenate(([0], np.cumsum(sizes)))
+        self._postings = np.fromiter(
+            chain.from_iterable(postings[w] for w in self._vocab), dtype=np.int32, count=int(self._offsets[-1])
+        )
+
+        self._sorted = []  # per field: (values in ascending order, their positions)
+        for f in range(len(self.fields)):
+            order = sorted(range(len(docs)), key=lambda p: self._values[p][f])
+            self._sorted.append(([self._values[p][f] for p in order], np.array(order, dtype=np.int32)))
+
+        self._bytes = (
+            self._postings.nbytes + self._offsets.nbytes + self._alive.nbytes
+            + sum(s[1].nbytes for s in self._sorted)
+            + sum(sys.getsizeof(v) for values in self._values for v in values)
+            + sum(sys.getsizeof(w) for w in self._vocab)
+        )
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    def __sizeof__(self) -> int:
+        return self._bytes
+
+    def _drop(self, doc_id) -> None:
+        pos = self._pos.pop(doc_id, None)
+        if pos is None:
+            return
+        if pos < self._base:
+            self._alive[pos] = False
+            self._dead += 1
+        else:
+            del self._extra[pos]
+
+    def apply(self, upserts=(), removes=()) -> None:
+        """Add or replace the (doc_id, values) pairs in upserts and forget the ids in removes."""
+        with self._lock:
+            for doc_id in removes:
+                self._drop(doc_id)
+            for doc_id, values in upserts:
+                self._drop(doc_id)
+                values = tuple(normalize(v) for v in values)
+                pos = len(self._ids)
+                self._ids.append(doc_id)
+                self._values.append(values)
+                self._pos[doc_id] = pos
+                self._extra[pos] = " ".join(values).split()
+            if len(self._extra) + self._dead > max(256, self._base // 8):
+                self._build([(self._ids[p], self._values[p]) for p in sorted(self._pos.values())])
+
+    def _matches(self, words: list):
+        """Base positions (ascending, i.e. in order_field order) and overlay positions matching every word."""
+        matched = self._alive.copy()
+        for word in words:
+            lo = bisect_left(self._vocab, word)
+            hi = bisect_left(self._vocab, word + _HIGH, lo)
+            hits = np.zeros(self._base, dtype=bool)
+            hits[self._postings[self._offsets[lo]:self._offsets[hi]]] = True
+            matched &= hits
+        extra = sorted(
+            (p for p, doc_words in self._extra.items() if all(any(w.startswith(q) for w in doc_words) for q in words)),
+            key=lambda p: self._values[p][self.order_field],
+        )
+        return np.flatnonzero(matched), extra
+
+    def _alive_in(self, positions: np.ndarray):
+        """Live positions of the array in order, a chunk at a time so a page near the top stays cheap."""
+        for i in range(0, len(positions), _CHUNK):
+            chunk = positions[i:i + _CHUNK]
+            yield from chunk[self._alive[chunk]].tolist()
+
+    def _ranked(self, query: str, matched: np.ndarray, extra: list):
+        """Yield matching positions best first, each once."""
+        seen = set()
+        for exact in (True, False):
+            for f, (values, positions) in enumerate(self._sorted):
+                lo = bisect_left(values, query)
+                hi = bisect_right(values, query, lo) if exact else bisect_left(values, query + _HIGH, lo)
+                for pos in chain(self._alive_in(positions[lo:hi]), extra):
+                    value = self._values[pos][f]
+                    if pos not in seen and (value == query if exact else value.startswith(query)):
+                        seen.add(pos)
+                        yield pos
+        for i in range(0, len(matched), _CHUNK):
+            for pos in matched[i:i + _CHUNK].tolist():
+                if pos not in seen:
+                    yield pos
+        for pos in extra:
+            if pos not in seen:
+                yield pos
+
+    def search(self, query: str, skip: int = 0, limit: int = 20) -> tuple:
+        """Return (number of matches, doc ids of the requested page in rank order)."""
+        query = normalize(query)
+        if not query:
+            return 0, []
+        with self._lock:
+            matched, extra = self._matches(query.split())
+            page = islice(self._ranked(query, matched, extra), skip, skip + limit)
+            return len(matched) + len(extra), [self._ids[pos] for pos in page]
@@ -1,11 +1,18 @@
 """
 Security utilities for password hashing and JWT token management.
 """
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, List, Callable
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.cache import TTLCache
+from app.core.database import get_db
+from app.core.store_versions import store_versions, USERS
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
@@ -13,6 +20,15 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 # Use pbkdf2_sha256 to avoid Windows bcrypt backend issues and 72-byte limit
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
+# Stored in person.password for walk-in customers that never set a credential.
+# Such accounts use the default password (their contact number), which login
+# checks directly and hashes on first successful use. Never a valid hash string.
+UNSET_PASSWORD = "!"
+
+def is_password_unset(hashed_password: Optional[str]) -> bool:
+    """True when no credential has been stored for the person yet."""
+    return hashed_password == UNSET_PASSWORD
+
 def hash_password(password: str) -> str:
     """Hash a plain text password."""
     return pwd_context.hash(password)
@@ -21,6 +37,73 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
     return pwd_context.verify(plain_password, hashed_password)
 
+class PasswordHashExecutor:
+    """Bounded worker pool for pbkdf2 work.
+
+    passlib's pbkdf2_sha256 goes through hashlib.pbkdf2_hmac, which releases the GIL,
+    so a small thread pool gives real parallelism without process start-up cost.
+    Submissions beyond `max_queue` waiting jobs are rejected with 503.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pwd-hash")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.peak_queue_depth = 0
+
+    def submit(self, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please try again"
+                )
+            self.queued += 1
+            self.peak_queue_depth = max(self.peak_queue_depth, self.queued)
+        return self._pool.submit(self._run, fn, *args)
+
+    def _run(self, fn: Callable, *args):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self.queued,
+                "peak_queue_depth": self.peak_queue_depth,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+password_hasher = PasswordHashExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the hashing pool without holding a request thread."""
+    return await asyncio.wrap_future(password_hasher.submit(hash_password, password))
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without holding a request thread."""
+    return await asyncio.wrap_future(password_hasher.submit(verify_password, plain_password, hashed_password))
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -45,27 +128,51 @@ def decode_access_token(token: str) -> Optional[dict]:
 # Simple bearer auth dependency for role checks
 http_bearer = HTTPBearer(auto_error=True)
 
-def get_token_payload(credentials: HTTPAuthorizationCredentials = Depends(http_bearer)) -> dict:
+# user_id -> is_active; deactivate_staff invalidates explicitly (here, and in other
+# workers through the store's USERS version), TTL bounds staleness otherwise
+user_active_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_ENTRIES,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+store_versions.subscribe(USERS, lambda store_id: user_active_cache.clear())
+
+def is_user_active(db: Session, user_id: int) -> bool:
+    """Return users.is_active for user_id, served from the in-process cache when possible."""
+    active = user_active_cache.get(user_id)
+    if active is None:
+        from app.models.user import User
+        row = db.query(User.is_active, User.store_id).filter(User.user_id == user_id).first()
+        if row:
+            # Mirror the store's versions so a deactivation in another worker reaches this cache
+            store_versions.get(row.store_id, USERS)
+        # Unknown users are treated as active, matching the previous behaviour
+        active = bool(row.is_active) if row else True
+        user_active_cache.set(user_id, active)
+    return active
+
+def invalidate_user_active(user_id: int) -> None:
+    """Forget the cached activation state so the next request re-reads it.
+    Other workers drop theirs when the caller bumps the store's USERS version.
+    """
+    user_active_cache.invalidate(user_id)
+
+def get_token_payload(
+    credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+    db: Session = Depends(get_db),
+) -> dict:
     """Return decoded JWT payload or raise 401."""
     payload = decode_access_token(credentials.credentials)
     if not payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
     
-    # Check if user is active (only for users with user_id, not customers)
+    # Check if user is active (only for users with user_id, not customers).
+    # Reuses the request's session from get_db instead of checking out a second connection.
     user_id = payload.get("user_id")
-    if user_id is not None:
-        from app.core.database import SessionLocal
-        from app.models.user import User
-        db = SessionLocal()
-        try:
-            user = db.query(User).filter(User.user_id == user_id).first()
-            if user and not user.is_active:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN, 
-                    detail="Account has been deactivated. Please contact your administrator."
-                )
-        finally:
-            db.close()
+    if user_id is not None and not is_user_active(db, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, 
+            detail="Account has been deactivated. Please contact your administrator."
+        )
     
     return payload
 
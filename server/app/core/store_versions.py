@@ -0,0 +1,250 @@
+"""
+Per-store version counters, the per-store read cache keyed on them, and
+conditional GET (ETag / If-None-Match) support.
+
+Write paths bump a store's counter after their commit; read endpoints derive a
+strong ETag from it before querying, and answer 304 Not Modified when the
+client already holds that version. Counters are rows of the store_version
+table, so every API worker sees the same versions: each worker mirrors the
+rows of the stores it has served and polls them every
+STORE_VERSION_POLL_SECONDS. A counter that moved in another worker makes the
+entries cached under the old version stale and runs the callbacks registered
+with StoreVersions.subscribe, so in-process caches keyed on something else
+can drop what that write invalidated.
+"""
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Optional
+from fastapi import Request, Response, status
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from app.core.cache import StoreCache
+from app.core.config import settings
+from app.core.database import engine
+from app.models.store_version import StoreVersion
+
+_MISSING = object()
+
+# What a version covers
+CATALOG = "catalog"  # products, inventory rows, stock levels and order states
+SETTINGS = "settings"  # the Store row
+USERS = "users"  # activation state of the store's user accounts
+PRODUCTS = "products"  # searchable product text (SKU, name, category)
+CUSTOMERS = "customers"  # who has ordered from the store, and their contact details
+
+# Stores per IN (...) list when polling
+_POLL_CHUNK = 500
+
+
+class StoreVersions:
+    """Thread-safe monotonic counters keyed by (store_id, scope), shared through the database."""
+
+    def __init__(self):
+        self._versions: "dict[int, dict]" = {}  # store_id -> {scope: version}, for stores seen here
+        self._callbacks: "defaultdict[str, list]" = defaultdict(list)
+        self._lock = threading.Lock()
+        self.polls = 0
+        self.remote_changes = 0
+
+    @staticmethod
+    def _read(conn, store_ids) -> "defaultdict[int, dict]":
+        rows = conn.execute(
+            select(StoreVersion.store_id, StoreVersion.scope, StoreVersion.version)
+            .where(StoreVersion.store_id.in_(store_ids))
+        )
+        found = defaultdict(dict)
+        for r in rows:
+            found[r.store_id][r.scope] = r.version
+        return found
+
+    def _advance(self, store_id: int, versions: dict, local: tuple = ()) -> list:
+        """Raise the mirror to `versions`. Returns the callbacks owed for scopes that moved
+        further than this worker's own bumps (`local`) account for. Caller holds the lock.
+        """
+        mirror = self._versions.setdefault(store_id, {})
+        owed = []
+        for scope, version in versions.items():
+            expected = mirror.get(scope, 0) + (1 if scope in local else 0)
+            if version > expected:
+                self.remote_changes += 1
+                owed.extend((callback, store_id) for callback in self._callbacks.get(scope, ()))
+            if version > mirror.get(scope, 0):
+                mirror[scope] = version
+        return owed
+
+    @staticmethod
+    def _notify(owed: list) -> None:
+        for callback, store_id in owed:
+            try:
+                callback(store_id)
+            except Exception as exc:
+                print(f"[store_versions] invalidation callback failed: {exc}")
+
+    def get(self, store_id: int, scope: str) -> int:
+        with self._lock:
+            mirror = self._versions.get(store_id)
+            if mirror is not None:
+                return mirror.get(scope, 0)
+        # First sight of the store in this worker: nothing is cached for it yet
+        with engine.connect() as conn:
+            versions = self._read(conn, [store_id])[store_id]
+        with self._lock:
+            self._advance(store_id, versions)
+            return self._versions[store_id].get(scope, 0)
+
+    def peek(self, store_id: int, scope: str) -> Optional[int]:
+        """The mirrored version, or None for a store not seen here yet. Never touches the database."""
+        with self._lock:
+            mirror = self._versions.get(store_id)
+            return None if mirror is None else mirror.get(scope, 0)
+
+    def bump(self, store_id: int, *scopes: str) -> int:
+        """Mark the store's data in `scopes` as changed. Call after commit.
+        Returns the new version of the last scope (its current one if the table
+        couldn't be written, in which case this worker's caches for the store are dropped).
+        """
+        try:
+            for attempt in range(2):
+                try:
+                    with engine.begin() as conn:
+                        for scope in scopes:
+                            moved = conn.execute(
+                                update(StoreVersion)
+                                .where(StoreVersion.store_id == store_id, StoreVersion.scope == scope)
+                                .values(version=StoreVersion.version + 1)
+                            ).rowcount
+                            if not moved:
+                                conn.execute(insert(StoreVersion).values(store_id=store_id, scope=scope, version=1))
+                        versions = self._read(conn, [store_id])[store_id]
+                    break
+                except IntegrityError:
+                    # Another worker created the row first; its UPDATE path will succeed now
+                    if attempt:
+                        raise
+        except SQLAlchemyError as exc:
+            # The write itself is committed. Don't move the mirror ahead of the table: a
+            # later bump from another worker to the same number would then pass for ours
+            # and skip the callbacks. Drop what this worker holds for the store instead.
+            print(f"[store_versions] bump failed for store {store_id}: {exc}")
+            store_cache.invalidate(store_id)
+            with self._lock:
+                owed = [(callback, store_id) for scope in scopes for callback in self._callbacks.get(scope, ())]
+                version = self._versions.get(store_id, {}).get(scopes[-1], 0)
+            self._notify(owed)
+            return version
+        with self._lock:
+            owed = self._advance(store_id, versions, scopes)
+            version = self._versions[store_id][scopes[-1]]
+        self._notify(owed)
+        return version
+
+    def subscribe(self, scope: str, callback: Callable[[int], None]) -> None:
+        """Call callback(store_id) whenever another worker changes the store's `scope`."""
+        with self._lock:
+            self._callbacks[scope].append(callback)
+
+    def poll(self) -> int:
+        """Pick up versions moved by other workers; return how many stores had changes."""
+        with self._lock:
+            store_ids = sorted(self._versions)
+            self.polls += 1
+        if not store_ids:
+            return 0
+        found = {}
+        with engine.connect() as conn:
+            for i in range(0, len(store_ids), _POLL_CHUNK):
+                found.update(self._read(conn, store_ids[i:i + _POLL_CHUNK]))
+        changed, owed = 0, []
+        with self._lock:
+            for store_id, versions in found.items():
+                mirror = self._versions.get(store_id, {})
+                if any(v > mirror.get(scope, 0) for scope, v in versions.items()):
+                    changed += 1
+                    owed.extend(self._advance(store_id, versions))
+        self._notify(owed)
+        return changed
+
+    def etag(self, store_id: int, scope: str) -> str:
+        return f'"{scope}-{store_id}-{self.get(store_id, scope)}"'
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "stores": len(self._versions),
+                "poll_seconds": settings.STORE_VERSION_POLL_SECONDS,
+                "polls": self.polls,
+                "remote_changes": self.remote_changes,
+            }
+
+
+store_versions = StoreVersions()
+
+
+def _poll_forever(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            store_versions.poll()
+        except Exception as exc:
+            print(f"[store_versions] poll failed: {exc}")
+
+
+def start_version_sync():
+    """Start the polling thread unless STORE_VERSION_POLL_SECONDS is 0 (a single worker). Returns the thread or None."""
+    if settings.STORE_VERSION_POLL_SECONDS <= 0:
+        return None
+    thread = threading.Thread(
+        target=_poll_forever,
+        args=(settings.STORE_VERSION_POLL_SECONDS,),
+        name="store-version-sync",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+# Catalog, inventory view and settings per store, valid while their scope's version holds
+store_cache = StoreCache(max_stores=settings.STORE_CACHE_MAX_STORES)
+
+
+def cached(store_id: int, scope: str, key: str, load: Callable):
+    """Return the store's `key` from store_cache, calling load() on a miss.
+
+    The version is read before loading, so a write that commits meanwhile
+    leaves the entry stale under an old version rather than cached as current.
+    """
+    version = store_versions.get(store_id, scope)
+    value = store_cache.get(store_id, (scope, key), version, _MISSING)
+    if value is _MISSING:
+        value = load()
+        store_cache.set(store_id, (scope, key), version, value)
+    return value
+
+
+def put(store_id: int, scope: str, key: str, version: int, value) -> None:
+    """Write-through: cache a value just committed, under the version its own bump()
+    returned (a later concurrent write's bump leaves it stale rather than current).
+    """
+    store_cache.set(store_id, (scope, key), version, value)
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def not_modified(request: Request, response: Response, store_id: int, scope: str) -> Optional[Response]:
+    """Tag the response with the scope's current version.
+
+    Returns a 304 response to send as-is if the client's If-None-Match already
+    names that version, else None (and the caller builds the full response).
+    """
+    etag = store_versions.etag(store_id, scope)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,9 +1,16 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 from app.core.config import settings
 from app.api import api_router
 from app.core.database import engine
+from app.core.security import require_roles, user_active_cache, password_hasher
+from app.controllers.inventory_controller import stock_contention
+from app.controllers.dashboard_controller import top_products_cache
+from app.controllers.low_stock_controller import low_stock_tracker
+from app.core.events import event_broker
+from app.core.store_versions import store_cache, store_versions, start_version_sync
+from app.core.reservation_sweeper import start_sweeper
 
 app = FastAPI(
     title="Inventory & Order Management API",
@@ -25,6 +32,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],  # pagination metadata, conditional GETs
 )
 
 # Include API routes
@@ -38,6 +46,20 @@ def root():
 def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics", dependencies=[Depends(require_roles(["admin"]))])
+def metrics():
+    """In-process cache and pool counters for this worker. Admin only."""
+    return {
+        "user_active_cache": user_active_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "stock_contention": stock_contention.stats(),
+        "top_products_cache": top_products_cache.stats(),
+        "low_stock": low_stock_tracker.stats(),
+        "events": event_broker.stats(),
+        "store_cache": store_cache.stats(),
+        "store_versions": store_versions.stats(),
+    }
+
 # To run: uvicorn app.main:app --reload
 
 # Simple DB connectivity check on startup
@@ -48,4 +70,14 @@ def _db_ping():
             conn.execute(text("SELECT 1"))
     except Exception as exc:
         # Log or raise here; for now, we let FastAPI start and you can check logs
-        print(f"[startup] DB ping failed: {exc}")
\ No newline at end of file
+        print(f"[startup] DB ping failed: {exc}")
+
+# Release stock held by pending orders past RESERVATION_TTL_MINUTES
+@app.on_event("startup")
+def _start_reservation_sweeper():
+    start_sweeper()
+
+# Pick up store versions bumped by other workers (cache invalidation across processes)
+@app.on_event("startup")
+def _start_version_sync():
+    start_version_sync()
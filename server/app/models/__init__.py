@@ -4,4 +4,9 @@ from app.models.person import Person
 from app.models.product import Product
 from app.models.user import User
 from app.models.inventory import Inventory
+from app.models.inventory_stripe import InventoryStripe
 from app.models.order import Order
+from app.models.checkout import Checkout
+from app.models.daily_sales import DailySales
+from app.models.store_version import StoreVersion
+from app.models.store_customer import StoreCustomer
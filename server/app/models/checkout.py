@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Numeric, DateTime, ForeignKey
+from datetime import datetime
+from app.core.database import Base
+
+class Checkout(Base):
+    __tablename__ = "checkout"  # Receipt header; order lines reference it via orders.checkout_id
+    
+    checkout_id = Column(Integer, primary_key=True, index=True)
+    person_id = Column(Integer, ForeignKey("person.person_id"), nullable=False)
+    created_by = Column(Integer, ForeignKey("users.user_id"), nullable=False)
+    store_id = Column(Integer, ForeignKey("store.store_id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    line_count = Column(Integer, nullable=False, default=0)
+    total_quantity = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Numeric(12, 2), nullable=False, default=0)
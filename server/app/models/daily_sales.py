@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, Numeric, Date, ForeignKey
+from app.core.database import Base
+
+class DailySales(Base):
+    __tablename__ = "daily_sales"  # Rollup of sold (confirmed/shipped) order lines per store, day and product
+    
+    store_id = Column(Integer, ForeignKey("store.store_id"), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC date the order was created
+    product_id = Column(Integer, primary_key=True, autoincrement=False)  # no FK: history outlives deleted products
+    orders = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
@@ -1,10 +1,39 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index, select, func
+from sqlalchemy.orm import column_property
 from app.core.database import Base
+from app.models.inventory_stripe import InventoryStripe
 
 class Inventory(Base):
     __tablename__ = "inventory"
+    __table_args__ = (
+        Index("ix_inventory_store_product", "store_id", "product_id"),
+        Index("ix_inventory_product", "product_id"),  # Product.inventory sums units per product
+    )
     
     inventory_id = Column(Integer, primary_key=True, index=True)
     store_id = Column(Integer, ForeignKey("store.store_id"), nullable=False)
     product_id = Column(Integer, ForeignKey("product.prod_id"), nullable=False)
     units = Column(Integer, nullable=False, default=0)
+    reserved_units = Column(Integer, nullable=False, default=0)  # held by pending orders
+    stripes = Column(Integer, nullable=False, default=0)  # 0 = stock in `units`; N = stock split over N InventoryStripe rows
+
+    # Stock on hand / reserved, whichever of the two places it is kept in
+    on_hand = column_property(
+        units
+        + select(func.coalesce(func.sum(InventoryStripe.units), 0))
+        .where(InventoryStripe.inventory_id == inventory_id)
+        .correlate_except(InventoryStripe)
+        .scalar_subquery()
+    )
+    reserved = column_property(
+        reserved_units
+        + select(func.coalesce(func.sum(InventoryStripe.reserved_units), 0))
+        .where(InventoryStripe.inventory_id == inventory_id)
+        .correlate_except(InventoryStripe)
+        .scalar_subquery()
+    )
+
+    @property
+    def available(self) -> int:
+        """Available-to-promise: on hand minus what pending orders hold."""
+        return (self.on_hand or 0) - (self.reserved or 0)
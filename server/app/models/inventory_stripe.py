@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from app.core.database import Base
+
+class InventoryStripe(Base):
+    __tablename__ = "inventory_stripe"  # Stock slots of a striped inventory row; on-hand is their sum
+    
+    inventory_id = Column(Integer, ForeignKey("inventory.inventory_id"), primary_key=True)
+    slot = Column(Integer, primary_key=True, autoincrement=False)
+    units = Column(Integer, nullable=False, default=0)
+    reserved_units = Column(Integer, nullable=False, default=0)  # held by pending orders, never above units
@@ -1,15 +1,26 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, Numeric
 from datetime import datetime
 from app.core.database import Base
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_inventory_status", "inventory_id", "status"),  # pending orders per inventory
+        Index("ix_orders_person_created", "person_id", "created_at"),  # customer order history
+        Index("ix_orders_store_created", "store_id", "created_at"),  # store-scoped listing by date
+        Index("ix_orders_reserved_created", "stock_reserved", "created_at"),  # reservation sweeper
+    )
     
     order_id = Column(Integer, primary_key=True, index=True)
     status = Column(String(20), nullable=False)  # 'pending', 'confirmed', 'shipped', 'cancelled'
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)  # keyset column of GET /orders
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     inventory_id = Column(Integer, ForeignKey("inventory.inventory_id"), nullable=False)
+    product_id = Column(Integer, nullable=False)  # denormalized from inventory.product_id; no FK, like daily_sales
     created_by = Column(Integer, ForeignKey("users.user_id"), nullable=False)
     person_id = Column(Integer, ForeignKey("person.person_id"), nullable=False)
     order_quantity = Column(Integer, nullable=False)
+    checkout_id = Column(Integer, ForeignKey("checkout.checkout_id"), nullable=False, index=True)  # receipt header
+    store_id = Column(Integer, ForeignKey("store.store_id"), nullable=False)  # denormalized from inventory.store_id
+    stock_reserved = Column(Boolean, nullable=False, default=False)  # pending order holds its quantity in inventory.reserved_units
+    sold_unit_price = Column(Numeric(10, 2))  # product price when confirmed; what the daily_sales rollup booked
@@ -1,8 +1,16 @@
-from sqlalchemy import Column, Integer, String, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, Index, select, func
+from sqlalchemy.orm import column_property
 from app.core.database import Base
+from app.models.inventory import Inventory
+from app.models.inventory_stripe import InventoryStripe
 
 class Product(Base):
     __tablename__ = "product"
+    __table_args__ = (
+        Index("ix_product_store_sku", "store_id", "SKU"),  # SKU uniqueness check per store
+        # Product search for catalogs too big for the in-memory index (MySQL only)
+        Index("ix_product_search", "prod_name", "SKU", "prod_category", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
     
     prod_id = Column(Integer, primary_key=True, index=True)
     store_id = Column(Integer, ForeignKey("store.store_id"), nullable=False)  # Products belong to a store
@@ -11,4 +19,15 @@ class Product(Base):
     prod_category = Column(String(100), nullable=False)
     prod_description = Column(String(1000))
     unit_price = Column(Numeric(10, 2), nullable=False)
-    inventory = Column(Integer, default=0, nullable=False)  # Stock quantity
+    # Stock quantity, read-only: summed from Inventory.units plus any stripes
+    inventory = column_property(
+        select(func.coalesce(func.sum(Inventory.units), 0))
+        .where(Inventory.product_id == prod_id)
+        .correlate_except(Inventory)
+        .scalar_subquery()
+        + select(func.coalesce(func.sum(InventoryStripe.units), 0))
+        .join(Inventory, Inventory.inventory_id == InventoryStripe.inventory_id)
+        .where(Inventory.product_id == prod_id)
+        .correlate_except(Inventory, InventoryStripe)
+        .scalar_subquery()
+    )
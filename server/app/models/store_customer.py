@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from app.core.database import Base
+
+class StoreCustomer(Base):
+    __tablename__ = "store_customer"  # One row per person who has ordered from a store, kept by OrderController
+    __table_args__ = (
+        Index("ix_store_customer_store_last", "store_id", "last_order_at", "person_id"),  # customer listing
+        Index("ix_store_customer_person", "person_id"),  # stores a person buys from
+    )
+    
+    store_id = Column(Integer, ForeignKey("store.store_id"), primary_key=True)
+    person_id = Column(Integer, ForeignKey("person.person_id"), primary_key=True)
+    first_order_at = Column(DateTime, nullable=False)
+    last_order_at = Column(DateTime, nullable=False)
+    order_count = Column(Integer, nullable=False, default=0)  # order lines, cancelled ones included
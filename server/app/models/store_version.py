@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey
+from app.core.database import Base
+
+class StoreVersion(Base):
+    __tablename__ = "store_version"  # Per-store change counters shared by all API workers (see app/core/store_versions.py)
+    
+    store_id = Column(Integer, ForeignKey("store.store_id"), primary_key=True)
+    scope = Column(String(16), primary_key=True)  # catalog | settings | users | products | customers
+    version = Column(BigInteger, nullable=False, default=0)
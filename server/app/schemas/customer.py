@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, EmailStr
 from typing import Optional
+from datetime import datetime
 
 
 class CustomerCreate(BaseModel):
@@ -27,6 +28,22 @@ class CustomerResponse(BaseModel):
         from_attributes = True
 
 
+class StoreCustomerResponse(CustomerResponse):
+    first_order_at: datetime
+    last_order_at: datetime
+    order_count: int
+
+
+class CustomerMatch(BaseModel):
+    person_id: int
+    person_name: str
+    person_contact: str
+    person_email: str
+
+    class Config:
+        from_attributes = True
+
+
 class CustomerExistsResponse(BaseModel):
     exists: bool
     person_id: Optional[int] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import Optional, Literal, List
 from datetime import datetime
 from decimal import Decimal
 
@@ -10,6 +10,16 @@ class OrderCreate(BaseModel):
     order_quantity: int = Field(..., ge=1)
 
 
+class OrderLineCreate(BaseModel):
+    inventory_id: int
+    order_quantity: int = Field(..., ge=1)
+
+
+class OrderBatchCreate(BaseModel):
+    contact: str = Field(..., description="Customer contact (phone)")
+    lines: List[OrderLineCreate] = Field(..., min_length=1, max_length=200)
+
+
 class OrderUpdate(BaseModel):
     inventory_id: Optional[int] = None
     order_quantity: Optional[int] = Field(None, ge=1)
@@ -19,6 +29,24 @@ class OrderStatusUpdate(BaseModel):
     status: Literal["pending", "confirmed", "cancelled", "shipped"]
 
 
+class OrderStatusBatchUpdate(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1, max_length=200)
+    status: Literal["pending", "confirmed", "cancelled", "shipped"]
+
+
+class OrderStatusResult(BaseModel):
+    order_id: int
+    ok: bool
+    status: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class OrderStatusBatchResponse(BaseModel):
+    updated: int
+    failed: int
+    results: List[OrderStatusResult]
+
+
 class OrderResponse(BaseModel):
     order_id: int
     status: str
@@ -29,6 +57,8 @@ class OrderResponse(BaseModel):
     person_contact: Optional[str] = None
     created_at: datetime
     unit_price: Optional[Decimal] = None
+    checkout_id: Optional[int] = None
+    stock_reserved: Optional[bool] = None
 
     class Config:
         from_attributes = True
@@ -40,4 +70,31 @@ class InventoryItemResponse(BaseModel):
     SKU: str
     prod_name: str
     units: int
+    reserved: int = 0  # held by pending orders
+    available: int  # units - reserved
     unit_price: Decimal
+
+
+class ReceiptLineResponse(BaseModel):
+    order_id: int
+    status: str
+    inventory_id: int
+    SKU: str
+    prod_name: str
+    quantity: int
+    unit_price: float
+    subtotal: float
+    created_at: datetime
+
+
+class ReceiptResponse(BaseModel):
+    order_id: int
+    checkout_id: int
+    person_id: int
+    person_name: str
+    person_contact: str
+    person_email: str
+    person_address: str
+    created_at: datetime
+    lines: List[ReceiptLineResponse]
+    grand_total: float
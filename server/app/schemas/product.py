@@ -19,6 +19,15 @@ class ProductUpdate(BaseModel):
 class ProductInventoryUpdate(BaseModel):
     add_quantity: int  # Quantity to add to current inventory
 
+class ProductStripesUpdate(BaseModel):
+    stripes: int  # Number of stock counters; 0 = single counter
+
+class ProductStripesResponse(BaseModel):
+    prod_id: int
+    inventory_id: int
+    stripes: int
+    units: int
+
 class ProductResponse(BaseModel):
     prod_id: int
     store_id: int
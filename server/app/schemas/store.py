@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional
+from datetime import date
 
 class StoreSettingsResponse(BaseModel):
     store_name: str
@@ -22,3 +23,84 @@ class StoreSettingsUpdate(BaseModel):
     sales_lookback_days: int = Field(default=30, ge=0)
     reorder_horizon_days: int = Field(default=7, ge=0)
     currency: str = Field(default="₹", min_length=1, max_length=8)
+
+
+class DashboardDay(BaseModel):
+    date: date
+    orders: int
+    sales: float
+
+
+class DashboardProductSales(BaseModel):
+    product_id: int
+    name: str
+    sales: float
+
+
+class DashboardResponse(BaseModel):
+    active_products: int
+    orders_last_7_days: int
+    low_stock_products: int
+    low_stock_threshold: int
+    total_sales_last_30_days: float
+    daily: list[DashboardDay]  # oldest first, one entry per day (zero-filled)
+    top_products: list[DashboardProductSales]
+
+
+class DashboardDayProduct(BaseModel):
+    product_id: int
+    name: str
+    sku: str
+    quantity: int
+    revenue: float
+
+
+class DashboardDayDetail(BaseModel):
+    date: date
+    total_orders: int
+    total_revenue: float
+    products: list[DashboardDayProduct]
+
+
+class TopProduct(BaseModel):
+    product_id: int
+    sku: str
+    name: str
+    units: int
+    revenue: float
+
+
+class TopProductsResponse(BaseModel):
+    lookback_days: int  # 0 = all time
+    by: str
+    products: list[TopProduct]
+
+
+class ReorderSuggestion(BaseModel):
+    product_id: int
+    sku: str
+    name: str
+    available: int
+    daily_velocity: float
+    days_of_cover: Optional[float]  # None when the product hasn't sold in the window
+    suggested_quantity: int
+
+
+class ReorderSuggestionsResponse(BaseModel):
+    lookback_days: int
+    horizon_days: int
+    suggestions: list[ReorderSuggestion]  # least cover first
+
+
+class LowStockItem(BaseModel):
+    inventory_id: int
+    product_id: int
+    sku: str
+    name: str
+    units: int
+
+
+class LowStockResponse(BaseModel):
+    threshold: int
+    version: int  # pass back as `since` to /store/low-stock/changes
+    items: list[LowStockItem]  # fewest units first